@@ -0,0 +1,339 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""mcp_setup 벤치마크
+
+합성 MCP 설정(서버 10개 ~ 10만 개)으로 MCPSetup의 설정 파일 작업 성능을
+측정합니다. 설정 경로와 백업 디렉토리는 임시 디렉토리로 바뀌므로 실제
+Cursor 설정은 건드리지 않습니다.
+
+    # 전체 측정 후 기준값 저장
+    python benchmarks/bench_mcp_setup.py --save-baseline benchmarks/baseline.json
+
+    # 기준값과 비교 (25% 이상 느려지면 종료 코드 1)
+    python benchmarks/bench_mcp_setup.py --compare benchmarks/baseline.json --threshold 0.25
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from contextlib import redirect_stdout
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+import mcp_setup  # noqa: E402
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+
+# list/export 시작 시 불러오면 안 되는 모듈
+STARTUP_FORBIDDEN_MODULES = ('subprocess', 'platform', 'hashlib', 'tempfile', 'asyncio', 'threading')
+
+CASES = {}
+
+def case(name):
+    """벤치마크 케이스 등록"""
+    def register(func):
+        CASES[name] = func
+        return func
+    return register
+
+def make_server(i: int, windows: bool = True) -> dict:
+    args = ['-y', '@smithery/cli@latest', 'run', f"@bench/server-{i}", '--key', 'bench']
+    return {
+        'command': 'cmd' if windows else 'npx',
+        'args': ['/c', 'npx'] + args if windows else args,
+        'env': {'BENCH_TOKEN': 'x' * 64, 'BENCH_INDEX': str(i)},
+    }
+
+def make_config(servers: int, windows: bool = True) -> dict:
+    """서버 servers개를 가진 합성 MCP 설정 생성"""
+    return {'mcpServers': {f"server-{i}": make_server(i, windows) for i in range(servers)}}
+
+def write_config(path: Path, servers: int, windows: bool = True) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(make_config(servers, windows), f, indent=2)
+
+def repeats_for(servers: int) -> int:
+    """서버 수에 따른 반복 횟수 (작은 설정은 여러 번 측정해 최솟값 사용)"""
+    return max(1, min(20, 20000 // max(servers, 1)))
+
+def timed(func, prepare=None, repeats: int = 1) -> float:
+    """prepare()는 측정에서 제외하고 func()의 최소 실행 시간 반환"""
+    best = None
+    for _ in range(repeats):
+        if prepare is not None:
+            prepare()
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+class Workspace:
+    """임시 디렉토리에 서버 n개짜리 mcp.json을 둔 MCPSetup"""
+    def __init__(self, root: Path, servers: int):
+        self.root = root
+        self.servers = servers
+        self.mcp_json = root / 'cursor' / 'mcp.json'
+        self.mcp_json.parent.mkdir(parents=True)
+        self.setup = mcp_setup.MCPSetup(mcp_json_path=self.mcp_json, work_dir=root)
+        self.config = make_config(servers, windows=False)
+        self.reset()
+
+    def reset(self) -> None:
+        mcp_setup.write_json_atomic(self.mcp_json, self.config)
+
+    def path(self, name: str) -> Path:
+        return self.root / name
+
+@case('load')
+def bench_load(ws: Workspace, repeats: int) -> float:
+    return timed(ws.setup.load_mcp_config, repeats=repeats)
+
+@case('save')
+def bench_save(ws: Workspace, repeats: int) -> float:
+    return timed(lambda: ws.setup.save_mcp_config(ws.config), repeats=repeats)
+
+@case('add')
+def bench_add(ws: Workspace, repeats: int) -> float:
+    return timed(lambda: ws.setup.add_mcp_server('bench-extra', 'npx', ['-y', 'bench']), repeats=repeats)
+
+@case('remove')
+def bench_remove(ws: Workspace, repeats: int) -> float:
+    return timed(
+        lambda: ws.setup.remove_mcp_server('bench-extra'),
+        prepare=lambda: ws.setup.add_mcp_server('bench-extra', 'npx', ['-y', 'bench']),
+        repeats=repeats,
+    )
+
+@case('import')
+def bench_import(ws: Workspace, repeats: int) -> float:
+    src = ws.path('import.json')
+    write_config(src, ws.servers, windows=True)
+    return timed(lambda: ws.setup.import_mcp_config(str(src)), prepare=ws.reset, repeats=repeats)
+
+@case('import_merge_noop')
+def bench_import_merge_noop(ws: Workspace, repeats: int) -> float:
+    src = ws.path('merge.json')
+    write_config(src, ws.servers, windows=False)
+    return timed(lambda: ws.setup.merge_mcp_config(str(src)), prepare=ws.reset, repeats=repeats)
+
+@case('export')
+def bench_export(ws: Workspace, repeats: int) -> float:
+    out = ws.path('export.json')
+    return timed(lambda: ws.setup.export_mcp_config(str(out)), repeats=repeats)
+
+@case('backup')
+def bench_backup(ws: Workspace, repeats: int) -> float:
+    counter = [0]
+
+    def change():
+        # 매번 내용이 달라 새 백업이 만들어지도록 함
+        counter[0] += 1
+        ws.config['benchNonce'] = counter[0]
+        ws.reset()
+
+    result = timed(ws.setup.backup_mcp_config, prepare=change, repeats=repeats)
+    ws.config.pop('benchNonce', None)
+    ws.reset()
+    return result
+
+@case('backup_unchanged')
+def bench_backup_unchanged(ws: Workspace, repeats: int) -> float:
+    ws.setup.backup_mcp_config()
+    return timed(ws.setup.backup_mcp_config, repeats=repeats)
+
+def run_cases(sizes, names) -> dict:
+    """케이스별, 서버 수별 실행 시간(초)"""
+    results = {name: {} for name in names}
+    for servers in sizes:
+        repeats = repeats_for(servers)
+        with tempfile.TemporaryDirectory() as tmp:
+            with redirect_stdout(io.StringIO()):
+                ws = Workspace(Path(tmp), servers)
+            for name in names:
+                with redirect_stdout(io.StringIO()):
+                    results[name][str(servers)] = CASES[name](ws, repeats)
+                ws.reset()
+    return results
+
+def convert_in_memory(src: Path, dst: Path) -> None:
+    """기존 방식: 전체 문서를 읽어 변환 후 다시 직렬화"""
+    with open(src, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    for server in config['mcpServers'].values():
+        mcp_setup.convert_server_for_os(server, windows=False)
+    with open(dst, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+
+def convert_streaming(src: Path, dst: Path, compact: bool = False) -> None:
+    """스트리밍 방식: 서버 항목을 하나씩 변환"""
+    with open(src, 'r', encoding='utf-8') as fin, open(dst, 'w', encoding='utf-8') as fout:
+        mcp_setup.stream_mcp_config(
+            fin, fout,
+            lambda name, server: mcp_setup.convert_server_for_os(server, windows=False),
+            indent=None if compact else 2,
+        )
+
+def bench_convert(servers: int) -> dict:
+    """import 변환(cmd /c npx -> npx)의 처리량과 최대 메모리 비교"""
+    def measure(func, *args):
+        started = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - started
+        tracemalloc.start()
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {'seconds': elapsed, 'peak_bytes': peak, 'servers_per_second': servers / elapsed}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / 'input.json'
+        dst = Path(tmp) / 'output.json'
+        write_config(src, servers)
+        return {
+            'servers': servers,
+            'input_bytes': os.path.getsize(src),
+            'in_memory': measure(convert_in_memory, src, dst),
+            'streaming': measure(convert_streaming, src, dst),
+            'streaming_compact': measure(convert_streaming, src, dst, True),
+        }
+
+def bench_startup(runs: int = 10) -> dict:
+    """list/export의 시작 시간과 불러온 모듈 확인 (python -X importtime -m mcp_setup)"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, HOME=tmp, USERPROFILE=tmp, PYTHONPATH=str(REPO_DIR))
+        cursor_dir = mcp_setup.PlatformProfile.for_os(mcp_setup.OSInfo.detect_os_type(), Path(tmp)).cursor_dir
+        cursor_dir.mkdir(parents=True)
+        write_config(cursor_dir / 'mcp.json', 100, windows=False)
+
+        commands = {
+            'list': ['list'],
+            'export': ['export', '--output', str(Path(tmp) / 'export.json')],
+        }
+        for name, command in commands.items():
+            argv = [sys.executable, '-X', 'importtime', '-m', 'mcp_setup'] + command
+            best = None
+            stderr = ''
+            for _ in range(runs):
+                started = time.perf_counter()
+                proc = subprocess.run(argv, cwd=tmp, env=env, stdout=subprocess.DEVNULL,
+                                      stderr=subprocess.PIPE, text=True)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+                stderr = proc.stderr
+            imported = {line.rsplit('|', 1)[-1].strip() for line in stderr.splitlines() if '|' in line}
+            results[name] = {
+                'seconds': best,
+                'forbidden_imports': sorted(m for m in STARTUP_FORBIDDEN_MODULES if m in imported),
+            }
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """기준값보다 threshold 비율 이상 느려진 항목 목록"""
+    regressions = []
+    for name, by_size in results.items():
+        for size, seconds in by_size.items():
+            base = baseline.get('results', {}).get(name, {}).get(size)
+            if base and seconds > base * (1 + threshold):
+                regressions.append((name, size, base, seconds))
+    return regressions
+
+def print_table(results: dict, sizes) -> None:
+    header = f"{'케이스':<20}" + ''.join(f"{size:>12}" for size in sizes)
+    print(header + "   (ms)")
+    for name, by_size in results.items():
+        row = f"{name:<20}"
+        for size in sizes:
+            seconds = by_size.get(str(size))
+            row += f"{seconds * 1000:>12.2f}" if seconds is not None else f"{'-':>12}"
+        print(row)
+
+def main():
+    parser = argparse.ArgumentParser(description='mcp_setup 벤치마크')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='측정할 서버 수 (쉼표로 구분)')
+    parser.add_argument('--case', action='append', choices=sorted(CASES), help='실행할 케이스 (기본값: 전체)')
+    parser.add_argument('--convert', action='store_true', help='가장 큰 크기로 스트리밍 변환 처리량/메모리 비교도 실행')
+    parser.add_argument('--skip-startup', action='store_true', help='시작 시간 측정 생략')
+    parser.add_argument('--startup-budget-ms', type=float, default=None, help='list/export 시작 시간 상한(ms)')
+    parser.add_argument('--save-baseline', help='결과를 기준값 JSON으로 저장')
+    parser.add_argument('--compare', help='기준값 JSON과 비교')
+    parser.add_argument('--threshold', type=float, default=0.25, help='회귀로 판단할 느려짐 비율 (기본값: 0.25)')
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    names = args.case or list(CASES)
+    results = run_cases(sizes, names)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    failed = False
+
+    if not args.skip_startup:
+        startup = bench_startup()
+        report['startup'] = startup
+        for name, item in startup.items():
+            results[f"startup_{name}"] = {'0': item['seconds']}
+            if item['forbidden_imports']:
+                print(f"[실패] {name} 시작 시 불필요한 모듈을 불러옴: {', '.join(item['forbidden_imports'])}")
+                failed = True
+            if args.startup_budget_ms is not None and item['seconds'] * 1000 > args.startup_budget_ms:
+                print(f"[실패] {name} 시작 시간 {item['seconds'] * 1000:.1f}ms > {args.startup_budget_ms}ms")
+                failed = True
+
+    if args.convert:
+        report['convert'] = bench_convert(max(sizes))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table({k: v for k, v in results.items() if not k.startswith('startup_')}, sizes)
+        for name, item in report.get('startup', {}).items():
+            print(f"startup {name:<12} {item['seconds'] * 1000:8.1f} ms")
+        if 'convert' in report:
+            convert = report['convert']
+            print(f"\n변환: 서버 {convert['servers']}개, 입력 {convert['input_bytes'] / 1e6:.1f} MB")
+            for name in ('in_memory', 'streaming', 'streaming_compact'):
+                item = convert[name]
+                print(f"  {name:<18} {item['seconds']:7.2f}s  {item['servers_per_second']:>10,.0f} servers/s  "
+                      f"peak {item['peak_bytes'] / 1e6:7.1f} MB")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"기준값 저장: {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, size, base, seconds in regressions:
+            print(f"[회귀] {name} (서버 {size}개): {base * 1000:.2f}ms -> {seconds * 1000:.2f}ms "
+                  f"(+{(seconds / base - 1) * 100:.0f}%)")
+        if regressions:
+            failed = True
+        else:
+            print(f"기준값 대비 회귀 없음 (허용 {args.threshold * 100:.0f}%)")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -4,12 +4,15 @@
 import os
 import sys
 import json
-import shutil
-import platform
 import argparse
-import subprocess
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, NamedTuple
+
+# subprocess, platform, shutil, threading, hashlib, tempfile 등은 시작 시간을 줄이기
+# 위해 실제로 사용하는 함수 안에서 가져옵니다. (list/export 같은 읽기 전용 명령은
+# 이 모듈들을 전혀 불러오지 않습니다.)
 
 # 색상 코드
 class Colors:
@@ -23,144 +26,978 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
-def print_colored(text: str, color: str):
+def print_colored(text: str, color: str, file=None):
     """컬러 텍스트 출력"""
-    print(f"{color}{text}{Colors.ENDC}")
+    print(f"{color}{text}{Colors.ENDC}", file=file)
+
+class _NullSpan:
+    """추적이 꺼져 있을 때 반환되는 빈 구간 (시간 측정과 할당이 없음)"""
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+    
+    def set(self, **attrs) -> None:
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class Span:
+    """실행 시간 측정 구간"""
+    __slots__ = ('id', 'parent', 'name', 'category', 'attrs', 'thread', 'start', 'duration', 'error')
+    
+    def __init__(self, name: str, category: str, attrs: Dict):
+        self.id = next(Tracer._ids)
+        self.parent = None
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self.thread = None
+        self.start = 0.0
+        self.duration = 0.0
+        self.error = None
+    
+    def set(self, **attrs) -> None:
+        """구간 속성 추가 (예: 종료 코드, 캐시 적중 여부)"""
+        self.attrs.update(attrs)
+    
+    def __enter__(self):
+        stack = Tracer._stack()
+        if stack:
+            self.parent = stack[-1].id
+        stack.append(self)
+        self.thread = Tracer._thread_name()
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        stack = Tracer._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        Tracer._record(self)
+        return False
+
+class Tracer:
+    """구간별 실행 시간 측정 (--profile, --trace)
+
+    꺼져 있으면 span()이 미리 만들어 둔 빈 구간을 그대로 반환하므로 호출
+    비용은 속성 확인 한 번뿐입니다. 켜져 있으면 끝난 구간을 모아 단계별
+    요약을 출력하고, 추적 파일이 지정되면 한 줄에 하나씩 JSON으로 기록합니다.
+    """
+    enabled = False
+    _spans: List[Span] = []
+    _trace_file = None
+    _lock = None
+    _local = None
+    _ids = None
+    _origin = 0.0
+    _wall_origin = 0.0
+    
+    @classmethod
+    def enable(cls, trace_path: Optional[str] = None) -> None:
+        """추적 시작 (trace_path가 '-'이면 표준 오류로 기록, 파일을 열 수 없으면 OSError)"""
+        import itertools
+        import threading
+        
+        if trace_path == '-':
+            trace_file = sys.stderr
+        else:
+            trace_file = open(trace_path, 'a', encoding='utf-8') if trace_path else None
+        cls._trace_file = trace_file
+        cls._lock = threading.Lock()
+        cls._local = threading.local()
+        cls._ids = itertools.count(1)
+        cls._spans = []
+        cls._origin = time.perf_counter()
+        cls._wall_origin = time.time()
+        cls.enabled = True
+    
+    @classmethod
+    def disable(cls) -> None:
+        """추적 종료 (추적 파일을 닫음)"""
+        cls.enabled = False
+        if cls._trace_file is not None and cls._trace_file is not sys.stderr:
+            cls._trace_file.close()
+        cls._trace_file = None
+    
+    @classmethod
+    def span(cls, name: str, category: str = 'misc', **attrs):
+        """with 문으로 사용할 측정 구간"""
+        if not cls.enabled:
+            return _NULL_SPAN
+        return Span(name, category, attrs)
+    
+    @classmethod
+    def current(cls) -> Optional[Span]:
+        """현재 스레드에서 가장 안쪽에 열려 있는 구간"""
+        if not cls.enabled:
+            return None
+        stack = cls._stack()
+        return stack[-1] if stack else None
+    
+    @classmethod
+    @contextmanager
+    def attach(cls, parent: Optional[Span]):
+        """다른 스레드에서 연 구간을 현재 스레드의 상위 구간으로 사용"""
+        if parent is None:
+            yield
+            return
+        stack = cls._stack()
+        stack.append(parent)
+        try:
+            yield
+        finally:
+            stack.remove(parent)
+    
+    @classmethod
+    def _stack(cls) -> List[Span]:
+        """현재 스레드에서 열려 있는 구간 목록"""
+        stack = getattr(cls._local, 'stack', None)
+        if stack is None:
+            stack = cls._local.stack = []
+        return stack
+    
+    @staticmethod
+    def _thread_name() -> str:
+        import threading
+        
+        return threading.current_thread().name
+    
+    @classmethod
+    def _record(cls, span: Span) -> None:
+        """끝난 구간 저장 및 추적 파일 기록"""
+        with cls._lock:
+            cls._spans.append(span)
+            if cls._trace_file is not None:
+                cls._trace_file.write(json.dumps(cls._to_event(span), ensure_ascii=False) + '\n')
+                cls._trace_file.flush()
+    
+    @classmethod
+    def _to_event(cls, span: Span) -> Dict:
+        """구간을 추적 이벤트(JSON Lines 한 줄)로 변환"""
+        event = {
+            'ts': round(cls._wall_origin + (span.start - cls._origin), 6),
+            'name': span.name,
+            'cat': span.category,
+            'dur_ms': round(span.duration * 1000, 3),
+            'id': span.id,
+            'parent': span.parent,
+            'pid': os.getpid(),
+            'thread': span.thread,
+        }
+        if span.attrs:
+            event['attrs'] = span.attrs
+        if span.error:
+            event['error'] = span.error
+        return event
+    
+    @classmethod
+    def spans(cls) -> List[Span]:
+        """지금까지 끝난 구간 목록"""
+        with cls._lock:
+            return list(cls._spans)
+    
+    @classmethod
+    def print_profile(cls) -> None:
+        """단계(category)별, 구간별 실행 시간 요약을 표준 오류로 출력
+
+        self 시간은 같은 스레드의 하위 구간을 뺀 시간입니다. 병렬 설치처럼
+        여러 스레드에서 겹쳐 실행된 구간은 합계가 전체 시간보다 클 수 있습니다.
+        """
+        spans = cls.spans()
+        total = time.perf_counter() - cls._origin
+        child_time = {}
+        for span in spans:
+            if span.parent is not None:
+                child_time[span.parent] = child_time.get(span.parent, 0.0) + span.duration
+        
+        phases = {}
+        for span in spans:
+            phase = phases.setdefault(span.category, {})
+            count, elapsed, self_time, longest = phase.get(span.name, (0, 0.0, 0.0, 0.0))
+            phase[span.name] = (
+                count + 1,
+                elapsed + span.duration,
+                self_time + max(span.duration - child_time.get(span.id, 0.0), 0.0),
+                max(longest, span.duration),
+            )
+        
+        err = sys.stderr
+        print_colored(f"\n===== 실행 시간 프로파일 (전체 {total * 1000:.1f} ms) =====", Colors.HEADER, err)
+        print(f"  {'구간':<36}{'횟수':>6}{'합계(ms)':>12}{'self(ms)':>12}{'최대(ms)':>12}", file=err)
+        ordered = sorted(phases.items(), key=lambda item: -sum(v[2] for v in item[1].values()))
+        for category, names in ordered:
+            phase_self = sum(v[2] for v in names.values())
+            share = phase_self / total * 100 if total else 0.0
+            print_colored(f"  [{category}] self {phase_self * 1000:.1f} ms ({share:.0f}%)", Colors.CYAN, err)
+            for name, (count, elapsed, self_time, longest) in sorted(names.items(), key=lambda item: -item[1][1]):
+                print(f"    {name:<34}{count:>6}{elapsed * 1000:>12.1f}{self_time * 1000:>12.1f}{longest * 1000:>12.1f}", file=err)
+        print_colored("=" * 40, Colors.HEADER, err)
+
+class PlatformProfile(NamedTuple):
+    """플랫폼 프로필 (한 번 계산된 뒤 바뀌지 않는 값)"""
+    os_type: str
+    home_dir: Path
+    cursor_dir: Path
+    simulated: bool = False
+    
+    @classmethod
+    def for_os(cls, os_type: str, home_dir: Path, simulated: bool = False) -> 'PlatformProfile':
+        """OS 타입에 맞는 Cursor 설정 경로로 프로필 생성"""
+        if os_type == 'windows':
+            # Windows에서는 %USERPROFILE%\.cursor
+            cursor_dir = home_dir / '.cursor'
+        elif os_type == 'macos':
+            # macOS에서는 ~/Library/Application Support/Cursor
+            cursor_dir = home_dir / 'Library' / 'Application Support' / 'Cursor'
+        else:
+            # Linux에서는 ~/.cursor
+            cursor_dir = home_dir / '.cursor'
+        return cls(os_type, home_dir, cursor_dir, simulated)
 
 class OSInfo:
-    """운영 체제 정보"""
+    """운영 체제 정보
+
+    플랫폼 프로필은 프로세스당 한 번만 계산되며, set_target_os()로 다른
+    플랫폼용 설정을 생성하도록 바꿀 수 있습니다.
+    """
+    SUPPORTED_OS_TYPES = ('windows', 'macos', 'linux')
+    
+    _profile = None
+    _details = None
+    
     @staticmethod
-    def get_os_type():
-        """운영 체제 타입 반환"""
-        system = platform.system().lower()
-        if system == "darwin":
+    def detect_os_type() -> str:
+        """현재 실행 중인 운영 체제 타입 탐지"""
+        # sys.platform은 인터프리터 빌드 시 결정되므로 platform 모듈을 불러오지 않아도 됩니다.
+        if sys.platform == "darwin":
             return "macos"
-        elif system == "windows":
+        elif sys.platform == "win32":
             return "windows"
-        elif system == "linux":
+        elif sys.platform.startswith("linux"):
             return "linux"
         else:
             return "unknown"
     
+    @classmethod
+    def profile(cls) -> PlatformProfile:
+        """플랫폼 프로필 반환 (처음 호출 시 한 번만 탐지)"""
+        if cls._profile is None:
+            cls._profile = PlatformProfile.for_os(cls.detect_os_type(), Path.home())
+        return cls._profile
+    
+    @classmethod
+    def set_target_os(cls, os_type: Optional[str], home_dir: Optional[Path] = None) -> PlatformProfile:
+        """설정을 생성할 대상 운영 체제와 홈 디렉토리 지정 (None이면 현재 운영 체제와 홈)"""
+        if os_type is None and home_dir is None:
+            cls._profile = None
+            return cls.profile()
+        os_type = os_type or cls.detect_os_type()
+        if os_type not in cls.SUPPORTED_OS_TYPES:
+            raise ValueError(f"지원하지 않는 운영 체제입니다: {os_type}")
+        simulated = os_type != cls.detect_os_type()
+        cls._profile = PlatformProfile.for_os(os_type, Path(home_dir) if home_dir else Path.home(), simulated)
+        return cls._profile
+    
+    @staticmethod
+    def get_os_type():
+        """운영 체제 타입 반환"""
+        return OSInfo.profile().os_type
+    
     @staticmethod
     def is_windows():
         """Windows 확인"""
-        return platform.system().lower() == "windows"
+        return OSInfo.profile().os_type == "windows"
     
     @staticmethod
     def is_macos():
         """macOS 확인"""
-        return platform.system().lower() == "darwin"
+        return OSInfo.profile().os_type == "macos"
     
     @staticmethod
     def is_linux():
         """Linux 확인"""
-        return platform.system().lower() == "linux"
+        return OSInfo.profile().os_type == "linux"
     
     @staticmethod
     def get_home_dir():
         """홈 디렉토리 반환"""
-        return Path.home()
+        return OSInfo.profile().home_dir
+    
+    @classmethod
+    def get_os_details(cls):
+        """OS 상세 정보 반환 (현재 실행 중인 시스템 기준, 한 번만 조회)"""
+        if cls._details is None:
+            import platform
+            
+            uname = platform.uname()
+            cls._details = {
+                "system": uname.system,
+                "release": uname.release,
+                "version": uname.version,
+                "machine": uname.machine,
+                "processor": cls._get_processor(),
+                "python_version": platform.python_version()
+            }
+        return dict(cls._details)
     
     @staticmethod
-    def get_os_details():
-        """OS 상세 정보 반환"""
-        return {
-            "system": platform.system(),
-            "release": platform.release(),
-            "version": platform.version(),
-            "machine": platform.machine(),
-            "processor": platform.processor(),
-            "python_version": platform.python_version()
-        }
+    def _get_processor() -> str:
+        """프로세서 이름 반환
+
+        Linux에서 platform.processor()는 `uname -p`를 실행하므로
+        /proc/cpuinfo를 먼저 읽습니다.
+        """
+        if sys.platform.startswith("linux"):
+            try:
+                with open('/proc/cpuinfo', 'r', encoding='utf-8', errors='replace') as f:
+                    for line in f:
+                        if line.startswith('model name'):
+                            return line.split(':', 1)[1].strip()
+            except OSError:
+                pass
+        import platform
+        
+        return platform.processor()
+
+def get_cache_dir() -> Path:
+    """mcp_setup 캐시 디렉토리 반환"""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or str(OSInfo.get_home_dir() / 'AppData' / 'Local')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or str(OSInfo.get_home_dir() / '.cache')
+    return Path(base) / 'mcp_setup'
+
+class NodeProbe:
+    """Node.js 환경 탐지 결과
+
+    프로세스당 한 번만 탐지하며, 결과는 `node` 실행 파일의 실제 경로와
+    수정 시각을 키로 디스크에 캐시되어 다음 실행에서는 `node --version`을
+    다시 실행하지 않습니다.
+    """
+    CACHE_FILE = 'node_probe.json'
+    VERSION_TIMEOUT = 10.0
+    _instance = None
+    
+    def __init__(self, path: Optional[str] = None, version: Optional[str] = None):
+        self.path = path
+        self.version = version
+    
+    @property
+    def installed(self) -> bool:
+        """Node.js 설치 여부"""
+        return self.version is not None
+    
+    @classmethod
+    def get(cls, refresh: bool = False) -> 'NodeProbe':
+        """메모이즈된 탐지 결과 반환"""
+        if cls._instance is None or refresh:
+            with Tracer.span('node.probe', 'node'):
+                cls._instance = cls._probe(use_cache=not refresh)
+        return cls._instance
+    
+    @classmethod
+    def _probe(cls, use_cache: bool = True) -> 'NodeProbe':
+        """Node.js 실행 파일 탐지"""
+        import shutil
+        
+        found = shutil.which('node')
+        if not found:
+            return cls()
+        
+        try:
+            path = str(Path(found).resolve())
+            stat = os.stat(path)
+        except OSError:
+            return cls()
+        key = {'path': path, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+        
+        cache_file = get_cache_dir() / cls.CACHE_FILE
+        if use_cache:
+            cached = cls._read_cache(cache_file)
+            if cached and all(cached.get(k) == v for k, v in key.items()):
+                return cls(path, cached.get('version'))
+        
+        version = cls._run_version(path)
+        if version:
+            cls._write_cache(cache_file, dict(key, version=version))
+        return cls(path, version)
+    
+    @staticmethod
+    def _run_version(path: str) -> Optional[str]:
+        """`node --version` 실행"""
+        result = run_command([path, '--version'], timeout=NodeProbe.VERSION_TIMEOUT, max_lines=5, name='node --version')
+        version = result.stdout[0].strip() if result.stdout else ''
+        if result.ok and version.startswith("v"):
+            return version
+        return None
+    
+    @staticmethod
+    def _read_cache(cache_file: Path) -> Optional[Dict]:
+        """캐시 파일 읽기 (없거나 손상되었으면 None)"""
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else None
+        except (OSError, ValueError):
+            return None
+    
+    @staticmethod
+    def _write_cache(cache_file: Path, data: Dict) -> None:
+        """캐시 파일 쓰기 (실패해도 무시)"""
+        try:
+            cache_file.parent.mkdir(exist_ok=True, parents=True)
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
 
 class NodeJSChecker:
     """Node.js 확인 클래스"""
     @staticmethod
     def is_nodejs_installed():
         """Node.js 설치 여부 확인"""
-        try:
-            # Windows와 다른 OS에 따라 명령어 조정
-            cmd = "node --version" if not OSInfo.is_windows() else "cmd /c node --version"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-            return result.returncode == 0 and result.stdout.strip().startswith("v")
-        except Exception:
-            return False
+        return NodeProbe.get().installed
     
     @staticmethod
     def get_nodejs_version():
         """Node.js 버전 반환"""
-        if not NodeJSChecker.is_nodejs_installed():
+        return NodeProbe.get().version
+
+def quote_command_arg(arg: str) -> str:
+    """셸 명령 문자열에 넣을 인자 인용"""
+    if OSInfo.is_windows():
+        import subprocess
+        return subprocess.list2cmdline([arg])
+    import shlex
+    return shlex.quote(arg)
+
+# run_command가 한 번에 읽는 줄의 최대 길이 (더 긴 줄은 나누어 전달)
+RUN_COMMAND_MAX_LINE = 64 * 1024
+
+class CommandResult(NamedTuple):
+    """외부 명령 실행 결과 (출력은 마지막 몇 줄만 보관)"""
+    argv: List[str]
+    returncode: Optional[int]
+    stdout: List[str]
+    stderr: List[str]
+    elapsed: float
+    timed_out: bool = False
+    cancelled: bool = False
+    error: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not (self.timed_out or self.cancelled)
+    
+    @property
+    def output(self) -> str:
+        """보관된 stdout과 stderr 출력"""
+        return "\n".join(self.stdout + self.stderr)
+    
+    def describe_failure(self) -> str:
+        """실패 원인 요약"""
+        if self.error:
+            return self.error
+        if self.cancelled:
+            return "취소됨"
+        if self.timed_out:
+            return f"시간 초과 ({self.elapsed:.1f}초)"
+        tail = "\n".join(self.stderr or self.stdout)
+        return f"종료 코드 {self.returncode}" + (f"\n{tail}" if tail else '')
+
+def format_command(argv: List[str]) -> str:
+    """로그에 표시할 명령 문자열"""
+    return ' '.join(quote_command_arg(arg) for arg in argv)
+
+def run_command(argv: List[str], env: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+                cancel=None, on_line: Optional[Callable[[str, str], None]] = None,
+                max_lines: int = 200, name: Optional[str] = None) -> CommandResult:
+    """셸 없이 argv로 명령 실행
+
+    stdout/stderr를 각각 별도 스레드에서 한 줄씩 읽어 on_line(stream, line)에
+    전달하고, 결과에는 스트림별로 마지막 max_lines줄만 보관합니다.
+    timeout초가 지나거나 cancel(threading.Event)이 설정되면 프로세스 그룹을
+    종료합니다. 실행 파일을 찾을 수 없는 등의 오류도 예외 대신 결과로
+    반환합니다.
+    """
+    import subprocess
+    import threading
+    from collections import deque
+    
+    argv = [str(arg) for arg in argv]
+    started = time.monotonic()
+    with Tracer.span(name or Path(argv[0]).name, 'subprocess', argv=argv) as span:
+        try:
+            proc = subprocess.Popen(
+                argv, env=env, stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                text=True, encoding='utf-8', errors='replace', bufsize=1,
+                start_new_session=os.name != 'nt',
+            )
+        except OSError as e:
+            span.set(error=str(e))
+            return CommandResult(argv, None, [], [], time.monotonic() - started, error=str(e))
+        
+        buffers = {'stdout': deque(maxlen=max_lines), 'stderr': deque(maxlen=max_lines)}
+        buffers_lock = threading.Lock()
+        
+        def pump(stream_name, stream):
+            buffer = buffers[stream_name]
+            with stream:
+                for line in iter(lambda: stream.readline(RUN_COMMAND_MAX_LINE), ''):
+                    line = line.rstrip('\r\n')
+                    with buffers_lock:
+                        buffer.append(line)
+                    if on_line is not None:
+                        on_line(stream_name, line)
+        
+        readers = [
+            threading.Thread(target=pump, args=('stdout', proc.stdout), daemon=True),
+            threading.Thread(target=pump, args=('stderr', proc.stderr), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+        
+        deadline = started + timeout if timeout else None
+        timed_out = cancelled = False
+        while True:
+            try:
+                proc.wait(timeout=0.1)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            if cancel is not None and cancel.is_set():
+                cancelled = True
+            elif deadline is not None and time.monotonic() >= deadline:
+                timed_out = True
+            else:
+                continue
+            terminate_process(proc)
+            break
+        
+        # 종료시킨 경우 파이프를 물려받은 하위 프로세스가 남아 있을 수 있으므로 오래 기다리지 않음
+        for reader in readers:
+            reader.join(timeout=1.0 if timed_out or cancelled else None)
+        span.set(returncode=proc.returncode, timed_out=timed_out, cancelled=cancelled)
+    
+    with buffers_lock:
+        stdout, stderr = list(buffers['stdout']), list(buffers['stderr'])
+    return CommandResult(argv, proc.returncode, stdout, stderr, time.monotonic() - started, timed_out, cancelled)
+
+def terminate_process(proc, grace: float = 3.0) -> None:
+    """프로세스(POSIX에서는 프로세스 그룹 전체) 종료 후 대기"""
+    import subprocess
+    
+    def send(kill):
+        try:
+            if os.name == 'nt':
+                if kill:
+                    proc.kill()
+                else:
+                    proc.terminate()
+            else:
+                import signal
+                os.killpg(proc.pid, signal.SIGKILL if kill else signal.SIGTERM)
+        except OSError:
+            pass
+    
+    send(kill=False)
+    try:
+        proc.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        send(kill=True)
+        proc.wait()
+
+def npm_package_name(spec: str) -> str:
+    """패키지 지정자에서 이름만 반환 ('@scope/name@1.0' -> '@scope/name')"""
+    at = spec.rfind('@')
+    return spec[:at] if at > 0 else spec
+
+class PackageCache:
+    """미리 받아 둔 npm 패키지 캐시
+
+    prefetch()로 패키지를 캐시 디렉토리에 설치하고 해석된 버전과 실행 파일
+    경로를 manifest.json에 고정합니다. 이후 설치와 mcp.json 항목은 npx 대신
+    캐시된 실행 파일을 node로 직접 실행하므로 레지스트리에 접속하지 않습니다.
+    """
+    MANIFEST_FILE = 'manifest.json'
+    SMITHERY_CLI = '@smithery/cli'
+    DEFAULT_PACKAGES = ('@smithery/cli@latest',)
+    
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.manifest_path = self.root / self.MANIFEST_FILE
+        self._manifest = None
+    
+    @classmethod
+    def default_root(cls) -> Path:
+        """기본 캐시 디렉토리"""
+        return get_cache_dir() / 'packages'
+    
+    def manifest(self) -> Dict:
+        """고정된 패키지 정보 ({이름: {spec, version, bin}})"""
+        if self._manifest is None:
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    self._manifest = json.load(f).get('packages', {})
+            except (OSError, ValueError, AttributeError):
+                self._manifest = {}
+        return self._manifest
+    
+    def get(self, name: str) -> Optional[Dict]:
+        """캐시된 패키지 정보 (실행 파일이 없으면 None)"""
+        entry = self.manifest().get(name)
+        if entry and Path(entry.get('bin', '')).exists():
+            return entry
+        return None
+    
+    def command_args(self, name: str, args: List[str]) -> Optional[tuple]:
+        """캐시된 패키지를 실행할 (명령어, 인자) 반환"""
+        entry = self.get(name)
+        if entry is None:
             return None
+        return 'node', [entry['bin']] + list(args)
+    
+    @staticmethod
+    def _find_tarball(source_dir: Path, name: str) -> Optional[Path]:
+        """npm pack 결과물 이름(@scope/name -> scope-name-<버전>.tgz)으로 tarball 찾기"""
+        stem = name.lstrip('@').replace('/', '-')
+        candidates = sorted(Path(source_dir).glob(f"{stem}-[0-9]*.tgz"))
+        return candidates[-1] if candidates else None
+    
+    def prefetch(self, specs: List[str], registry: Optional[str] = None,
+                 package_source: Optional[str] = None) -> bool:
+        """패키지를 캐시 디렉토리에 설치하고 버전 고정
+
+        registry를 지정하면 해당 npm 레지스트리를, package_source를 지정하면
+        해당 디렉토리의 tarball을 사용합니다.
+        """
+        install_specs = []
+        for spec in specs:
+            if package_source:
+                tarball = self._find_tarball(package_source, npm_package_name(spec))
+                if tarball is None:
+                    print_colored(f"{package_source}에서 패키지를 찾을 수 없습니다: {spec}", Colors.FAIL)
+                    return False
+                install_specs.append(str(tarball.resolve()))
+            else:
+                install_specs.append(spec)
         
+        self.root.mkdir(exist_ok=True, parents=True)
+        package_json = self.root / 'package.json'
+        if not package_json.exists():
+            write_json_atomic(package_json, {'name': 'mcp-setup-package-cache', 'private': True})
+        
+        argv = ['npm', 'install', '--prefix', str(self.root), '--no-audit', '--no-fund']
+        if registry:
+            argv += ['--registry', registry]
+        argv += install_specs
+        if OSInfo.is_windows():
+            argv = ['cmd', '/c'] + argv
+        
+        print_colored(f"패키지 캐시 준비: {' '.join(specs)} -> {self.root}", Colors.CYAN)
+        result = run_command(argv, max_lines=50, name='npm install')
+        if result.error:
+            print_colored(f"npm 실행 오류: {result.error}", Colors.FAIL)
+            return False
+        if not result.ok:
+            print_colored(f"패키지 캐시 준비 실패: {result.describe_failure()}", Colors.FAIL)
+            return False
+        
+        manifest = dict(self.manifest())
+        for spec in specs:
+            name = npm_package_name(spec)
+            entry = self._read_installed(name)
+            if entry is None:
+                print_colored(f"설치된 패키지 정보를 읽을 수 없습니다: {name}", Colors.FAIL)
+                return False
+            entry['spec'] = spec
+            manifest[name] = entry
+            print_colored(f"  {name}@{entry['version']} 고정", Colors.GREEN)
+        
+        write_json_atomic(self.manifest_path, {'version': 1, 'packages': manifest})
+        self._manifest = manifest
+        return True
+    
+    def _read_installed(self, name: str) -> Optional[Dict]:
+        """node_modules에 설치된 패키지의 버전과 실행 파일 경로 읽기"""
+        package_dir = self.root / 'node_modules' / name
         try:
-            cmd = "node --version" if not OSInfo.is_windows() else "cmd /c node --version"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-            if result.returncode == 0:
-                return result.stdout.strip()
+            with open(package_dir / 'package.json', 'r', encoding='utf-8') as f:
+                package = json.load(f)
+        except (OSError, ValueError):
             return None
-        except Exception:
+        
+        bin_field = package.get('bin')
+        if isinstance(bin_field, dict):
+            short_name = name.rsplit('/', 1)[-1]
+            bin_rel = bin_field.get(short_name) or next(iter(bin_field.values()), None)
+        else:
+            bin_rel = bin_field
+        if not bin_rel:
             return None
+        return {
+            'version': package.get('version', ''),
+            'bin': str((package_dir / bin_rel).resolve()),
+        }
 
-class MCPInstaller:
-    """MCP 설치 클래스"""
-    def __init__(self):
-        self.os_type = OSInfo.get_os_type()
+class InstallState:
+    """설치 완료 기록
+
+    서버 이름, 설치 명령(패키지 명세 포함), Node.js 버전이 모두 같은 설치에
+    이미 성공했다면 다시 설치하지 않습니다. 설치 명령에는 토큰이 들어갈 수
+    있으므로 명령 자체가 아닌 해시만 저장합니다.
+    """
+    STATE_FILE = 'install_state.json'
     
-    def run_install_command(self, command):
-        """설치 명령어 실행"""
+    def __init__(self, path: Optional[Path] = None):
+        import threading
+        
+        self.path = Path(path) if path else get_cache_dir() / self.STATE_FILE
+        self._entries = None
+        self._changes = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def spec_digest(argv: List[str]) -> str:
+        """설치 명령의 해시"""
+        import hashlib
+        return hashlib.sha256(json.dumps(argv).encode('utf-8')).hexdigest()
+    
+    def _read(self) -> Dict[str, Dict]:
         try:
-            print_colored(f"명령 실행: {command}", Colors.CYAN)
-            result = subprocess.run(command, shell=True, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                print_colored("설치 성공!", Colors.GREEN)
-                return True, result.stdout
-            else:
-                print_colored(f"설치 실패: {result.stderr}", Colors.FAIL)
-                return False, result.stderr
-        except Exception as e:
-            print_colored(f"설치 명령 실행 중 오류: {str(e)}", Colors.FAIL)
-            return False, str(e)
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        servers = data.get('servers') if isinstance(data, dict) else None
+        return servers if isinstance(servers, dict) else {}
+    
+    def entries(self) -> Dict[str, Dict]:
+        """서버별 설치 기록 ({이름: {spec, node, installed_at, elapsed}})"""
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._read()
+            return self._entries
+    
+    def is_installed(self, name: str, digest: str, node_version: str) -> bool:
+        """같은 조건으로 설치에 성공한 기록이 있는지 확인"""
+        entry = self.entries().get(name)
+        return (isinstance(entry, dict) and entry.get('spec') == digest
+                and entry.get('node') == node_version)
+    
+    def record(self, name: str, digest: str, node_version: str, elapsed: float) -> None:
+        """설치 성공 기록 (save() 전까지는 메모리에만 보관)"""
+        entry = {
+            'spec': digest,
+            'node': node_version,
+            'installed_at': time.time(),
+            'elapsed': round(elapsed, 3),
+        }
+        self.entries()
+        with self._lock:
+            self._entries[name] = entry
+            self._changes[name] = entry
+    
+    def forget(self, name: str) -> None:
+        """설치 기록 삭제 (재설치에 실패한 경우)"""
+        self.entries()
+        with self._lock:
+            if name in self._entries:
+                del self._entries[name]
+                self._changes[name] = None
+    
+    def save(self, lock_timeout: float = 10.0) -> bool:
+        """변경된 기록을 파일에 병합해 저장
+
+        다른 프로세스가 그 사이에 기록한 서버는 그대로 둡니다.
+        """
+        with self._lock:
+            changes, self._changes = self._changes, {}
+        if not changes:
+            return True
+        try:
+            with Tracer.span('install_state.save', 'config', servers=len(changes)), \
+                    FileLock(self.path.with_name(self.path.name + '.lock'), lock_timeout):
+                servers = self._read()
+                for name, entry in changes.items():
+                    if entry is None:
+                        servers.pop(name, None)
+                    else:
+                        servers[name] = entry
+                write_json_atomic(self.path, {'version': 1, 'servers': servers})
+        except (OSError, LockTimeout) as e:
+            print_colored(f"설치 기록을 저장할 수 없습니다: {str(e)}", Colors.WARNING)
+            return False
+        return True
+
+class MCPInstaller:
+    """MCP 설치 클래스
+
+    state가 주어지면 같은 조건으로 이미 설치된 서버는 건너뛰고(force가 아니면),
+    실패한 설치는 retries번까지 지수 백오프와 지터를 두고 다시 시도합니다.
+    """
+    # 설치 기록이 있어 실행하지 않은 단계의 출력
+    CACHED = "이미 설치됨"
+    DEFAULT_RETRIES = 2
+    DEFAULT_RETRY_DELAY = 2.0
+    MAX_RETRY_DELAY = 30.0
     
-    def install_sequential_thinking(self):
-        """Sequential Thinking MCP 설치"""
-        base_cmd = "npx -y @smithery/cli@latest install @smithery-ai/server-sequential-thinking --client cursor --key f120217f-d8f9-4b5e-b9c9-cf9feb0aad83"
+    def __init__(self, package_cache: Optional[PackageCache] = None, timeout: Optional[float] = None,
+                 state: Optional[InstallState] = None, force: bool = False,
+                 retries: int = DEFAULT_RETRIES, retry_delay: float = DEFAULT_RETRY_DELAY):
+        import threading
         
-        if OSInfo.is_windows():
-            cmd = f"cmd /c {base_cmd}"
-        else:
-            cmd = base_cmd
+        self.os_type = OSInfo.get_os_type()
+        self.package_cache = package_cache
+        self.timeout = timeout
+        self.state = state
+        self.force = force
+        self.retries = max(0, retries)
+        self.retry_delay = retry_delay
+        self._env = None
         
-        return self.run_install_command(cmd)
+        # 캐시된 Smithery CLI가 있으면 npx 대신 직접 실행하고 npm은 오프라인으로 동작
+        if package_cache is not None and package_cache.get(PackageCache.SMITHERY_CLI) is not None:
+            self._env = dict(os.environ, npm_config_offline='true')
+        self._print_lock = threading.Lock()
+        self._cancel = threading.Event()
+    
+    def _print(self, text: str, color: str):
+        """여러 스레드에서 출력이 섞이지 않도록 잠금 후 출력"""
+        with self._print_lock:
+            print_colored(text, color)
     
-    def install_think_server(self):
-        """Think MCP Server 설치"""
-        base_cmd = "npx -y @smithery/cli@latest install @PhillipRt/think-mcp-server --client cursor --key f120217f-d8f9-4b5e-b9c9-cf9feb0aad83"
+    def run_install_command(self, argv: List[str], label=None):
+        """설치 명령어를 셸 없이 실행
+
+        label이 주어지면 출력을 한 줄씩 `[label]` 접두어와 함께 스트리밍합니다.
+        timeout초가 지나거나 cancel()이 호출되면 명령을 중단합니다.
+        """
+        prefix = f"[{label}] " if label else ''
+        if self._cancel.is_set():
+            return False, "취소됨"
         
-        if OSInfo.is_windows():
-            cmd = f"cmd /c {base_cmd}"
-        else:
-            cmd = base_cmd
+        self._print(f"{prefix}명령 실행: {format_command(argv)}", Colors.CYAN)
+        on_line = (lambda stream, line: self._print(f"{prefix}{line}", Colors.ENDC)) if label else None
+        result = run_command(argv, env=self._env, timeout=self.timeout, cancel=self._cancel,
+                             on_line=on_line, name='install command')
+        
+        if result.ok:
+            self._print(f"{prefix}설치 성공!", Colors.GREEN)
+            return True, result.output
+        if result.cancelled:
+            self._print(f"{prefix}설치 취소됨", Colors.WARNING)
+            return False, "취소됨"
+        
+        # 스트리밍한 경우 출력은 이미 표시했으므로 원인만 표시
+        reason = result.describe_failure()
+        self._print(f"{prefix}설치 실패: {reason.splitlines()[0] if label else reason}", Colors.FAIL)
+        return False, result.output or reason
+    
+    def cancel(self):
+        """진행 중인 설치 명령을 모두 중단"""
+        self._cancel.set()
+    
+    def retry_delays(self):
+        """재시도 전 대기 시간(초) 목록 (지수 백오프, 절반은 무작위 지터)"""
+        import random
         
-        return self.run_install_command(cmd)
+        for attempt in range(self.retries):
+            delay = min(self.retry_delay * 2 ** attempt, self.MAX_RETRY_DELAY)
+            yield delay / 2 + random.uniform(0, delay / 2)
+    
+    def run_with_retries(self, argv: List[str], label=None):
+        """설치 명령을 실행하고 실패하면 백오프 후 다시 시도"""
+        prefix = f"[{label}] " if label else ''
+        success, output = self.run_install_command(argv, label)
+        delays = self.retry_delays()
+        for attempt, delay in enumerate(delays, 1):
+            if success or self._cancel.is_set():
+                break
+            self._print(f"{prefix}{delay:.1f}초 후 다시 시도합니다 ({attempt}/{self.retries})", Colors.WARNING)
+            # cancel()이 호출되면 대기를 바로 끝냄
+            if self._cancel.wait(delay):
+                return False, "취소됨"
+            success, output = self.run_install_command(argv, label)
+        return success, output
     
-    def install_github(self, token):
-        """GitHub MCP 설치"""
-        # 토큰에서 따옴표 처리
-        token = token.replace('"', '\\"')
+    def install_server(self, template: 'ServerTemplate', values: Optional[Dict[str, str]] = None, label=None):
+        """서버 템플릿의 설치 명령 실행
+
+        설치 기록과 조건이 같으면 명령을 실행하지 않고 (True, CACHED)를 반환합니다.
+        """
+        try:
+            command, args = template.command_args('install', OSInfo.is_windows(), values, self.package_cache)
+        except ValueError as e:
+            print_colored(str(e), Colors.FAIL)
+            return False, str(e)
+        argv = [command] + args
+        if self.state is None:
+            return self.run_with_retries(argv, label)
         
-        base_cmd = f'npx -y @smithery/cli@latest install @smithery-ai/github --client cursor --config "\\"{{\\\"githubPersonalAccessToken\\\":\\\"{token}\\\"}}\\"" '
+        digest = InstallState.spec_digest(argv)
+        node_version = NodeJSChecker.get_nodejs_version()
+        if not self.force and self.state.is_installed(template.name, digest, node_version):
+            prefix = f"[{label}] " if label else ''
+            self._print(f"{prefix}이미 설치되어 있어 건너뜁니다 (--force로 다시 설치)", Colors.CYAN)
+            return True, self.CACHED
         
-        if OSInfo.is_windows():
-            cmd = f"cmd /c {base_cmd}"
+        started = time.monotonic()
+        success, output = self.run_with_retries(argv, label)
+        if success:
+            self.state.record(template.name, digest, node_version, time.monotonic() - started)
         else:
-            cmd = base_cmd
+            self.state.forget(template.name)
+        return success, output
+    
+    def is_installed(self, template: 'ServerTemplate', values: Optional[Dict[str, str]] = None) -> bool:
+        """install_server()가 설치를 건너뛸지 (force이거나 기록이 없으면 False)"""
+        if self.state is None or self.force:
+            return False
+        try:
+            command, args = template.command_args('install', OSInfo.is_windows(), values, self.package_cache)
+        except ValueError:
+            return False
+        return self.state.is_installed(template.name, InstallState.spec_digest([command] + args),
+                                       NodeJSChecker.get_nodejs_version())
+    
+    def get_install_steps(self, github_token=None) -> List[tuple]:
+        """설치 단계 목록 반환 (이름, 제목, 설치 함수)
+
+        서버 템플릿 레지스트리의 default 묶음과, 토큰이 있으면 github 묶음을
+        설치합니다.
+        """
+        from functools import partial
         
-        return self.run_install_command(cmd)
+        registry = ServerRegistry.load()
+        steps = [
+            (template.name, template.title, partial(self.install_server, template))
+            for template in registry.resolve(['default'])
+        ]
+        if github_token:
+            values = {'token': github_token}
+            steps += [
+                (template.name, template.title, partial(self.install_server, template, values))
+                for template in registry.resolve(['github'])
+            ]
+        return steps
     
-    def install_all_mcps(self, github_token=None):
-        """모든 MCP 설치"""
+    def install_all_mcps(self, github_token=None, parallel=False, max_workers=None, fail_fast=False):
+        """모든 MCP 설치
+
+        parallel이 True이면 설치 단계를 스레드 풀에서 동시에 실행합니다.
+        fail_fast가 True이면 첫 실패 시 남은 단계를 취소합니다.
+        """
         # Node.js 설치 확인
         if not NodeJSChecker.is_nodejs_installed():
             print_colored("Node.js가 설치되어 있어야 합니다.", Colors.FAIL)
@@ -169,468 +1006,5269 @@ class MCPInstaller:
         node_version = NodeJSChecker.get_nodejs_version()
         print_colored(f"감지된 Node.js 버전: {node_version}", Colors.CYAN)
         
-        # Sequential Thinking MCP 설치
-        print_colored("\n===== Sequential Thinking MCP 설치 =====", Colors.HEADER)
-        success_seq, _ = self.install_sequential_thinking()
+        try:
+            steps = self.get_install_steps(github_token)
+        except (OSError, ValueError) as e:
+            print_colored(f"서버 템플릿을 읽을 수 없습니다: {str(e)}", Colors.FAIL)
+            return False
+        results = self.run_install_steps(steps, parallel, max_workers, fail_fast)
+        return all(status in ('success', 'cached') for _, status, _ in results)
+    
+    def run_install_steps(self, steps: List[tuple], parallel: bool = False, max_workers: Optional[int] = None,
+                          fail_fast: bool = False) -> List[tuple]:
+        """설치 단계를 실행하고 설치 기록 저장과 결과 요약 출력
+
+        (이름, 상태, 소요 시간) 목록을 반환합니다.
+        """
+        if parallel:
+            results = self._install_parallel(steps, max_workers, fail_fast)
+        else:
+            results = self._install_sequential(steps, fail_fast)
         
-        # Think Server MCP 설치
-        print_colored("\n===== Think Server MCP 설치 =====", Colors.HEADER)
-        success_think, _ = self.install_think_server()
+        if self.state is not None:
+            self.state.save()
         
-        # GitHub MCP 설치 (토큰이 제공된 경우)
-        success_github = True
-        if github_token:
-            print_colored("\n===== GitHub MCP 설치 =====", Colors.HEADER)
-            success_github, _ = self.install_github(github_token)
+        self.print_install_report(results)
+        return results
+    
+    def _install_sequential(self, steps, fail_fast=False) -> List[tuple]:
+        """설치 단계를 순서대로 실행"""
+        results = []
+        failed = False
+        for name, title, install in steps:
+            if failed:
+                results.append((name, 'cancelled', 0.0))
+                continue
+            print_colored(f"\n===== {title} 설치 =====", Colors.HEADER)
+            started = time.monotonic()
+            with Tracer.span(f"install {name}", 'install') as span:
+                success, output = install()
+                span.set(success=success, cached=output is self.CACHED)
+            results.append((name, self._status(success, output), time.monotonic() - started))
+            if not success and fail_fast:
+                failed = True
+        return results
+    
+    def _install_parallel(self, steps, max_workers=None, fail_fast=False) -> List[tuple]:
+        """설치 단계를 스레드 풀에서 동시에 실행"""
+        from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
         
-        return success_seq and success_think and success_github
-
-class MCPSetup:
-    def __init__(self):
-        self.os_type = OSInfo.get_os_type()
-        self.home_dir = OSInfo.get_home_dir()
+        workers = max(1, max_workers or len(steps))
+        print_colored(f"\n===== MCP 병렬 설치 (작업자 {workers}개) =====", Colors.HEADER)
         
-        # OS별 Cursor 설정 경로
-        if OSInfo.is_windows():
-            # Windows에서는 %USERPROFILE%\.cursor
-            self.cursor_dir = self.home_dir / '.cursor'
-        elif OSInfo.is_macos():
-            # macOS에서는 ~/Library/Application Support/Cursor
-            self.cursor_dir = self.home_dir / 'Library' / 'Application Support' / 'Cursor'
-        else:
-            # Linux에서는 ~/.cursor
-            self.cursor_dir = self.home_dir / '.cursor'
-            
-        self.mcp_json_path = self.cursor_dir / 'mcp.json'
-        self.current_dir = Path.cwd()
-        self.target_dir = self.current_dir / 'mcp_setup'
-        self.backup_dir = self.target_dir / 'backups'
+        parent_span = Tracer.current()
         
-        # 필요한 디렉토리 생성
-        self.backup_dir.mkdir(exist_ok=True, parents=True)
+        def timed(install, name):
+            started = time.monotonic()
+            with Tracer.attach(parent_span), Tracer.span(f"install {name}", 'install') as span:
+                success, output = install(label=name)
+                span.set(success=success, cached=output is self.CACHED)
+            return self._status(success, output), time.monotonic() - started
         
-        # OS 정보 출력
-        print_colored(f"감지된 운영 체제: {self.os_type}", Colors.CYAN)
-        print_colored(f"Cursor 설정 경로: {self.cursor_dir}", Colors.CYAN)
+        statuses = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(timed, install, name): name for name, _, install in steps}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures[future]
+                    if future.cancelled():
+                        continue
+                    try:
+                        status, elapsed = future.result()
+                    except Exception as e:
+                        self._print(f"[{name}] 설치 중 오류: {str(e)}", Colors.FAIL)
+                        status, elapsed = 'failed', 0.0
+                    if status == 'failed' and self._cancel.is_set():
+                        statuses[name] = ('cancelled', elapsed)
+                        continue
+                    statuses[name] = (status, elapsed)
+                    if status == 'failed' and fail_fast and not self._cancel.is_set():
+                        self._print(f"[{name}] 설치 실패로 나머지 설치를 중단합니다.", Colors.WARNING)
+                        for other in pending:
+                            other.cancel()
+                        self.cancel()
+        
+        return [(name,) + statuses.get(name, ('cancelled', 0.0)) for name, _, _ in steps]
     
-    def load_mcp_config(self) -> Dict:
-        """MCP 설정 파일 로드"""
-        if not self.mcp_json_path.exists():
-            print_colored(f"MCP 설정 파일을 찾을 수 없습니다: {self.mcp_json_path}", Colors.WARNING)
-            return {}
+    def _status(self, success: bool, output) -> str:
+        """설치 함수 결과를 보고서 상태로 변환"""
+        if not success:
+            return 'failed'
+        return 'cached' if output is self.CACHED else 'success'
+    
+    def print_install_report(self, results: List[tuple]) -> None:
+        """설치 결과 요약 출력"""
+        labels = {
+            'success': ("성공", Colors.GREEN),
+            'failed': ("실패", Colors.FAIL),
+            'cancelled': ("취소", Colors.WARNING),
+            'cached': ("설치됨", Colors.CYAN),
+        }
+        print_colored("\n===== MCP 설치 결과 =====", Colors.HEADER)
+        for name, status, elapsed in results:
+            text, color = labels[status]
+            print_colored(f"  {name:<22} {text} ({elapsed:.1f}s)", color)
+        failed = sum(1 for _, status, _ in results if status not in ('success', 'cached'))
+        summary = f"총 {len(results)}개 중 {len(results) - failed}개 성공"
+        print_colored(summary, Colors.GREEN if not failed else Colors.FAIL)
 
-        try:
-            with open(self.mcp_json_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            print_colored(f"MCP 설정 파일 파싱 오류: {self.mcp_json_path}", Colors.FAIL)
-            return {}
-        except Exception as e:
-            print_colored(f"MCP 설정 파일 읽기 오류: {str(e)}", Colors.FAIL)
-            return {}
+class LockTimeout(TimeoutError):
+    """설정 파일 잠금 대기 시간 초과"""
+
+class FileLock:
+    """프로세스 간 권고 잠금
+
+    POSIX에서는 fcntl.flock, Windows에서는 msvcrt.locking을 사용하며
+    timeout초 안에 잠금을 얻지 못하면 LockTimeout을 발생시킵니다.
+    """
+    def __init__(self, path: Path, timeout: float = 10.0, poll_interval: float = 0.05):
+        self.path = Path(path)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._fd = None
     
-    def backup_mcp_config(self) -> bool:
-        """MCP 설정 파일 백업"""
-        if not self.mcp_json_path.exists():
-            print_colored("백업할 MCP 설정 파일이 없습니다.", Colors.WARNING)
-            return False
-        
-        backup_file = self.backup_dir / f"mcp_backup_{os.urandom(4).hex()}.json"
-        try:
-            shutil.copy2(self.mcp_json_path, backup_file)
-            print_colored(f"MCP 설정 백업 완료: {backup_file}", Colors.GREEN)
-            return True
-        except Exception as e:
-            print_colored(f"MCP 설정 백업 오류: {str(e)}", Colors.FAIL)
-            return False
+    def acquire(self) -> None:
+        """잠금 획득"""
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._try_lock(fd)
+                self._fd = fd
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise LockTimeout(f"설정 파일 잠금 대기 시간 초과 ({self.timeout}초): {self.path}")
+                time.sleep(self.poll_interval)
     
-    def save_mcp_config(self, config: Dict) -> bool:
-        """MCP 설정 파일 저장"""
+    def release(self) -> None:
+        """잠금 해제"""
+        if self._fd is None:
+            return
         try:
-            # 디렉토리가 없으면 생성
-            self.cursor_dir.mkdir(exist_ok=True, parents=True)
-            
-            with open(self.mcp_json_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
-            
-            print_colored(f"MCP 설정 저장 완료: {self.mcp_json_path}", Colors.GREEN)
-            return True
-        except Exception as e:
-            print_colored(f"MCP 설정 저장 오류: {str(e)}", Colors.FAIL)
-            return False
+            self._unlock(self._fd)
+        finally:
+            os.close(self._fd)
+            self._fd = None
     
-    def get_mcp_command_args(self, base_args: List[str], command_type: str = 'default') -> tuple:
-        """OS별 MCP 명령어와 인자 반환"""
-        if OSInfo.is_windows():
-            # Windows에서는 cmd /c npx ... 형태로 실행
-            return 'cmd', ['/c', 'npx'] + base_args
+    @staticmethod
+    def _try_lock(fd: int) -> None:
+        if os.name == 'nt':
+            import msvcrt
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
         else:
-            # macOS, Linux에서는 npx ... 형태로 실행
-            return 'npx', base_args
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
     
-    def add_mcp_server(self, name: str, command: str, args: List[str]) -> bool:
-        """MCP 서버 추가"""
-        config = self.load_mcp_config()
+    @staticmethod
+    def _unlock(fd: int) -> None:
+        if os.name == 'nt':
+            import msvcrt
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+def atomic_write(path: Path, write: Callable[[Any], None], fsync: bool = True, mode: str = 'w') -> None:
+    """임시 파일에 쓴 뒤 fsync 후 원자적으로 교체
+
+    write는 열린 파일 객체(mode가 'w'이면 UTF-8 텍스트, 'wb'이면 바이너리)를
+    받아 내용을 기록하는 함수입니다.
+    중간에 실패하거나 프로세스가 종료되어도 기존 파일은 그대로 남습니다.
+    fsync가 False이면 교체는 원자적이지만 디스크 반영은 운영 체제에 맡깁니다.
+    """
+    import tempfile
+    
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix='.tmp', dir=str(path.parent))
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            write(f)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
         
-        # mcpServers 키가 없으면 생성
-        if 'mcpServers' not in config:
-            config['mcpServers'] = {}
+        # 기존 파일 권한 유지 (mkstemp는 0600으로 생성)
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
         
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    
+    # 이름 변경이 디스크에 반영되도록 디렉토리도 fsync
+    if fsync and os.name != 'nt':
+        dir_fd = os.open(str(path.parent), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def write_json_atomic(path: Path, data: Any, indent: Optional[int] = 2, fsync: bool = True) -> None:
+    """JSON 파일을 원자적으로 저장"""
+    atomic_write(path, lambda f: json.dump(data, f, indent=indent, ensure_ascii=False), fsync)
+
+class JSONStreamReader:
+    """JSON 문서를 청크 단위로 읽으며 객체 멤버를 하나씩 파싱
+
+    이미 처리한 부분은 버퍼에서 버리므로 메모리 사용량은 가장 큰 멤버 하나의
+    크기 정도로 유지됩니다.
+    """
+    WHITESPACE = ' \t\r\n'
+    DELIMITERS = ',:]}' + WHITESPACE
+    
+    def __init__(self, f, chunk_size: int = 1 << 16):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+    
+    def _fill(self, min_size: int = 0) -> bool:
+        """버퍼에 데이터를 더 읽어옴 (파일 끝이면 False)"""
+        if self._eof:
+            return False
+        data = self._f.read(max(self._chunk_size, min_size))
+        if not data:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+    
+    def peek(self) -> str:
+        """공백을 건너뛰고 다음 문자 반환 (문서 끝이면 빈 문자열)"""
+        while True:
+            buf, pos = self._buf, self._pos
+            while pos < len(buf) and buf[pos] in self.WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ''
+    
+    def _expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self._buf, self._pos)
+        self._pos += 1
+    
+    def read_value(self) -> Any:
+        """다음 JSON 값 하나를 읽음"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+                # 숫자는 버퍼 경계에서 잘려도 파싱되므로(예: '-2.5e10'의 '-2.5')
+                # 구분 문자가 뒤따를 때만 완성된 값으로 봄
+                complete = end < len(self._buf) and (
+                    not isinstance(value, (int, float)) or self._buf[end] in self.DELIMITERS
+                )
+                if complete or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            # 재시도 비용이 선형으로 유지되도록 버퍼를 두 배씩 늘림
+            self._fill((len(self._buf) - self._pos) * 2)
+    
+    def iter_object(self):
+        """객체의 키를 차례로 반환
+
+        키를 반환한 뒤에는 호출자가 read_value() 또는 iter_object()로 값을
+        소비해야 합니다.
+        """
+        self._expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Expecting property name", self._buf, self._pos)
+            self._expect(':')
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", self._buf, self._pos - 1)
+    
+    def finish(self) -> None:
+        """문서 끝에 불필요한 데이터가 없는지 확인"""
+        if self.peek():
+            raise json.JSONDecodeError("Extra data", self._buf, self._pos)
+
+class JSONStreamWriter:
+    """JSON 객체 멤버를 하나씩 기록
+
+    indent가 정수이면 json.dump(indent=...)와 같은 형식으로, None이면 공백
+    없는 압축 형식으로 기록합니다.
+    """
+    def __init__(self, f, indent: Optional[int] = 2):
+        self._f = f
+        self._indent = indent
+        self._first = []
+        # 값마다 인코더를 새로 만들지 않도록 재사용
+        self._key_encoder = json.JSONEncoder(ensure_ascii=False)
+        if indent is None:
+            self._value_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+        else:
+            self._value_encoder = json.JSONEncoder(ensure_ascii=False, indent=indent)
+    
+    def _newline(self) -> str:
+        if self._indent is None:
+            return ''
+        return '\n' + ' ' * (self._indent * len(self._first))
+    
+    def begin_object(self) -> None:
+        self._f.write('{')
+        self._first.append(True)
+    
+    def key(self, name: str) -> None:
+        if not self._first[-1]:
+            self._f.write(',')
+        self._first[-1] = False
+        separator = ':' if self._indent is None else ': '
+        self._f.write(self._newline() + self._key_encoder.encode(name) + separator)
+    
+    def value(self, value: Any) -> None:
+        text = self._value_encoder.encode(value)
+        if self._indent is not None:
+            text = text.replace('\n', self._newline())
+        self._f.write(text)
+    
+    def members(self, items: List[tuple]) -> None:
+        """여러 멤버를 한 번에 기록
+
+        들여쓰기 모드에서는 값마다 인코더를 호출하는 비용이 크므로 여러 항목을
+        하나의 객체로 인코딩한 뒤 바깥 중괄호만 떼어 기록합니다.
+        """
+        if not items:
+            return
+        text = self._value_encoder.encode(dict(items))
+        if self._indent is None:
+            text = text[1:-1]
+        else:
+            # '{\n' + 한 단계 들여쓴 멤버들 + '\n}'
+            outer = ' ' * (self._indent * (len(self._first) - 1))
+            text = '\n' + outer + text[2:-2].replace('\n', '\n' + outer)
+        if not self._first[-1]:
+            self._f.write(',')
+        self._first[-1] = False
+        self._f.write(text)
+    
+    def end_object(self) -> None:
+        empty = self._first.pop()
+        if not empty:
+            self._f.write(self._newline())
+        self._f.write('}')
+
+def convert_server_for_os(server: Any, windows: bool) -> Any:
+    """서버 설정을 대상 OS의 명령어 형식으로 변환"""
+    if not isinstance(server, dict):
+        return server
+    command = server.get('command', '')
+    args = server.get('args', [])
+    if not isinstance(args, list):
+        return server
+    
+    # Windows와 다른 OS 사이의 명령어 변환
+    if windows and command == "npx":
+        # 다른 OS 형식(npx)에서 Windows 형식(cmd /c npx)으로 변환
+        server['command'] = 'cmd'
+        server['args'] = ['/c', 'npx'] + args
+    elif not windows and command == "cmd" and args[:2] == ["/c", "npx"]:
+        # Windows 형식(cmd /c npx)에서 다른 OS 형식(npx)으로 변환
+        server['command'] = 'npx'
+        server['args'] = args[2:]  # '/c'와 'npx' 제거
+    return server
+
+def stream_mcp_config(src, dst, transform: Optional[Callable[[str, Any], Any]] = None,
+                      indent: Optional[int] = 2, batch_size: int = 512) -> int:
+    """MCP 설정을 src에서 dst로 스트리밍 복사
+
+    mcpServers 항목은 하나씩 읽어 transform(name, server)을 적용하고
+    batch_size개씩 모아 기록하므로 전체 문서를 메모리에 올리지 않습니다.
+    기록한 서버 수를 반환합니다.
+    """
+    reader = JSONStreamReader(src)
+    writer = JSONStreamWriter(dst, indent)
+    count = 0
+    
+    writer.begin_object()
+    for key in reader.iter_object():
+        writer.key(key)
+        if key == 'mcpServers' and reader.peek() == '{':
+            writer.begin_object()
+            batch = []
+            for name in reader.iter_object():
+                server = reader.read_value()
+                if transform is not None:
+                    server = transform(name, server)
+                batch.append((name, server))
+                count += 1
+                if len(batch) >= batch_size:
+                    writer.members(batch)
+                    batch = []
+            writer.members(batch)
+            writer.end_object()
+        else:
+            writer.value(reader.read_value())
+    writer.end_object()
+    reader.finish()
+    return count
+
+def iter_mcp_servers(src):
+    """MCP 설정 파일에서 mcpServers 항목을 (이름, 설정) 쌍으로 하나씩 반환"""
+    reader = JSONStreamReader(src)
+    for key in reader.iter_object():
+        if key == 'mcpServers' and reader.peek() == '{':
+            for name in reader.iter_object():
+                yield name, reader.read_value()
+        else:
+            reader.read_value()
+    reader.finish()
+
+class ConfigValidationError(ValueError):
+    """MCP 설정 검증 오류 (발견한 문제를 모두 errors에 보관)"""
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        more = f" 외 {len(errors) - 1}개" if len(errors) > 1 else ''
+        super().__init__(f"{errors[0]}{more}")
+
+def validate_server_entry(name: str, server: Any) -> List[str]:
+    """mcpServers 항목 하나의 구조 검사 (문제 목록 반환)"""
+    if not isinstance(server, dict):
+        return [f"{name}: 서버 설정은 JSON 객체여야 합니다."]
+    errors = []
+    command = server.get('command')
+    if command is None:
+        if not isinstance(server.get('url'), str):
+            errors.append(f"{name}: 'command' 또는 'url'이 필요합니다.")
+    elif not isinstance(command, str) or not command:
+        errors.append(f"{name}: 'command'는 빈 문자열이 아닌 문자열이어야 합니다.")
+    args = server.get('args', [])
+    if not isinstance(args, list):
+        errors.append(f"{name}: 'args'는 목록이어야 합니다.")
+    else:
+        for i, arg in enumerate(args):
+            if not isinstance(arg, str):
+                errors.append(f"{name}: args[{i}]는 문자열이어야 합니다 ({type(arg).__name__}).")
+    env = server.get('env', {})
+    if not isinstance(env, dict):
+        errors.append(f"{name}: 'env'는 JSON 객체여야 합니다.")
+    else:
+        for key, value in env.items():
+            if not isinstance(value, str):
+                errors.append(f"{name}: env[{key!r}]는 문자열이어야 합니다.")
+    return errors
+
+class ServerRecord:
+    """검증된 mcpServers 항목
+
+    os_form은 명령어 형식입니다: posix(npx ...), windows(cmd /c npx ...),
+    node(캐시된 실행 파일을 node로 직접 실행), remote(url), other.
+    packages는 항목이 참조하는 npm 패키지 이름(버전 제외)입니다.
+    """
+    __slots__ = ('name', 'command', 'args', 'url', 'os_form', 'packages')
+    OS_FORMS = ('posix', 'windows', 'node', 'remote', 'other')
+    
+    def __init__(self, name: str, command: str, args: tuple, url: Optional[str] = None):
+        self.name = name
+        self.command = command
+        self.args = args
+        self.url = url
+        self.os_form, self.packages = self.classify(command, args, url)
+    
+    @classmethod
+    def parse(cls, name: str, server: Any, errors: List[str]) -> Optional['ServerRecord']:
+        """항목을 검사해 레코드 생성 (문제가 있으면 errors에 추가하고 None 반환)"""
+        problems = validate_server_entry(name, server)
+        if problems:
+            errors.extend(problems)
+            return None
+        return cls(name, server.get('command', ''), tuple(server.get('args', ())), server.get('url'))
+    
+    @staticmethod
+    def classify(command: str, args: tuple, url: Optional[str] = None) -> tuple:
+        """명령어 형식과 참조하는 npm 패키지 판별"""
+        if not command:
+            return ('remote' if url else 'other'), ()
+        base = command.replace('\\', '/').rsplit('/', 1)[-1].lower()
+        for wrapper in ('launch', 'limit'):
+            if base.startswith('python') and wrapper in args and '--' in args[args.index(wrapper):]:
+                # launch/limit 명령으로 감싼 항목은 실제 서버 명령으로 판별
+                inner = args[args.index('--', args.index(wrapper)) + 1:]
+                if inner:
+                    return ServerRecord.classify(inner[0], inner[1:])
+        packages = []
+        if base in ('cmd', 'cmd.exe') and [arg.lower() for arg in args[:2]] == ['/c', 'npx']:
+            os_form, rest = 'windows', args[2:]
+        elif base in ('npx', 'npx.cmd'):
+            os_form, rest = 'posix', args
+        elif base in ('node', 'node.exe') and args:
+            # 캐시된 실행 파일 경로 .../node_modules/<패키지>/... 에서 패키지 이름 추출
+            os_form, rest = 'node', ('',) + args[1:]
+            parts = args[0].replace('\\', '/').split('/')
+            if 'node_modules' in parts:
+                i = len(parts) - 1 - parts[::-1].index('node_modules')
+                scoped = i + 1 < len(parts) and parts[i + 1].startswith('@')
+                package = '/'.join(parts[i + 1:i + 3] if scoped else parts[i + 1:i + 2])
+                if package:
+                    packages.append(package)
+        else:
+            return 'other', ()
+        
+        # 옵션을 건너뛴 첫 위치 인자가 실행할 패키지, 그 뒤 run/install 다음이 서버 패키지
+        positional = [arg for arg in rest if not arg.startswith('-')]
+        if positional and positional[0]:
+            packages.append(npm_package_name(positional[0]))
+        if len(positional) > 2 and positional[1] in ('run', 'install'):
+            packages.append(npm_package_name(positional[2]))
+        return os_form, tuple(packages)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """목록 출력과 JSON 응답용 사전"""
+        return {
+            'name': self.name,
+            'command': self.command,
+            'args': list(self.args),
+            'url': self.url,
+            'os_form': self.os_form,
+            'packages': list(self.packages),
+        }
+
+class ServerIndex:
+    """mcpServers 레코드와 명령어/패키지/OS 형식별 보조 인덱스
+
+    설정을 한 번 훑으며 항목을 검사하고 인덱스를 만들며, 잘못된 항목은
+    errors에 모아 두고 인덱스에서 제외합니다.
+    """
+    FILTER_KEYS = ('name', 'command', 'package', 'os')
+    
+    def __init__(self):
+        self.records = {}
+        self.errors = []
+        self.by_command = {}
+        self.by_package = {}
+        self.by_os_form = {}
+        self._position = {}
+    
+    @classmethod
+    def build(cls, config: Any) -> 'ServerIndex':
+        """설정에서 인덱스 생성"""
+        index = cls()
+        if not isinstance(config, dict):
+            index.errors.append("최상위 값이 JSON 객체가 아닙니다.")
+            return index
+        servers = config.get('mcpServers', {})
+        if not isinstance(servers, dict):
+            index.errors.append("'mcpServers'는 JSON 객체여야 합니다.")
+            return index
+        
+        with Tracer.span('config.index', 'config', servers=len(servers)):
+            for name, server in servers.items():
+                record = ServerRecord.parse(name, server, index.errors)
+                if record is not None:
+                    index.add(record)
+        return index
+    
+    def add(self, record: ServerRecord) -> None:
+        """레코드를 추가하고 보조 인덱스 갱신"""
+        if record.name not in self._position:
+            self._position[record.name] = len(self._position)
+        self.records[record.name] = record
+        self.by_command.setdefault(record.command, []).append(record.name)
+        self.by_os_form.setdefault(record.os_form, []).append(record.name)
+        for package in record.packages:
+            self.by_package.setdefault(package, []).append(record.name)
+    
+    def uses_package(self, package: str) -> List[str]:
+        """패키지를 참조하는 서버 이름 (버전 명세는 무시)"""
+        return list(self.by_package.get(npm_package_name(package), ()))
+    
+    @classmethod
+    def parse_filter(cls, spec: str) -> tuple:
+        """`키=값` 필터를 (키, 값)으로 해석 (잘못된 필터는 ValueError)"""
+        key, sep, value = spec.partition('=')
+        if not sep or key not in cls.FILTER_KEYS or not value:
+            raise ValueError(f"필터는 {'|'.join(cls.FILTER_KEYS)}=값 형식이어야 합니다: {spec}")
+        if key == 'os' and value not in ServerRecord.OS_FORMS:
+            raise ValueError(f"os 필터는 {', '.join(ServerRecord.OS_FORMS)} 중 하나여야 합니다: {value}")
+        return key, value
+    
+    def query(self, filters: Optional[Dict[str, str]] = None) -> List[ServerRecord]:
+        """필터에 맞는 레코드 (설정 순서 유지)
+
+        command/package/os 필터는 인덱스에서 후보를 바로 찾고, name 필터는
+        와일드카드(fnmatch)로 후보만 검사합니다.
+        """
+        filters = filters or {}
+        candidates = None
+        for key, index in (('command', self.by_command), ('package', self.by_package), ('os', self.by_os_form)):
+            if key in filters:
+                value = npm_package_name(filters[key]) if key == 'package' else filters[key]
+                names = set(index.get(value, ()))
+                candidates = names if candidates is None else candidates & names
+        
+        if candidates is None:
+            records = list(self.records.values())
+        else:
+            records = [self.records[name] for name in sorted(candidates, key=self._position.__getitem__)]
+        
+        pattern = filters.get('name')
+        if pattern is not None:
+            from fnmatch import fnmatchcase
+            records = [record for record in records if fnmatchcase(record.name, pattern)]
+        return records
+
+class ServerDiff:
+    """서버 단위 설정 차이"""
+    def __init__(self):
+        self.added = []
+        self.changed = []
+        self.removed = []
+        self.unchanged = 0
+    
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+    
+    @classmethod
+    def compute(cls, current: Dict[str, Any], desired: Dict[str, Any], keep_missing: bool = False) -> 'ServerDiff':
+        """현재 서버 항목과 원하는 서버 항목의 차이 (keep_missing이면 제거하지 않음)"""
+        diff = cls()
+        for name, server in desired.items():
+            if name not in current:
+                diff.added.append(name)
+            elif current[name] != server:
+                diff.changed.append(name)
+            else:
+                diff.unchanged += 1
+        if not keep_missing:
+            diff.removed = [name for name in current if name not in desired]
+        return diff
+    
+    def print_summary(self) -> None:
+        """차이 출력"""
+        for name in self.added:
+            print_colored(f"  + {name}", Colors.GREEN)
+        for name in self.changed:
+            print_colored(f"  ~ {name}", Colors.WARNING)
+        for name in self.removed:
+            print_colored(f"  - {name}", Colors.FAIL)
+        print_colored(
+            f"추가 {len(self.added)}개, 변경 {len(self.changed)}개, 제거 {len(self.removed)}개, "
+            f"동일 {self.unchanged}개",
+            Colors.CYAN
+        )
+
+class BackupStore:
+    """내용 해시 기반 백업 저장소
+
+    백업은 SHA-256 해시를 이름으로 한 번만 저장되고, index.json에 생성 시각과
+    마지막 백업 시각이 기록됩니다. 내용이 같으면 파일을 다시 복사하지 않습니다.
+    """
+    INDEX_FILE = 'index.json'
+    DEFAULT_KEEP_LAST = 50
+    
+    def __init__(self, root: Path, lock_timeout: float = 10.0):
+        self.root = Path(root)
+        self.index_path = self.root / self.INDEX_FILE
+        self._lock = FileLock(self.root / 'index.lock', timeout=lock_timeout)
+    
+    def object_path(self, digest: str) -> Path:
+        """해시에 해당하는 백업 파일 경로"""
+        return self.root / f"{digest}.json"
+    
+    def entries(self) -> List[Dict]:
+        """백업 목록 (최근 백업 순)"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return []
+        entries = index.get('entries', []) if isinstance(index, dict) else []
+        return sorted(entries, key=lambda e: e.get('last_seen', 0), reverse=True)
+    
+    def _write_index(self, entries: List[Dict]) -> None:
+        write_json_atomic(self.index_path, {'version': 1, 'entries': entries})
+    
+    def add(self, data: bytes, source: str = '') -> tuple:
+        """백업 추가. (항목, 새로 저장했는지 여부) 반환"""
+        import hashlib
+        
+        digest = hashlib.sha256(data).hexdigest()
+        now = time.time()
+        self.root.mkdir(exist_ok=True, parents=True)
+        with self._lock:
+            entries = self.entries()
+            for entry in entries:
+                if entry['hash'] == digest and self.object_path(digest).exists():
+                    entry['last_seen'] = now
+                    self._write_index(entries)
+                    return entry, False
+            
+            entries = [e for e in entries if e['hash'] != digest]
+            atomic_write(self.object_path(digest), lambda f: f.write(data), mode='wb')
+            entry = {
+                'hash': digest,
+                'size': len(data),
+                'created': now,
+                'last_seen': now,
+                'source': source,
+            }
+            entries.insert(0, entry)
+            self._write_index(entries)
+            return entry, True
+    
+    def find(self, prefix: Optional[str] = None) -> Optional[Dict]:
+        """해시 접두어로 백업 찾기 (없으면 가장 최근 백업)"""
+        entries = self.entries()
+        if not prefix:
+            return entries[0] if entries else None
+        matches = [e for e in entries if e['hash'].startswith(prefix)]
+        if len(matches) > 1:
+            raise ValueError(f"해시 접두어가 여러 백업과 일치합니다: {prefix}")
+        return matches[0] if matches else None
+    
+    def read(self, entry: Dict) -> bytes:
+        """백업 내용 읽기"""
+        with open(self.object_path(entry['hash']), 'rb') as f:
+            return f.read()
+    
+    def prune(self, keep_last: Optional[int] = None, max_age_days: Optional[float] = None,
+              max_bytes: Optional[int] = None) -> List[Dict]:
+        """보존 정책에 따라 오래된 백업 삭제. 삭제된 항목 반환"""
+        if not self.index_path.exists():
+            return []
+        with self._lock:
+            entries = self.entries()
+            keep = list(entries)
+            if keep_last is not None:
+                keep = keep[:max(keep_last, 0)]
+            if max_age_days is not None:
+                cutoff = time.time() - max_age_days * 86400
+                keep = [e for e in keep if e.get('last_seen', 0) >= cutoff]
+            if max_bytes is not None:
+                total = 0
+                within = []
+                for entry in keep:
+                    total += entry.get('size', 0)
+                    if total > max_bytes:
+                        break
+                    within.append(entry)
+                keep = within
+            
+            kept = {e['hash'] for e in keep}
+            removed = [e for e in entries if e['hash'] not in kept]
+            if not removed:
+                return []
+            
+            self._write_index(keep)
+            for entry in removed:
+                try:
+                    self.object_path(entry['hash']).unlink()
+                except FileNotFoundError:
+                    pass
+            return removed
+
+def copy_mcp_config(config: Dict) -> Dict:
+    """트랜잭션에서 수정해도 원본이 바뀌지 않는 설정 사본
+
+    서버 항목은 교체만 되고 내부가 수정되지는 않으므로 mcpServers까지만
+    복사합니다.
+    """
+    copied = dict(config)
+    if isinstance(copied.get('mcpServers'), dict):
+        copied['mcpServers'] = dict(copied['mcpServers'])
+    return copied
+
+class ConfigTransaction:
+    """mcp.json 편집 트랜잭션
+
+    모든 변경은 메모리의 설정에 적용되고, 가장 바깥 트랜잭션이 끝날 때
+    변경 사항이 있으면 한 번만 저장됩니다.
+    """
+    def __init__(self, config: Dict):
+        self.config = config
+        self.dirty = False
+        self.rolled_back = False
+        self.saved = True
+    
+    @property
+    def servers(self) -> Dict:
+        """mcpServers 딕셔너리 반환 (없으면 생성)"""
+        if 'mcpServers' not in self.config:
+            self.config['mcpServers'] = {}
+        return self.config['mcpServers']
+    
+    def set_server(self, name: str, entry: Dict) -> None:
+        """서버 설정 추가 또는 교체"""
+        self.servers[name] = entry
+        self.dirty = True
+    
+    def remove_server(self, name: str) -> bool:
+        """서버 설정 제거 (없으면 False)"""
+        servers = self.config.get('mcpServers') or {}
+        if name not in servers:
+            return False
+        del servers[name]
+        self.dirty = True
+        return True
+    
+    def rollback(self) -> None:
+        """트랜잭션 종료 시 저장하지 않음"""
+        self.rolled_back = True
+
+def npx_command_args(base_args: List[str], windows: bool) -> tuple:
+    """대상 OS에 맞는 npx 실행 명령어와 인자"""
+    if windows:
+        # Windows에서는 cmd /c npx ... 형태로 실행
+        return 'cmd', ['/c', 'npx'] + base_args
+    # macOS, Linux에서는 npx ... 형태로 실행
+    return 'npx', base_args
+
+def smithery_command_args(base_args: List[str], windows: bool,
+                          package_cache: Optional['PackageCache'] = None) -> tuple:
+    """Smithery CLI 실행 명령어와 인자
+
+    base_args는 `-y @smithery/cli@latest ...` 형태의 npx 인자이며, 패키지
+    캐시에 Smithery CLI가 있으면 캐시된 실행 파일을 node로 직접 실행합니다.
+    """
+    if package_cache is not None and base_args[:2] == ServerTemplate.CLI_ARGS:
+        cached = package_cache.command_args(PackageCache.SMITHERY_CLI, base_args[2:])
+        if cached is not None:
+            return cached
+    return npx_command_args(base_args, windows)
+
+class ServerTemplate:
+    """MCP 서버 템플릿
+
+    설치(install)/실행(run) 인자에는 공통 변수나 매개변수를 `{이름}` 형태로
+    쓸 수 있으며(중괄호 자체는 `{{`, `}}`), 매개변수가 없는 템플릿의 명령어와
+    인자는 OS 형식별로 한 번만 계산해 재사용합니다. config가 있으면 변수를
+    채운 뒤 JSON 문자열로 만들어 `{config}`에 넣습니다.
+    """
+    CLI_ARGS = ['-y', '@smithery/cli@latest']
+    KINDS = ('install', 'run')
+    __slots__ = ('name', 'title', 'package', 'params', 'config', 'variables', '_args', '_compiled')
+    
+    def __init__(self, name: str, title: str, package: str, install: List[str], run: List[str],
+                 params: Optional[List[str]] = None, config: Optional[Dict] = None,
+                 variables: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.title = title
+        self.package = package
+        self.params = tuple(params or ())
+        self.config = config
+        self.variables = dict(variables or {})
+        self._args = {
+            'install': self.CLI_ARGS + ['install', package, '--client', 'cursor'] + list(install),
+            'run': self.CLI_ARGS + ['run', package] + list(run),
+        }
+        self._compiled = {}
+    
+    @classmethod
+    def from_dict(cls, name: str, data: Dict, variables: Dict[str, str]) -> 'ServerTemplate':
+        """템플릿 파일 항목에서 생성"""
+        if not isinstance(data, dict) or not data.get('package'):
+            raise ValueError(f"서버 템플릿에 package가 없습니다: {name}")
+        return cls(
+            name,
+            data.get('title', name),
+            data['package'],
+            [str(arg) for arg in data.get('install') or []],
+            [str(arg) for arg in data.get('run') or []],
+            data.get('params'),
+            data.get('config'),
+            variables,
+        )
+    
+    def npx_args(self, kind: str, values: Optional[Dict[str, str]] = None) -> List[str]:
+        """매개변수를 채운 npx 인자"""
+        values = values or {}
+        missing = [param for param in self.params if not values.get(param)]
+        if missing:
+            raise ValueError(f"{self.name} 서버에 필요한 값이 없습니다: {', '.join(missing)}")
+        
+        fill = dict(self.variables)
+        fill.update((param, str(values[param])) for param in self.params)
+        try:
+            if self.config is not None:
+                config = {key: str(value).format_map(fill) for key, value in self.config.items()}
+                fill['config'] = json.dumps(config, separators=(',', ':'))
+            return [arg.format_map(fill) for arg in self._args[kind]]
+        except KeyError as e:
+            raise ValueError(f"{self.name} 서버 템플릿에 정의되지 않은 변수가 있습니다: {e.args[0]}")
+    
+    def command_args(self, kind: str, windows: bool, values: Optional[Dict[str, str]] = None,
+                     package_cache: Optional['PackageCache'] = None) -> tuple:
+        """대상 OS용 (명령어, 인자)"""
+        if package_cache is not None or self.params:
+            return smithery_command_args(self.npx_args(kind, values), windows, package_cache)
+        
+        key = (kind, windows)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            command, args = npx_command_args(self.npx_args(kind), windows)
+            compiled = self._compiled[key] = (command, tuple(args))
+        return compiled[0], list(compiled[1])
+    
+    def server_entry(self, windows: bool, values: Optional[Dict[str, str]] = None,
+                     package_cache: Optional['PackageCache'] = None) -> Dict:
+        """mcp.json 서버 항목"""
+        command, args = self.command_args('run', windows, values, package_cache)
+        return {'command': command, 'args': args}
+
+class ServerRegistry:
+    """서버 템플릿 레지스트리 (mcp_servers.json)
+
+    템플릿 파일은 경로별로 프로세스당 한 번만 읽습니다. sets에는 여러
+    서버를 묶은 이름(default, github 등)을 정의합니다.
+    """
+    FILE_NAME = 'mcp_servers.json'
+    _path: Optional[Path] = None
+    _loaded: Dict[str, 'ServerRegistry'] = {}
+    
+    def __init__(self, templates: Dict[str, ServerTemplate], sets: Dict[str, List[str]]):
+        self.templates = templates
+        self.sets = sets
+    
+    @classmethod
+    def set_path(cls, path: Optional[str]) -> None:
+        """기본 템플릿 파일 경로 변경 (--templates)"""
+        cls._path = Path(path) if path else None
+    
+    @classmethod
+    def default_path(cls) -> Path:
+        return cls._path or Path(__file__).resolve().parent / cls.FILE_NAME
+    
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'ServerRegistry':
+        """템플릿 파일 읽기 (형식이 잘못되면 ValueError, 파일이 없으면 OSError)"""
+        path = str(Path(path) if path else cls.default_path())
+        registry = cls._loaded.get(path)
+        if registry is None:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or not isinstance(data.get('servers'), dict):
+                raise ValueError(f"템플릿 파일에 servers 객체가 없습니다: {path}")
+            
+            variables = data.get('variables') or {}
+            templates = {
+                name: ServerTemplate.from_dict(name, entry, variables)
+                for name, entry in data['servers'].items()
+            }
+            sets = data.get('sets') or {}
+            for set_name, names in sets.items():
+                unknown = [name for name in names if name not in templates]
+                if unknown:
+                    raise ValueError(f"서버 묶음 {set_name}에 알 수 없는 서버가 있습니다: {', '.join(unknown)}")
+            registry = cls._loaded[path] = cls(templates, sets)
+        return registry
+    
+    def get(self, name: str) -> Optional[ServerTemplate]:
+        return self.templates.get(name)
+    
+    def resolve(self, names: List[str]) -> List[ServerTemplate]:
+        """서버 이름 또는 묶음 이름 목록을 템플릿 목록으로 변환 (중복 제거)"""
+        resolved = {}
+        for item in names:
+            for name in self.sets.get(item, [item]):
+                template = self.templates.get(name)
+                if template is None:
+                    raise ValueError(f"알 수 없는 서버 템플릿입니다: {name}")
+                resolved.setdefault(name, template)
+        return list(resolved.values())
+
+def expand_server_template(server: Any, windows: bool) -> Any:
+    """{"template": 이름, "params": {...}} 형태의 서버 항목을 템플릿으로 채움
+
+    템플릿 항목이 아니면 그대로 반환합니다. env 등 다른 키는 유지합니다.
+    """
+    if not isinstance(server, dict) or 'template' not in server or 'command' in server:
+        return server
+    template = ServerRegistry.load().get(server['template'])
+    if template is None:
+        raise ValueError(f"알 수 없는 서버 템플릿입니다: {server['template']}")
+    entry = template.server_entry(windows, server.get('params'))
+    for key, value in server.items():
+        if key not in ('template', 'params'):
+            entry[key] = value
+    return entry
+
+class MCPSetup:
+    def __init__(self, lock_timeout: float = 10.0, package_cache: Optional[PackageCache] = None,
+                 mcp_json_path: Optional[Path] = None, work_dir: Optional[Path] = None,
+                 cache_config: bool = False):
+        profile = OSInfo.profile()
+        self.os_type = profile.os_type
+        self.home_dir = profile.home_dir
+        
+        # OS별 Cursor 설정 경로 (mcp_json_path를 지정하면 해당 파일 사용)
+        if mcp_json_path is not None:
+            self.mcp_json_path = Path(mcp_json_path)
+            self.cursor_dir = self.mcp_json_path.parent
+        else:
+            self.cursor_dir = profile.cursor_dir
+            self.mcp_json_path = self.cursor_dir / 'mcp.json'
+        self.current_dir = Path(work_dir) if work_dir is not None else Path.cwd()
+        self.target_dir = self.current_dir / 'mcp_setup'
+        self.backup_dir = self.target_dir / 'backups'
+        
+        # 진행 중인 설정 편집 트랜잭션
+        self._transaction = None
+        
+        # 동시 실행 간 설정 파일 잠금
+        self._lock = FileLock(self.mcp_json_path.with_name(self.mcp_json_path.name + '.lock'), timeout=lock_timeout)
+        self._lock_depth = 0
+        self.backup_store = BackupStore(self.backup_dir, lock_timeout=lock_timeout)
+        self.package_cache = package_cache
+        
+        # 파싱한 설정을 파일 상태(mtime, 크기, inode)와 함께 보관 (serve 모드)
+        self.cache_config = cache_config
+        self._config_cache = None
+        self._index_cache = None
+    
+    def print_environment(self) -> None:
+        """감지된 OS와 Cursor 설정 경로 출력"""
+        if OSInfo.profile().simulated:
+            print_colored(f"대상 운영 체제: {self.os_type} (실행 환경: {OSInfo.detect_os_type()})", Colors.CYAN)
+        else:
+            print_colored(f"감지된 운영 체제: {self.os_type}", Colors.CYAN)
+        print_colored(f"Cursor 설정 경로: {self.cursor_dir}", Colors.CYAN)
+    
+    def check_nodejs(self) -> bool:
+        """Node.js 설치 확인 (다른 플랫폼용 설정을 생성할 때는 탐지하지 않음)"""
+        if OSInfo.profile().simulated:
+            return True
+        if not NodeJSChecker.is_nodejs_installed():
+            print_colored("Node.js가 설치되어 있어야 합니다.", Colors.FAIL)
+            return False
+        return True
+    
+    def load_mcp_config(self) -> Dict:
+        """MCP 설정 파일 로드"""
+        if not self.mcp_json_path.exists():
+            print_colored(f"MCP 설정 파일을 찾을 수 없습니다: {self.mcp_json_path}", Colors.WARNING)
+            return {}
+
+        try:
+            return self._read_mcp_config()
+        except json.JSONDecodeError:
+            print_colored(f"MCP 설정 파일 파싱 오류: {self.mcp_json_path}", Colors.FAIL)
+            return {}
+        except Exception as e:
+            print_colored(f"MCP 설정 파일 읽기 오류: {str(e)}", Colors.FAIL)
+            return {}
+    
+    def _read_mcp_config(self) -> Dict:
+        """MCP 설정 파일 파싱 (오류는 호출자에게 전달)
+
+        cache_config가 켜져 있으면 파일 상태가 같을 때 다시 파싱하지 않고
+        보관한 설정의 사본을 반환합니다.
+        """
+        if self.cache_config:
+            key = self._config_file_key()
+            if self._config_cache is not None and self._config_cache[0] == key:
+                return copy_mcp_config(self._config_cache[1])
+        
+        with Tracer.span('config.load', 'config'), open(self.mcp_json_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        if not isinstance(config, dict):
+            raise ValueError("최상위 값이 JSON 객체가 아닙니다.")
+        
+        if self.cache_config:
+            self._config_cache = (key, copy_mcp_config(config))
+        return config
+    
+    def _config_file_key(self) -> tuple:
+        """설정 파일이 바뀌었는지 판단할 키 (원자적 교체 시 inode도 바뀜)"""
+        stat = os.stat(self.mcp_json_path)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+    
+    @contextmanager
+    def locked(self):
+        """설정 파일 잠금 (같은 프로세스 안에서는 재진입 가능)"""
+        if self._lock_depth == 0:
+            with Tracer.span('config.lock', 'lock'):
+                self._lock.acquire()
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0:
+                self._lock.release()
+    
+    def backup_mcp_config(self, keep_last: Optional[int] = BackupStore.DEFAULT_KEEP_LAST,
+                          max_age_days: Optional[float] = None, max_bytes: Optional[int] = None) -> bool:
+        """MCP 설정 파일 백업
+
+        내용이 같은 백업이 이미 있으면 새로 복사하지 않고, 백업 후 보존 정책에
+        따라 오래된 백업을 정리합니다.
+        """
+        if not self.mcp_json_path.exists():
+            print_colored("백업할 MCP 설정 파일이 없습니다.", Colors.WARNING)
+            return False
+        
+        try:
+            with Tracer.span('backup.add', 'backup') as span, open(self.mcp_json_path, 'rb') as f:
+                data = f.read()
+                entry, created = self.backup_store.add(data, source=str(self.mcp_json_path))
+                span.set(created=created, bytes=len(data))
+            if created:
+                print_colored(f"MCP 설정 백업 완료: {self.backup_store.object_path(entry['hash'])}", Colors.GREEN)
+            else:
+                print_colored(f"변경 사항이 없어 기존 백업을 유지합니다: {entry['hash'][:12]}", Colors.CYAN)
+            
+            with Tracer.span('backup.prune', 'backup'):
+                removed = self.backup_store.prune(keep_last, max_age_days, max_bytes)
+            if removed:
+                print_colored(f"보존 정책에 따라 백업 {len(removed)}개를 삭제했습니다.", Colors.CYAN)
+            return True
+        except Exception as e:
+            print_colored(f"MCP 설정 백업 오류: {str(e)}", Colors.FAIL)
+            return False
+    
+    def list_backups(self) -> None:
+        """백업 목록 출력"""
+        entries = self.backup_store.entries()
+        if not entries:
+            print_colored("저장된 백업이 없습니다.", Colors.WARNING)
+            return
+        
+        print_colored("\n===== MCP 설정 백업 목록 =====", Colors.HEADER)
+        for entry in entries:
+            created = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.get('created', 0)))
+            last_seen = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.get('last_seen', 0)))
+            print(f"  {entry['hash'][:12]}  {entry.get('size', 0):>8} bytes  생성: {created}  최근: {last_seen}")
+        print_colored("==============================", Colors.HEADER)
+    
+    def restore_mcp_config(self, digest: Optional[str] = None) -> bool:
+        """백업에서 MCP 설정 복원 (해시를 생략하면 가장 최근 백업)"""
+        try:
+            entry = self.backup_store.find(digest)
+        except ValueError as e:
+            print_colored(str(e), Colors.FAIL)
+            return False
+        if entry is None:
+            print_colored(f"복원할 백업을 찾을 수 없습니다: {digest or '(최근)'}", Colors.WARNING)
+            return False
+        
+        try:
+            data = self.backup_store.read(entry)
+            json.loads(data)
+        except (OSError, ValueError) as e:
+            print_colored(f"백업 파일을 읽을 수 없습니다: {entry['hash'][:12]} ({str(e)})", Colors.FAIL)
+            return False
+        
+        try:
+            self.cursor_dir.mkdir(exist_ok=True, parents=True)
+            with self.locked():
+                # 복원도 되돌릴 수 있도록 현재 설정을 먼저 백업
+                if self.mcp_json_path.exists():
+                    self.backup_mcp_config()
+                atomic_write(self.mcp_json_path, lambda f: f.write(data), mode='wb')
+            print_colored(f"MCP 설정 복원 완료: {entry['hash'][:12]} -> {self.mcp_json_path}", Colors.GREEN)
+            return True
+        except OSError as e:
+            print_colored(f"MCP 설정 복원 오류: {str(e)}", Colors.FAIL)
+            return False
+    
+    def save_mcp_config(self, config: Dict) -> bool:
+        """MCP 설정 파일 저장"""
+        try:
+            # 디렉토리가 없으면 생성
+            self.cursor_dir.mkdir(exist_ok=True, parents=True)
+            
+            with self.locked(), Tracer.span('config.save', 'config'):
+                write_json_atomic(self.mcp_json_path, config)
+                if self.cache_config:
+                    self._config_cache = (self._config_file_key(), copy_mcp_config(config))
+            
+            print_colored(f"MCP 설정 저장 완료: {self.mcp_json_path}", Colors.GREEN)
+            return True
+        except Exception as e:
+            print_colored(f"MCP 설정 저장 오류: {str(e)}", Colors.FAIL)
+            return False
+    
+    @contextmanager
+    def transaction(self):
+        """설정 편집 트랜잭션
+
+        with 블록 안의 모든 변경을 메모리에서 적용하고 블록이 끝날 때 한 번만
+        저장합니다. 예외가 발생하거나 rollback()이 호출되면 저장하지 않습니다.
+        중첩해서 사용하면 바깥 트랜잭션에 합쳐집니다.
+        
+        읽기부터 저장까지 설정 파일 잠금을 유지하며, 기존 파일이 손상되어
+        읽을 수 없으면 덮어쓰지 않습니다.
+        """
+        if self._transaction is not None:
+            yield self._transaction
+            return
+        
+        with self.locked():
+            txn = ConfigTransaction(self._load_for_transaction())
+            if txn.config is None:
+                txn.config = {}
+                txn.rollback()
+            
+            self._transaction = txn
+            try:
+                yield txn
+            finally:
+                self._transaction = None
+            
+            if txn.dirty and not txn.rolled_back:
+                txn.saved = self.save_mcp_config(txn.config)
+            elif txn.rolled_back:
+                txn.saved = False
+    
+    def _load_for_transaction(self) -> Optional[Dict]:
+        """트랜잭션용 설정 로드 (파일이 손상되었으면 None)"""
+        if not self.mcp_json_path.exists():
+            return self.load_mcp_config()
+        try:
+            return self._read_mcp_config()
+        except (OSError, ValueError) as e:
+            print_colored(f"MCP 설정 파일을 읽을 수 없어 변경 사항을 저장하지 않습니다: {self.mcp_json_path} ({str(e)})", Colors.FAIL)
+            return None
+    
+    def get_mcp_command_args(self, base_args: List[str], command_type: str = 'default') -> tuple:
+        """OS별 MCP 명령어와 인자 반환"""
+        return npx_command_args(base_args, OSInfo.is_windows())
+    
+    def get_smithery_command_args(self, base_args: List[str]) -> tuple:
+        """Smithery CLI 실행 명령어와 인자 반환
+
+        base_args는 `-y @smithery/cli@latest ...` 형태의 npx 인자이며, 패키지
+        캐시에 Smithery CLI가 있으면 캐시된 실행 파일을 node로 직접 실행합니다.
+        """
+        return smithery_command_args(base_args, OSInfo.is_windows(), self.package_cache)
+    
+    def load_registry(self) -> Optional[ServerRegistry]:
+        """서버 템플릿 레지스트리 (읽을 수 없으면 None)"""
+        try:
+            return ServerRegistry.load()
+        except (OSError, ValueError) as e:
+            print_colored(f"서버 템플릿 파일을 읽을 수 없습니다: {ServerRegistry.default_path()} ({str(e)})", Colors.FAIL)
+            return None
+    
+    def resolve_templates(self, names: List[str]) -> Optional[List[ServerTemplate]]:
+        """서버 이름 또는 묶음 이름에 해당하는 템플릿 목록 (실패하면 None)"""
+        registry = self.load_registry()
+        if registry is None:
+            return None
+        try:
+            return registry.resolve(names)
+        except ValueError as e:
+            print_colored(str(e), Colors.FAIL)
+            return None
+    
+    def add_mcp_server(self, name: str, command: str, args: List[str],
+                       limits: Optional['ResourceLimits'] = None, env: Optional[Dict[str, str]] = None) -> bool:
+        """MCP 서버 추가 (limits가 있으면 limit 명령으로 감쌈)"""
         # OS별로 명령어와 인자 조정
         if command == "npx":
-            if OSInfo.is_windows():
-                command = 'cmd'
-                args = ['/c', 'npx'] + args
-        
-        # 서버 설정 추가
-        config['mcpServers'][name] = {
+            command, args = npx_command_args(args, OSInfo.is_windows())
+        entry = {
             'command': command,
             'args': args
         }
+        if env:
+            entry['env'] = dict(env)
+        if limits:
+            entry = self.limit_entry(name, entry, limits)
+        
+        # 서버 설정 추가
+        with self.transaction() as txn:
+            txn.set_server(name, entry)
+        
+        return txn.saved
+    
+    def add_template_server(self, template_name: str, name: Optional[str] = None,
+                            params: Optional[Dict[str, str]] = None,
+                            limits: Optional['ResourceLimits'] = None) -> bool:
+        """서버 템플릿으로 MCP 서버 추가"""
+        registry = self.load_registry()
+        if registry is None:
+            return False
+        template = registry.get(template_name)
+        if template is None:
+            print_colored(f"알 수 없는 서버 템플릿입니다: {template_name} (사용 가능: {', '.join(registry.templates)})", Colors.FAIL)
+            return False
+        
+        try:
+            entry = template.server_entry(OSInfo.is_windows(), params, self.package_cache)
+        except ValueError as e:
+            print_colored(str(e), Colors.FAIL)
+            return False
         
-        return self.save_mcp_config(config)
+        if limits:
+            entry = self.limit_entry(name or template.name, entry, limits)
+        with self.transaction() as txn:
+            txn.set_server(name or template.name, entry)
+        return txn.saved
     
     def remove_mcp_server(self, name: str) -> bool:
         """MCP 서버 제거"""
-        config = self.load_mcp_config()
+        with self.transaction() as txn:
+            removed = txn.remove_server(name)
         
-        if 'mcpServers' not in config or name not in config['mcpServers']:
+        if not removed:
             print_colored(f"MCP 서버를 찾을 수 없습니다: {name}", Colors.WARNING)
             return False
         
-        # 서버 설정 제거
-        del config['mcpServers'][name]
-        
-        return self.save_mcp_config(config)
+        return txn.saved
     
-    def export_mcp_config(self, output_path: Optional[str] = None) -> bool:
-        """MCP 설정 내보내기"""
-        config = self.load_mcp_config()
+    def apply_batch(self, operations: List[Dict]) -> bool:
+        """여러 서버 추가/제거 작업을 한 번의 저장으로 적용"""
+        errors = []
+        for i, op in enumerate(operations):
+            kind = op.get('op') if isinstance(op, dict) else None
+            if kind not in ('add', 'remove'):
+                errors.append(f"#{i}: 'op'는 'add' 또는 'remove'여야 합니다.")
+            elif not isinstance(op.get('name'), str) or not op['name']:
+                errors.append(f"#{i}: 'name'이 필요합니다.")
+            elif kind == 'add':
+                # args는 문자열 목록, env는 문자열 값의 객체여야 함 (mcp.json 항목과 같은 검사)
+                if not isinstance(op.get('command'), str):
+                    errors.append(f"#{i}: 'add'에는 문자열 'command'가 필요합니다.")
+                else:
+                    entry = {key: op[key] for key in ('command', 'args', 'env') if key in op}
+                    errors.extend(f"#{i}: {problem}" for problem in validate_server_entry(op['name'], entry))
+        
+        if errors:
+            for error in errors:
+                print_colored(f"잘못된 배치 작업 {error}", Colors.FAIL)
+            return False
+        
+        added = removed = 0
+        with self.transaction() as txn:
+            for op in operations:
+                if op['op'] == 'add':
+                    self.add_mcp_server(op['name'], op['command'], list(op.get('args', [])), env=op.get('env'))
+                    added += 1
+                elif self.remove_mcp_server(op['name']):
+                    removed += 1
         
-        if not config:
+        if txn.saved:
+            print_colored(f"배치 적용 완료: 추가/변경 {added}개, 제거 {removed}개", Colors.GREEN)
+        return txn.saved
+    
+    def export_mcp_config(self, output_path: Optional[str] = None, compact: bool = False) -> bool:
+        """MCP 설정 내보내기 (서버 항목을 하나씩 스트리밍)"""
+        if not self.mcp_json_path.exists():
+            print_colored(f"MCP 설정 파일을 찾을 수 없습니다: {self.mcp_json_path}", Colors.WARNING)
             print_colored("내보낼 MCP 설정이 없습니다.", Colors.WARNING)
             return False
         
         if output_path is None:
             output_path = self.target_dir / "exported_mcp_config.json"
+            output_path.parent.mkdir(exist_ok=True, parents=True)
         else:
             output_path = Path(output_path)
         
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            with Tracer.span('config.export', 'config') as span, \
+                    open(self.mcp_json_path, 'r', encoding='utf-8') as src, \
+                    open(output_path, 'w', encoding='utf-8') as dst:
+                count = stream_mcp_config(src, dst, indent=None if compact else 2)
+                span.set(servers=count)
             
-            print_colored(f"MCP 설정 내보내기 완료: {output_path}", Colors.GREEN)
+            print_colored(f"MCP 설정 내보내기 완료: {output_path} (서버 {count}개)", Colors.GREEN)
             return True
+        except json.JSONDecodeError:
+            print_colored(f"MCP 설정 파일 파싱 오류: {self.mcp_json_path}", Colors.FAIL)
+            return False
         except Exception as e:
             print_colored(f"MCP 설정 내보내기 오류: {str(e)}", Colors.FAIL)
             return False
     
-    def import_mcp_config(self, input_path: str) -> bool:
-        """MCP 설정 가져오기"""
+    def import_mcp_config(self, input_path: str, compact: bool = False) -> bool:
+        """MCP 설정 가져오기
+
+        서버 항목을 하나씩 읽어 OS별 명령어 형식으로 변환하면서 임시 파일에
+        기록한 뒤 mcp.json을 원자적으로 교체합니다.
+        """
         input_path = Path(input_path)
         
         if not input_path.exists():
             print_colored(f"가져올 MCP 설정 파일이 없습니다: {input_path}", Colors.WARNING)
             return False
         
+        # 템플릿 항목 채우기, OS별 명령어 자동 변환 및 항목 검사
+        windows = OSInfo.is_windows()
+        errors = []
+        
+        def transform(name, server):
+            server = convert_server_for_os(expand_server_template(server, windows), windows)
+            errors.extend(validate_server_entry(name, server))
+            return server
+        
+        def write(dst):
+            stream_mcp_config(src, dst, transform, None if compact else 2)
+            if errors:
+                # 임시 파일을 버리고 기존 mcp.json 유지
+                raise ConfigValidationError(errors)
+        
         try:
-            with open(input_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            
-            # OS별 명령어 자동 변환
-            if 'mcpServers' in config:
-                for name, server in config['mcpServers'].items():
-                    command = server.get('command', '')
-                    args = server.get('args', [])
-                    
-                    # Windows와 다른 OS 사이의 명령어 변환
-                    if OSInfo.is_windows() and command == "npx":
-                        # 다른 OS 형식(npx)에서 Windows 형식(cmd /c npx)으로 변환
-                        server['command'] = 'cmd'
-                        server['args'] = ['/c', 'npx'] + args
-                    elif not OSInfo.is_windows() and command == "cmd" and args and args[0] == "/c" and args[1] == "npx":
-                        # Windows 형식(cmd /c npx)에서 다른 OS 형식(npx)으로 변환
-                        server['command'] = 'npx'
-                        server['args'] = args[2:]  # '/c'와 'npx' 제거
+            self.cursor_dir.mkdir(exist_ok=True, parents=True)
+            with open(input_path, 'r', encoding='utf-8') as src, self.locked(), \
+                    Tracer.span('config.import', 'config'):
+                atomic_write(self.mcp_json_path, write)
             
-            return self.save_mcp_config(config)
+            print_colored(f"MCP 설정 저장 완료: {self.mcp_json_path}", Colors.GREEN)
+            return True
+        except ConfigValidationError as e:
+            self.print_validation_errors(e.errors, input_path)
+            return False
+        except json.JSONDecodeError:
+            print_colored(f"MCP 설정 파일 파싱 오류: {input_path}", Colors.FAIL)
+            return False
+        except Exception as e:
+            print_colored(f"MCP 설정 가져오기 오류: {str(e)}", Colors.FAIL)
+            return False
+    
+    def merge_mcp_config(self, input_path: str, keep_missing: bool = False, dry_run: bool = False) -> bool:
+        """MCP 설정을 서버 단위로 비교해 바뀐 항목만 반영
+
+        가져올 파일의 서버 항목을 하나씩 읽어 현재 설정과 비교하고 추가/변경/제거된
+        항목만 적용합니다. 바뀐 것이 없으면 mcp.json을 다시 쓰지 않습니다.
+        keep_missing이 True이면 가져올 파일에 없는 서버를 제거하지 않습니다.
+        """
+        input_path = Path(input_path)
+        
+        if not input_path.exists():
+            print_colored(f"가져올 MCP 설정 파일이 없습니다: {input_path}", Colors.WARNING)
+            return False
+        
+        windows = OSInfo.is_windows()
+        diff = ServerDiff()
+        errors = []
+        try:
+            with open(input_path, 'r', encoding='utf-8') as src, self.transaction() as txn:
+                current = txn.config.get('mcpServers') or {}
+                seen = set()
+                for name, server in iter_mcp_servers(src):
+                    server = convert_server_for_os(expand_server_template(server, windows), windows)
+                    seen.add(name)
+                    problems = validate_server_entry(name, server)
+                    if problems:
+                        errors.extend(problems)
+                        continue
+                    if name not in current:
+                        diff.added.append(name)
+                    elif current[name] != server:
+                        diff.changed.append(name)
+                    else:
+                        diff.unchanged += 1
+                        continue
+                    txn.set_server(name, server)
+                
+                if errors:
+                    raise ConfigValidationError(errors)
+                
+                if not keep_missing:
+                    diff.removed = [name for name in current if name not in seen]
+                    for name in diff.removed:
+                        txn.remove_server(name)
+                
+                if dry_run:
+                    txn.rollback()
+        except ConfigValidationError as e:
+            self.print_validation_errors(e.errors, input_path)
+            return False
         except json.JSONDecodeError:
             print_colored(f"MCP 설정 파일 파싱 오류: {input_path}", Colors.FAIL)
             return False
         except Exception as e:
             print_colored(f"MCP 설정 가져오기 오류: {str(e)}", Colors.FAIL)
             return False
+        
+        if not dry_run and (txn.rolled_back or (diff and not txn.saved)):
+            # 현재 설정을 읽지 못했거나 저장에 실패해 아무것도 반영되지 않음
+            return False
+        print_colored(f"\n===== MCP 설정 변경 사항: {input_path} =====", Colors.HEADER)
+        diff.print_summary()
+        if dry_run:
+            print_colored("--dry-run: 변경 사항을 저장하지 않았습니다.", Colors.CYAN)
+            return True
+        if not diff:
+            print_colored("변경 사항이 없어 MCP 설정을 저장하지 않습니다.", Colors.GREEN)
+            return True
+        return txn.saved
+    
+    def desired_servers(self, desired_path: Path) -> tuple:
+        """원하는 상태 파일을 읽어 (서버 항목, 설치할 템플릿) 반환
+
+        파일 형식은 가져오기 파일과 같으며, 템플릿 항목의 params 값에는
+        `env:이름`, `file:경로` 토큰 참조를 쓸 수 있습니다. 템플릿 항목은
+        설치 대상이 됩니다 ({이름: (템플릿, 매개변수)}). 잘못된 항목이 있으면
+        ConfigValidationError를 발생시킵니다.
+        """
+        with open(desired_path, 'r', encoding='utf-8') as f:
+            desired = json.load(f)
+        servers = desired.get('mcpServers') if isinstance(desired, dict) else None
+        if not isinstance(servers, dict):
+            raise ValueError("mcpServers 객체가 없습니다.")
+        
+        windows = OSInfo.is_windows()
+        registry = None
+        entries = {}
+        installs = {}
+        errors = []
+        for name, server in servers.items():
+            if isinstance(server, dict) and 'template' in server and 'command' not in server:
+                registry = registry or ServerRegistry.load()
+                template = registry.get(server['template'])
+                if template is None:
+                    errors.append(f"{name}: 알 수 없는 서버 템플릿입니다: {server['template']}")
+                    continue
+                try:
+                    values = {
+                        key: resolve_token_ref(value) if str(value).startswith(('env:', 'file:')) else value
+                        for key, value in (server.get('params') or {}).items()
+                    }
+                    entry = template.server_entry(windows, values, self.package_cache)
+                except (OSError, ValueError) as e:
+                    errors.append(f"{name}: {str(e)}")
+                    continue
+                for key, value in server.items():
+                    if key not in ('template', 'params'):
+                        entry[key] = value
+                installs[name] = (template, values)
+            else:
+                entry = convert_server_for_os(server, windows)
+            problems = validate_server_entry(name, entry)
+            if problems:
+                errors.extend(problems)
+                continue
+            entries[name] = entry
+        
+        if errors:
+            raise ConfigValidationError(errors)
+        return entries, installs
+    
+    def reconcile(self, desired_path: str, installer: MCPInstaller, keep_missing: bool = False,
+                  dry_run: bool = False, parallel: bool = False, max_workers: Optional[int] = None) -> bool:
+        """mcp.json과 설치 상태를 원하는 상태 파일에 맞춤
+
+        서버 단위 차이와 설치 기록에 없는 템플릿만 계산해 필요한 설치를 먼저
+        실행한 뒤 바뀐 항목만 한 번에 저장합니다. 설치에 실패한 서버의 항목은
+        반영하지 않습니다.
+        """
+        desired_path = Path(desired_path)
+        try:
+            with Tracer.span('reconcile.plan', 'reconcile'):
+                entries, installs = self.desired_servers(desired_path)
+                current = self.load_mcp_config().get('mcpServers') or {}
+                diff = ServerDiff.compute(current, entries, keep_missing)
+                missing = [name for name, (template, values) in installs.items()
+                           if not installer.is_installed(template, values)]
+        except ConfigValidationError as e:
+            self.print_validation_errors(e.errors, desired_path)
+            return False
+        except json.JSONDecodeError:
+            print_colored(f"원하는 상태 파일 파싱 오류: {desired_path}", Colors.FAIL)
+            return False
+        except (OSError, ValueError) as e:
+            print_colored(f"원하는 상태 파일을 읽을 수 없습니다: {desired_path} ({str(e)})", Colors.FAIL)
+            return False
+        
+        print_colored(f"\n===== MCP 상태 조정: {desired_path} =====", Colors.HEADER)
+        diff.print_summary()
+        if missing:
+            print_colored(f"설치 필요: {', '.join(missing)}", Colors.WARNING)
+        if dry_run:
+            print_colored("--dry-run: 설치와 설정 변경을 하지 않았습니다.", Colors.CYAN)
+            return True
+        if not diff and not missing:
+            print_colored("이미 원하는 상태입니다.", Colors.GREEN)
+            return True
+        
+        failed = set()
+        if missing:
+            if not NodeJSChecker.is_nodejs_installed():
+                print_colored("Node.js가 설치되어 있어야 합니다.", Colors.FAIL)
+                return False
+            from functools import partial
+            
+            steps = [(name, installs[name][0].title, partial(installer.install_server, *installs[name]))
+                     for name in missing]
+            results = installer.run_install_steps(steps, parallel, max_workers)
+            failed = {name for name, status, _ in results if status not in ('success', 'cached')}
+            if failed:
+                print_colored(f"설치에 실패한 서버는 설정에 반영하지 않습니다: {', '.join(sorted(failed))}",
+                              Colors.WARNING)
+        
+        # 설치하는 동안 바뀌었을 수 있으므로 잠금을 잡은 뒤 다시 비교
+        with self.transaction() as txn:
+            diff = ServerDiff.compute(txn.config.get('mcpServers') or {}, entries, keep_missing)
+            for name in diff.added + diff.changed:
+                if name not in failed:
+                    txn.set_server(name, entries[name])
+            for name in diff.removed:
+                txn.remove_server(name)
+        return txn.saved and not failed
+    
+    def watch_reconcile(self, desired_path: str, installer: MCPInstaller, poll_interval: float = 1.0,
+                        **options) -> bool:
+        """원하는 상태 파일이나 mcp.json이 바뀔 때마다 reconcile() 실행 (Ctrl+C로 종료)"""
+        self.cursor_dir.mkdir(exist_ok=True, parents=True)
+        watcher = FileWatcher([Path(desired_path), self.mcp_json_path], poll_interval)
+        ok = self.reconcile(desired_path, installer, **options)
+        print_colored(f"\n변경 감시 중 ({watcher.backend}): {desired_path}, {self.mcp_json_path} (Ctrl+C로 종료)",
+                      Colors.CYAN)
+        try:
+            while True:
+                changed = watcher.wait()
+                if changed:
+                    print_colored(f"\n변경 감지: {', '.join(path.name for path in changed)}", Colors.CYAN)
+                    ok = self.reconcile(desired_path, installer, **options)
+        except KeyboardInterrupt:
+            print_colored("\n감시를 종료합니다.", Colors.CYAN)
+        finally:
+            watcher.close()
+        return ok
+    
+    def setup_default_mcp_servers(self, gateway: bool = False, launcher: bool = False,
+                                  limits: Optional['ResourceLimits'] = None) -> bool:
+        """기본 MCP 서버 설정 (gateway이면 게이트웨이 백엔드로, launcher이면 launch 명령으로 등록)"""
+        if not self.check_nodejs():
+            return False
+        
+        # 백업 먼저 수행
+        self.backup_mcp_config()
+        
+        templates = self.resolve_templates(['default'])
+        if templates is None:
+            return False
+        
+        # OS별 명령어 설정 (패키지 캐시가 있으면 캐시된 CLI 사용)
+        windows = OSInfo.is_windows()
+        entries = {
+            template.name: template.server_entry(windows, package_cache=self.package_cache)
+            for template in templates
+        }
+        result = self.set_servers(entries, gateway, launcher, limits)
+        if result:
+            print_colored("기본 MCP 서버 설정 완료!", Colors.GREEN)
+        
+        return result
+    
+    def setup_github_mcp(self, token: str, gateway: bool = False, launcher: bool = False,
+                         limits: Optional['ResourceLimits'] = None) -> bool:
+        """GitHub MCP 설정 (gateway이면 게이트웨이 백엔드로, launcher이면 launch 명령으로 등록)"""
+        if not self.check_nodejs():
+            return False
+            
+        if not token:
+            print_colored("GitHub 토큰이 필요합니다.", Colors.WARNING)
+            return False
+        
+        templates = self.resolve_templates(['github'])
+        if templates is None:
+            return False
+        
+        # GitHub MCP 서버 설정 (패키지 캐시가 있으면 캐시된 CLI 사용)
+        windows = OSInfo.is_windows()
+        entries = {
+            template.name: template.server_entry(windows, {'token': token}, self.package_cache)
+            for template in templates
+        }
+        result = self.set_servers(entries, gateway, launcher, limits)
+        if result:
+            print_colored("GitHub MCP 서버 설정 완료!", Colors.GREEN)
+        
+        return result
+    
+    def set_servers(self, entries: Dict[str, Dict], gateway: bool = False, launcher: bool = False,
+                    limits: Optional['ResourceLimits'] = None) -> bool:
+        """서버 항목을 mcp.json에 기록
+
+        gateway이면 항목을 게이트웨이 백엔드 목록에 기록하고 mcp.json에서는
+        해당 서버를 빼고 게이트웨이 항목 하나만 둡니다. launcher이면 각 항목을
+        웜 풀을 거쳐 실행하는 launch 명령으로 감쌉니다. limits가 있으면 각
+        항목을 limit 명령으로 먼저 감싸므로 메모리 등의 제한은 웜 풀의
+        프로세스에도 적용되고, 동시 실행 슬롯은 클라이언트에 연결될 때 잡습니다.
+        """
+        if limits:
+            entries = {name: self.limit_entry(name, entry, limits) for name, entry in entries.items()}
+        if launcher:
+            entries = {name: self.launcher_entry(entry) for name, entry in entries.items()}
+        if gateway:
+            backends = MCPSetup(self._lock.timeout, mcp_json_path=self.gateway_backends_path(),
+                                work_dir=self.current_dir)
+            with backends.transaction() as backend_txn:
+                for name, entry in entries.items():
+                    backend_txn.set_server(name, entry)
+            if not backend_txn.saved:
+                return False
+        
+        with self.transaction() as txn:
+            for name, entry in entries.items():
+                if gateway:
+                    txn.remove_server(name)
+                else:
+                    txn.set_server(name, entry)
+            if gateway:
+                txn.set_server(GATEWAY_SERVER_NAME, self.gateway_entry())
+        return txn.saved
+    
+    def gateway_backends_path(self) -> Path:
+        """게이트웨이 백엔드 목록 파일 경로 (mcp.json과 같은 디렉토리)"""
+        return self.cursor_dir / GATEWAY_BACKENDS_FILE
+    
+    @staticmethod
+    def script_entry(args: List[str]) -> Dict:
+        """이 스크립트의 서브 명령을 실행하는 mcp.json 항목"""
+        if OSInfo.profile().simulated:
+            python = 'python' if OSInfo.is_windows() else 'python3'
+        else:
+            python = sys.executable
+        return {'command': python, 'args': [str(Path(__file__).resolve())] + args}
+    
+    def gateway_entry(self) -> Dict:
+        """mcp.json에 기록할 게이트웨이 항목"""
+        return self.script_entry(['gateway', '--backends', str(self.gateway_backends_path())])
+    
+    def launcher_entry(self, server: Dict) -> Dict:
+        """서버 항목을 launch 명령으로 감싼 항목 (env는 그대로 두고 이름만 전달)"""
+        args = ['launch']
+        if server.get('env'):
+            args += ['--pass-env', ','.join(server['env'])]
+        entry = self.script_entry(args + ['--', server['command']] + list(server.get('args', [])))
+        for key, value in server.items():
+            if key not in ('command', 'args'):
+                entry[key] = value
+        return entry
+    
+    def limit_entry(self, name: str, server: Dict, limits: 'ResourceLimits') -> Dict:
+        """서버 항목을 리소스 제한을 적용하는 limit 명령으로 감싼 항목"""
+        entry = self.script_entry(['limit'] + limits.to_args() + ['--name', name, '--', server['command']]
+                                  + list(server.get('args', [])))
+        for key, value in server.items():
+            if key not in ('command', 'args'):
+                entry[key] = value
+        return entry
+    
+    def setup_all(self, github_token=None, parallel=False, max_workers=None, fail_fast=False,
+                  installer: Optional[MCPInstaller] = None, gateway: bool = False, launcher: bool = False,
+                  limits: Optional['ResourceLimits'] = None):
+        """모든 MCP 설정"""
+        if OSInfo.profile().simulated:
+            # 다른 플랫폼용 설정만 생성하고 설치는 건너뜀
+            print_colored("대상 운영 체제가 실행 환경과 달라 MCP 설치를 건너뜁니다.", Colors.WARNING)
+            install_success = True
+        else:
+            # Node.js 설치 확인
+            if not NodeJSChecker.is_nodejs_installed():
+                print_colored("Node.js가 설치되어 있어야 합니다.", Colors.FAIL)
+                return False
+            
+            # MCP 설치
+            installer = installer or MCPInstaller(self.package_cache)
+            install_success = installer.install_all_mcps(github_token, parallel, max_workers, fail_fast)
+        
+        if not install_success:
+            print_colored("MCP 설치 중 문제가 발생했습니다.", Colors.WARNING)
+            # 설치 문제가 있어도 설정은 진행
+        
+        # 기본 MCP 서버와 GitHub MCP 서버 설정을 한 번에 저장
+        with self.transaction() as txn:
+            setup_success = self.setup_default_mcp_servers(gateway, launcher, limits)
+            
+            # GitHub MCP 서버 설정 (토큰이 제공된 경우)
+            if github_token and setup_success:
+                self.setup_github_mcp(github_token, gateway, launcher, limits)
+        
+        return setup_success and txn.saved
+        
+    def server_index(self) -> ServerIndex:
+        """검증된 서버 레코드와 보조 인덱스
+
+        serve 모드에서는 설정 파일이 바뀌었을 때만 다시 만듭니다.
+        """
+        config = self.load_mcp_config()
+        key = self._config_cache[0] if self.cache_config and self._config_cache is not None else None
+        if key is not None and self._index_cache is not None and self._index_cache[0] == key:
+            return self._index_cache[1]
+        
+        index = ServerIndex.build(config)
+        if key is not None:
+            self._index_cache = (key, index)
+        return index
+    
+    def find_servers(self, filters: Optional[Dict[str, str]] = None) -> List[ServerRecord]:
+        """필터에 맞는 서버 레코드 (잘못된 항목은 경고 후 제외)"""
+        index = self.server_index()
+        for error in index.errors:
+            print_colored(f"잘못된 서버 설정을 건너뜁니다: {error}", Colors.WARNING)
+        return index.query(filters)
+    
+    def list_mcp_servers(self, filters: Optional[Dict[str, str]] = None) -> None:
+        """MCP 서버 목록 출력"""
+        records = self.find_servers(filters)
+        self.print_servers([record.to_dict() for record in records], bool(filters))
+    
+    @staticmethod
+    def print_servers(servers: Optional[List[Dict]], filtered: bool = False) -> None:
+        """서버 목록 출력 (ServerRecord.to_dict() 형식)"""
+        if not servers:
+            if filtered:
+                print_colored("조건에 맞는 MCP 서버가 없습니다.", Colors.WARNING)
+            else:
+                print_colored("설정된 MCP 서버가 없습니다.", Colors.WARNING)
+            return
+        
+        print_colored("\n===== MCP 서버 목록 =====", Colors.HEADER)
+        for server in servers:
+            print_colored(f"\n[{server['name']}]", Colors.BOLD)
+            if server.get('url'):
+                print(f"  URL: {server['url']}")
+            else:
+                print(f"  명령어: {server['command']}")
+                print(f"  인자: {' '.join(server['args'])}")
+        
+        print_colored("\n========================", Colors.HEADER)
+    
+    @staticmethod
+    def print_validation_errors(errors: List[str], source: Path) -> None:
+        """설정 검증 오류 출력"""
+        print_colored(f"잘못된 서버 설정이 있어 가져오지 않았습니다: {source}", Colors.FAIL)
+        for error in errors:
+            print_colored(f"  {error}", Colors.FAIL)
+    
+    def probe_mcp_servers(self, names: Optional[List[str]] = None, concurrency: int = 4,
+                          timeout: float = 30.0, as_json: bool = False) -> bool:
+        """설정된 MCP 서버를 동시에 실행해 시작 시간과 메모리 측정"""
+        import asyncio
+        
+        servers = self.load_mcp_config().get('mcpServers') or {}
+        if names:
+            missing = [name for name in names if name not in servers]
+            for name in missing:
+                print_colored(f"MCP 서버를 찾을 수 없습니다: {name}", Colors.WARNING)
+            servers = {name: servers[name] for name in names if name in servers}
+        if not servers:
+            print_colored("측정할 MCP 서버가 없습니다.", Colors.WARNING)
+            return False
+        
+        results = asyncio.run(probe_mcp_servers(servers, concurrency, timeout))
+        
+        if as_json:
+            print(json.dumps(results, indent=2, ensure_ascii=False))
+        else:
+            def ms(value):
+                return f"{value:.0f}" if value is not None else "-"
+            
+            print_colored("\n===== MCP 서버 시작 측정 =====", Colors.HEADER)
+            print(f"  {'이름':<28} {'상태':<8} {'실행(ms)':>9} {'첫 응답(ms)':>12} {'최대 RSS(MB)':>13}")
+            for result in results:
+                rss = result['peak_rss_bytes']
+                rss_text = f"{rss / (1024 * 1024):.1f}" if rss is not None else "-"
+                color = Colors.GREEN if result['status'] == 'ok' else Colors.FAIL
+                print_colored(
+                    f"  {result['name']:<28} {result['status']:<8} {ms(result['spawn_ms']):>9} "
+                    f"{ms(result['first_response_ms']):>12} {rss_text:>13}",
+                    color
+                )
+                if result['error']:
+                    print(f"    {result['error']}")
+            print_colored("==============================", Colors.HEADER)
+        return all(result['status'] == 'ok' for result in results)
+    
+    def loadtest_mcp_server(self, name: Optional[str], calls: Optional[List[Dict]] = None, concurrency: int = 4,
+                            rate: Optional[float] = None, total: Optional[int] = 200,
+                            duration: Optional[float] = None, timeout: float = 30.0, warmup: int = 0,
+                            as_json: bool = False, stub_args: Optional[List[str]] = None) -> bool:
+        """설정된 MCP 서버(또는 내장 테스트 서버)에 tools/call 부하를 걸어 측정"""
+        import asyncio
+        
+        if stub_args is not None:
+            name, server = 'stub-server', stub_server_entry(*stub_args)
+        else:
+            server = (self.load_mcp_config().get('mcpServers') or {}).get(name)
+            if server is None:
+                print_colored(f"MCP 서버를 찾을 수 없습니다: {name}", Colors.WARNING)
+                return False
+            problems = validate_server_entry(name, server)
+            if problems or not server.get('command'):
+                print_colored(problems[0] if problems else f"{name}: stdio 서버(command)만 측정할 수 있습니다.",
+                              Colors.FAIL)
+                return False
+        
+        report = asyncio.run(run_load_test(server, calls, concurrency, rate, total, duration, timeout, warmup))
+        report['name'] = name
+        if as_json:
+            print(json.dumps(report, indent=2, ensure_ascii=False))
+        else:
+            print_load_report(name, report)
+        return report['status'] == 'ok'
+    
+    def stdio_servers(self, names: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """설정된 stdio 서버 항목
+
+        게이트웨이 항목은 게이트웨이를 실행하는 대신 뒤에 묶인 백엔드로 펼치고,
+        url 서버와 잘못된 항목은 경고 후 제외합니다.
+        """
+        config = self.load_mcp_config()
+        configured = dict(config.get('mcpServers') or {})
+        if GATEWAY_SERVER_NAME in configured:
+            del configured[GATEWAY_SERVER_NAME]
+            try:
+                with open(self.gateway_backends_path(), 'r', encoding='utf-8') as f:
+                    configured.update(json.load(f).get('mcpServers') or {})
+            except (OSError, ValueError, AttributeError) as e:
+                print_colored(f"게이트웨이 백엔드 목록을 읽을 수 없습니다: {str(e)}", Colors.WARNING)
+        
+        if names:
+            for name in names:
+                if name not in configured:
+                    print_colored(f"MCP 서버를 찾을 수 없습니다: {name}", Colors.WARNING)
+            configured = {name: configured[name] for name in names if name in configured}
+        
+        servers = {}
+        for name, server in configured.items():
+            problems = validate_server_entry(name, server)
+            if problems:
+                print_colored(f"잘못된 서버 설정을 건너뜁니다: {problems[0]}", Colors.WARNING)
+            elif not server.get('command'):
+                print_colored(f"{name}: url 서버는 건너뜁니다.", Colors.WARNING)
+            else:
+                servers[name] = server
+        return servers
+    
+    def list_tools(self, names: Optional[List[str]] = None, query: Optional[str] = None,
+                   refresh: bool = False, cached_only: bool = False, concurrency: int = 8,
+                   timeout: float = 30.0, as_json: bool = False) -> bool:
+        """설정된 MCP 서버의 도구 목록 출력 또는 검색
+
+        캐시에 없는 서버만(refresh면 전부) 동시에 실행해 도구 목록을 읽고
+        저장하므로, 서버 항목이 바뀌지 않은 동안에는 프로세스를 실행하지 않습니다.
+        """
+        servers = self.stdio_servers(names)
+        if not servers:
+            print_colored("도구 목록을 읽을 MCP 서버가 없습니다.", Colors.WARNING)
+            return False
+        
+        cache = ToolManifestCache()
+        manifests = {}
+        stale = {}
+        for name, server in servers.items():
+            entry = None if refresh else cache.lookup(server)
+            if entry is not None:
+                manifests[name] = {'name': name, 'status': 'ok', 'cached': True, 'tools': entry['tools'],
+                                   'server_info': entry.get('server_info'), 'error': None}
+            elif cached_only:
+                manifests[name] = {'name': name, 'status': 'missing', 'cached': False, 'tools': None,
+                                   'server_info': None, 'error': '캐시된 도구 목록이 없습니다.'}
+            else:
+                stale[name] = server
+        
+        if stale:
+            import asyncio
+            
+            if not as_json:
+                print_colored(f"도구 목록 읽는 중: {', '.join(stale)}", Colors.CYAN)
+            results = asyncio.run(fetch_tool_manifests(stale, concurrency, timeout))
+            for result in results:
+                manifests[result['name']] = dict(result, cached=False)
+            fetched = [(stale[result['name']], result['tools'], result['server_info'])
+                       for result in results if result['status'] == 'ok']
+            if fetched and not cache.put_many(fetched):
+                print_colored(f"도구 목록 캐시를 저장할 수 없습니다: {cache.path}", Colors.WARNING)
+        
+        ordered = [manifests[name] for name in servers]
+        if as_json:
+            if query is not None:
+                ordered = [{'server': server_name, **tool} for server_name, tool in search_tools(ordered, query)]
+            print(json.dumps(ordered, indent=2, ensure_ascii=False))
+        else:
+            print_tool_manifests(ordered, query)
+        return all(manifest['status'] == 'ok' for manifest in manifests.values())
+    
+    def show_resource_usage(self, as_json: bool = False) -> bool:
+        """limit 명령으로 감싼 서버의 실행 인스턴스별 사용량을 제한과 함께 표시"""
+        servers = self.stdio_servers()
+        if not servers:
+            print_colored("설정된 MCP 서버가 없습니다.", Colors.WARNING)
+            return False
+        report = collect_resource_usage(servers)
+        if as_json:
+            print(json.dumps(report, indent=2, ensure_ascii=False))
+        else:
+            print_resource_usage(report)
+        return True
+    
+    def render_inventory(self, inventory_path: str, jobs: Optional[int] = None, output_root: Optional[str] = None,
+                         replace: bool = False, dry_run: bool = False, fsync: bool = True) -> bool:
+        """인벤토리의 모든 대상에 대해 mcp.json 생성"""
+        try:
+            targets = read_inventory(inventory_path)
+        except (OSError, ValueError) as e:
+            print_colored(f"인벤토리 읽기 오류: {str(e)}", Colors.FAIL)
+            return False
+        
+        started = time.perf_counter()
+        with Tracer.span('inventory.render', 'config', targets=len(targets)):
+            results = render_targets(targets, jobs, output_root=output_root, replace=replace,
+                                     dry_run=dry_run, lock_timeout=self._lock.timeout, fsync=fsync,
+                                     templates=str(ServerRegistry.default_path()))
+        elapsed = time.perf_counter() - started
+        
+        counts = {'written': 0, 'unchanged': 0, 'failed': 0}
+        failures = []
+        for path, status, message in results:
+            counts[status] += 1
+            if status == 'failed':
+                failures.append((path, message))
+        
+        print_colored(f"\n===== 인벤토리 생성 결과{' (dry-run)' if dry_run else ''} =====", Colors.HEADER)
+        rate = len(results) / elapsed if elapsed > 0 else 0.0
+        print(f"  대상 {len(results)}개, {elapsed:.2f}초 ({rate:,.0f}개/초)")
+        print_colored(f"  생성/변경: {counts['written']}", Colors.GREEN)
+        print_colored(f"  변경 없음: {counts['unchanged']}", Colors.CYAN)
+        if failures:
+            print_colored(f"  실패: {counts['failed']}", Colors.FAIL)
+            for path, message in failures[:20]:
+                print(f"    {path}: {message}")
+            if len(failures) > 20:
+                print(f"    ... 외 {len(failures) - 20}개")
+        print_colored("==============================", Colors.HEADER)
+        return not failures
+    
+    def show_os_info(self) -> None:
+        """OS 정보 표시"""
+        os_details = OSInfo.get_os_details()
+        
+        print_colored("\n===== 시스템 정보 =====", Colors.HEADER)
+        print(f"운영 체제: {os_details['system']}")
+        print(f"버전: {os_details['release']} ({os_details['version']})")
+        print(f"아키텍처: {os_details['machine']}")
+        print(f"프로세서: {os_details['processor']}")
+        print(f"Python 버전: {os_details['python_version']}")
+        
+        # Node.js 정보 표시
+        node_installed = NodeJSChecker.is_nodejs_installed()
+        node_version = NodeJSChecker.get_nodejs_version() if node_installed else "설치되지 않음"
+        print(f"Node.js 설치 여부: {node_installed}")
+        print(f"Node.js 버전: {node_version}")
+        print(f"Node.js 경로: {NodeProbe.get().path or 'N/A'}")
+        
+        if OSInfo.profile().simulated:
+            print(f"대상 운영 체제: {self.os_type}")
+        print(f"Cursor 설정 경로: {self.cursor_dir}")
+        print(f"MCP 설정 파일: {self.mcp_json_path}")
+        print_colored("========================", Colors.HEADER)
+
+def read_inventory(source: str) -> List[Dict]:
+    """인벤토리 파일 읽기 ('-'이면 표준 입력)
+
+    대상 목록(JSON 배열), {"defaults": {...}, "targets": [...]} 객체, 또는
+    한 줄에 대상 하나씩 작성된 JSON Lines 형식을 지원합니다. defaults의
+    값은 각 대상에 없는 키에만 적용됩니다. 형식이 잘못되면 ValueError를
+    발생시킵니다.
+    """
+    if source == '-':
+        text = sys.stdin.read()
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            text = f.read()
+    
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    
+    defaults = {}
+    if isinstance(data, dict):
+        if 'targets' not in data:
+            # 대상 하나만 있는 JSON Lines
+            data = [data]
+        else:
+            defaults = data.get('defaults') or {}
+            data = data.get('targets')
+    if not isinstance(data, list) or not isinstance(defaults, dict):
+        raise ValueError("인벤토리는 대상 목록이어야 합니다.")
+    
+    targets = []
+    for index, target in enumerate(data):
+        if not isinstance(target, dict):
+            raise ValueError(f"{index}번째 대상이 JSON 객체가 아닙니다.")
+        targets.append(dict(defaults, **target) if defaults else target)
+    return targets
+
+def resolve_token_ref(ref: str) -> str:
+    """토큰 참조 해석 (env:이름 또는 file:경로)
+
+    인벤토리 파일에 토큰을 직접 적지 않도록 환경 변수나 파일만 허용합니다.
+    """
+    kind, _, value = ref.partition(':')
+    if kind == 'env':
+        token = os.environ.get(value)
+        if not token:
+            raise ValueError(f"환경 변수에 토큰이 없습니다: {value}")
+        return token
+    if kind == 'file':
+        with open(os.path.expanduser(value), 'r', encoding='utf-8') as f:
+            token = f.read().strip()
+        if not token:
+            raise ValueError(f"토큰 파일이 비어 있습니다: {value}")
+        return token
+    raise ValueError(f"지원하지 않는 토큰 참조입니다 (env:이름 또는 file:경로): {ref}")
+
+def inventory_target_path(target: Dict, output_root: Optional[str] = None) -> Path:
+    """대상의 mcp.json 경로
+
+    path가 없으면 home과 os로 Cursor 설정 경로를 계산합니다. output_root가
+    주어지면 그 아래에 대상 경로 구조 그대로 생성합니다.
+    """
+    from pathlib import PurePosixPath, PureWindowsPath
+    
+    os_type = target.get('os', OSInfo.detect_os_type())
+    pure_path = PureWindowsPath if os_type == 'windows' else PurePosixPath
+    if target.get('path'):
+        path = pure_path(target['path'])
+    elif target.get('home'):
+        path = PlatformProfile.for_os(os_type, pure_path(target['home'])).cursor_dir / 'mcp.json'
+    else:
+        raise ValueError("대상에 path 또는 home이 필요합니다.")
+    
+    if output_root is not None:
+        parts = path.parts[1:] if path.anchor else path.parts
+        return Path(output_root).joinpath(*parts)
+    if (os_type == 'windows') != (os.name == 'nt'):
+        raise ValueError("다른 OS 형식의 경로는 --output-root와 함께 사용해야 합니다.")
+    return Path(str(path))
+
+def render_target(target: Dict, output_root: Optional[str] = None, replace: bool = False,
+                  dry_run: bool = False, lock_timeout: float = 10.0, fsync: bool = True,
+                  templates: Optional[str] = None) -> tuple:
+    """인벤토리 대상 하나의 mcp.json 생성
+
+    서버 항목은 templates 경로의 서버 템플릿 레지스트리로 만듭니다. 기존
+    설정이 있으면 다른 서버 항목은 유지하고(replace이면 교체) 내용이
+    바뀌지 않았으면 다시 쓰지 않습니다. 결과는 (경로, 상태, 메시지)이며
+    상태는 written/unchanged/failed 중 하나입니다.
+    """
+    path = target.get('path') or target.get('home') or '?'
+    try:
+        path = inventory_target_path(target, output_root)
+        os_type = target.get('os', OSInfo.detect_os_type())
+        if os_type not in OSInfo.SUPPORTED_OS_TYPES:
+            raise ValueError(f"지원하지 않는 OS입니다: {os_type}")
+        
+        values = {'token': resolve_token_ref(target['token'])} if target.get('token') else None
+        windows = os_type == 'windows'
+        servers = {
+            template.name: template.server_entry(windows, values)
+            for template in ServerRegistry.load(templates).resolve(target.get('servers') or ['default'])
+        }
+        
+        if dry_run:
+            return str(path), 'written', f"서버 {len(servers)}개"
+        
+        # 잠금 파일을 만들면서 상위 디렉토리도 생성됨
+        with FileLock(path.with_name(path.name + '.lock'), timeout=lock_timeout):
+            config = {}
+            if path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+                if not isinstance(config, dict):
+                    raise ValueError("기존 설정의 최상위 값이 JSON 객체가 아닙니다.")
+            
+            current = config.get('mcpServers') or {}
+            updated = dict(servers) if replace else dict(current, **servers)
+            if updated == current and 'mcpServers' in config:
+                return str(path), 'unchanged', ''
+            config['mcpServers'] = updated
+            write_json_atomic(path, config, fsync=fsync)
+        return str(path), 'written', f"서버 {len(servers)}개"
+    except (OSError, ValueError, KeyError, TimeoutError) as e:
+        return str(path), 'failed', str(e)
+
+def render_targets(targets: List[Dict], jobs: Optional[int] = None, **options) -> List[tuple]:
+    """인벤토리 대상 전체를 프로세스 풀에서 생성
+
+    jobs가 1이면 현재 프로세스에서 순서대로 생성합니다. 대상은 작업자마다
+    여러 개씩 묶어 전달하므로 작업자 안에서 템플릿의 OS별 인자가 재사용됩니다.
+    """
+    from functools import partial
+    
+    render = partial(render_target, **options)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(targets) <= 1:
+        return [render(target) for target in targets]
+    
+    from concurrent.futures import ProcessPoolExecutor
+    
+    chunksize = max(1, len(targets) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(render, targets, chunksize=chunksize))
+
+# serve 데몬으로 전달할 수 있는 명령
+DAEMON_COMMANDS = {'list', 'add', 'remove', 'export'}
+
+# 데몬이 다른 mcp.json을 관리하고 있을 때의 JSON-RPC 오류 코드
+DAEMON_CONFIG_MISMATCH = -32001
+
+def runtime_socket_path(file_name: str, env_var: str) -> Path:
+    """Unix 소켓 경로 (env_var 환경 변수, XDG_RUNTIME_DIR, 캐시 디렉토리 순)"""
+    if os.environ.get(env_var):
+        return Path(os.environ[env_var])
+    if os.environ.get('XDG_RUNTIME_DIR'):
+        return Path(os.environ['XDG_RUNTIME_DIR']) / file_name
+    return get_cache_dir() / file_name
+
+def daemon_socket_path() -> Path:
+    """serve 데몬 소켓 경로"""
+    return runtime_socket_path('mcp_setup.sock', 'MCP_SETUP_SOCKET')
+
+class MCPSetupDaemon:
+    """mcp.json 편집 데몬
+
+    파싱한 설정을 메모리에 보관하는 MCPSetup 하나로 Unix 소켓의 줄 단위
+    JSON-RPC 요청(list/add/remove/export/ping/shutdown)을 처리합니다.
+    요청은 한 번에 하나씩 처리하며, 각 작업이 출력한 메시지는 결과의
+    log에 담아 돌려줍니다. idle_timeout초 동안 요청이 없으면 종료합니다.
+    """
+    def __init__(self, mcp_setup: 'MCPSetup', socket_path: Path, idle_timeout: Optional[float] = None):
+        import threading
+        
+        self.mcp_setup = mcp_setup
+        self.socket_path = Path(socket_path)
+        self.idle_timeout = idle_timeout
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._last_activity = time.monotonic()
+        self._server = None
+    
+    def handle(self, method: str, params: Dict) -> Dict:
+        """요청 하나 처리 (작업 출력은 log로 수집)"""
+        import io
+        from contextlib import redirect_stdout
+        
+        requested = params.get('mcp_json')
+        if requested and Path(requested) != self.mcp_setup.mcp_json_path:
+            raise DaemonError(DAEMON_CONFIG_MISMATCH,
+                              f"데몬이 관리하는 설정 파일이 다릅니다: {self.mcp_setup.mcp_json_path}")
+        
+        handler = getattr(self, f"rpc_{method}", None)
+        if handler is None:
+            raise DaemonError(-32601, f"Method not found: {method}")
+        
+        with self._lock:
+            self.requests += 1
+            self._last_activity = time.monotonic()
+            log = io.StringIO()
+            with redirect_stdout(log), Tracer.span(f"daemon.{method}", 'daemon'):
+                result = handler(params)
+        result['log'] = log.getvalue()
+        return result
+    
+    def rpc_ping(self, params: Dict) -> Dict:
+        return {'ok': True, 'pid': os.getpid(), 'mcp_json': str(self.mcp_setup.mcp_json_path),
+                'requests': self.requests}
+    
+    def rpc_list(self, params: Dict) -> Dict:
+        records = self.mcp_setup.find_servers(params.get('filters'))
+        return {'ok': True, 'servers': [record.to_dict() for record in records]}
+    
+    def rpc_add(self, params: Dict) -> Dict:
+        try:
+            limits = ResourceLimits.from_dict(params.get('limits'))
+        except ValueError as e:
+            raise DaemonError(-32602, str(e))
+        if params.get('template'):
+            ok = self.mcp_setup.add_template_server(params['template'], params.get('name'), params.get('params'),
+                                                    limits)
+        else:
+            if not params.get('name') or not params.get('command'):
+                raise DaemonError(-32602, "add에는 name과 command가 필요합니다.")
+            ok = self.mcp_setup.add_mcp_server(params['name'], params['command'], list(params.get('args') or []),
+                                               limits)
+        return {'ok': ok}
+    
+    def rpc_remove(self, params: Dict) -> Dict:
+        if not params.get('name'):
+            raise DaemonError(-32602, "remove에는 name이 필요합니다.")
+        return {'ok': self.mcp_setup.remove_mcp_server(params['name'])}
+    
+    def rpc_export(self, params: Dict) -> Dict:
+        output = params.get('output')
+        if output is None:
+            # 기본 경로는 요청한 쪽의 작업 디렉토리 기준
+            output = Path(params.get('cwd') or self.mcp_setup.current_dir) / 'mcp_setup' / 'exported_mcp_config.json'
+            output.parent.mkdir(exist_ok=True, parents=True)
+        return {'ok': self.mcp_setup.export_mcp_config(str(output), bool(params.get('compact'))), 'output': str(output)}
+    
+    def rpc_shutdown(self, params: Dict) -> Dict:
+        import threading
+        
+        threading.Thread(target=self._server.shutdown, daemon=True).start()
+        return {'ok': True}
+    
+    def serve_forever(self) -> None:
+        """소켓을 열고 종료 요청이나 시그널을 받을 때까지 요청 처리"""
+        import signal
+        import socketserver
+        import threading
+        
+        daemon = self
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    response = daemon.respond(line)
+                    self.wfile.write((json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8'))
+                    self.wfile.flush()
+        
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+        
+        self.socket_path.parent.mkdir(exist_ok=True, parents=True)
+        if daemon_request(self.socket_path, 'ping', {}, timeout=1.0) is not None:
+            raise DaemonError(-32000, f"이미 실행 중인 데몬이 있습니다: {self.socket_path}")
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+        
+        old_umask = os.umask(0o177)
+        try:
+            self._server = Server(str(self.socket_path), Handler)
+        finally:
+            os.umask(old_umask)
+        
+        def stop(signum, frame):
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+        
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        if self.idle_timeout:
+            threading.Thread(target=self._watch_idle, daemon=True).start()
+        
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+    
+    def respond(self, line: bytes) -> Dict:
+        """JSON-RPC 요청 한 줄에 대한 응답"""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("요청은 JSON 객체여야 합니다.")
+        except ValueError as e:
+            return {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': str(e)}}
+        
+        request_id = request.get('id')
+        try:
+            result = self.handle(request.get('method', ''), request.get('params') or {})
+            return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+        except DaemonError as e:
+            return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': e.code, 'message': str(e)}}
+        except Exception as e:
+            return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': -32603, 'message': str(e)}}
+    
+    def _watch_idle(self) -> None:
+        """요청 없이 idle_timeout초가 지나면 종료"""
+        while True:
+            remaining = self._last_activity + self.idle_timeout - time.monotonic()
+            if remaining <= 0:
+                self._server.shutdown()
+                return
+            time.sleep(min(remaining, 1.0))
+
+class DaemonError(Exception):
+    """데몬 JSON-RPC 오류"""
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+def daemon_request(socket_path: Path, method: str, params: Dict, timeout: float = 30.0) -> Optional[Dict]:
+    """데몬에 요청을 보내고 응답 반환 (데몬이 없으면 None)"""
+    if not os.path.exists(socket_path):
+        return None
+    import socket
+    
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return None
+        request = {'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params}
+        sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+        with sock.makefile('rb') as f:
+            line = f.readline()
+        if not line:
+            raise DaemonError(-32000, "데몬이 응답 없이 연결을 닫았습니다.")
+        return json.loads(line)
+    finally:
+        sock.close()
+
+def serve_daemon(mcp_setup: 'MCPSetup', args) -> bool:
+    """serve 명령 실행 (데몬 시작, --status, --stop)"""
+    import socket
+    
+    socket_path = Path(args.socket) if args.socket else daemon_socket_path()
+    if not hasattr(socket, 'AF_UNIX'):
+        print_colored("이 플랫폼에서는 Unix 소켓을 사용할 수 없어 데몬을 실행할 수 없습니다.", Colors.FAIL)
+        return False
+    
+    if args.status or args.stop:
+        try:
+            response = daemon_request(socket_path, 'shutdown' if args.stop else 'ping', {}, timeout=5.0)
+        except (OSError, ValueError, DaemonError) as e:
+            print_colored(f"데몬 요청 오류: {str(e)}", Colors.FAIL)
+            return False
+        if response is None:
+            print_colored(f"실행 중인 데몬이 없습니다: {socket_path}", Colors.WARNING)
+            return False
+        result = response.get('result') or {}
+        if args.stop:
+            print_colored(f"데몬 종료 요청 완료: {socket_path}", Colors.GREEN)
+        else:
+            print_colored(f"데몬 실행 중: {socket_path} (pid {result.get('pid')}, 설정 {result.get('mcp_json')}, "
+                          f"처리한 요청 {result.get('requests')}개)", Colors.GREEN)
+        return True
+    
+    mcp_setup.cache_config = True
+    daemon = MCPSetupDaemon(mcp_setup, socket_path, args.idle_timeout)
+    print_colored(f"데몬 시작: {socket_path} ({mcp_setup.mcp_json_path})", Colors.GREEN)
+    sys.stdout.flush()
+    try:
+        daemon.serve_forever()
+    except DaemonError as e:
+        print_colored(str(e), Colors.FAIL)
+        return False
+    print_colored("데몬 종료", Colors.CYAN)
+    return True
+
+def forward_to_daemon(args) -> bool:
+    """실행 중인 serve 데몬으로 명령 전달 (처리했으면 True)
+
+    데몬이 없거나 다른 mcp.json을 관리하고 있으면 False를 반환하며,
+    이 경우 명령은 현재 프로세스에서 실행됩니다.
+    """
+    if args.command == 'list':
+        params = {'filters': dict(args.filter)}
+    elif args.command == 'add':
+        if args.template:
+            params = {'template': args.template, 'name': args.name,
+                      'params': dict(param.partition('=')[::2] for param in args.param)}
+        elif args.name and args.server_command and args.args is not None:
+            params = {'name': args.name, 'command': args.server_command, 'args': args.args.split(',')}
+        else:
+            return False
+        params['limits'] = ResourceLimits.from_args(args).to_dict()
+    elif args.command == 'remove':
+        params = {'name': args.name}
+    elif args.command == 'export':
+        params = {'output': str(Path(args.output).resolve()) if args.output else None,
+                  'cwd': str(Path.cwd()), 'compact': args.compact}
+    else:
+        return False
+    params['mcp_json'] = str(OSInfo.profile().cursor_dir / 'mcp.json')
+    
+    socket_path = Path(args.socket) if args.socket else daemon_socket_path()
+    try:
+        response = daemon_request(socket_path, args.command, params)
+    except (OSError, ValueError, DaemonError) as e:
+        print_colored(f"데몬 요청 오류: {str(e)}", Colors.FAIL)
+        sys.exit(1)
+    if response is None:
+        return False
+    
+    error = response.get('error')
+    if error:
+        if error.get('code') == DAEMON_CONFIG_MISMATCH:
+            return False
+        print_colored(f"데몬 오류: {error.get('message')}", Colors.FAIL)
+        sys.exit(1)
+    
+    result = response.get('result') or {}
+    sys.stdout.write(result.get('log', ''))
+    if args.command == 'list':
+        MCPSetup.print_servers(result.get('servers'), bool(args.filter))
+    return True
+
+# MCP stdio 프로토콜 버전
+MCP_PROTOCOL_VERSION = '2024-11-05'
+
+class MCPError(Exception):
+    """MCP 서버의 오류 응답 또는 통신 오류"""
+
+class MCPStdioClient:
+    """MCP stdio 클라이언트
+
+    서버 프로세스를 asyncio 서브프로세스로 실행하고 줄 단위 JSON-RPC로
+    요청을 주고받습니다. 여러 요청을 동시에 보낼 수 있습니다.
+    """
+    # tools/list 응답처럼 긴 줄도 읽을 수 있도록 스트림 한도를 늘림
+    STREAM_LIMIT = 16 * 1024 * 1024
+    
+    def __init__(self, command: str, args: List[str], env: Optional[Dict[str, str]] = None):
+        self.command = command
+        self.args = list(args)
+        self.env = env
+        self.process = None
+        self.server_info = None
+        self.spawn_seconds = None
+        self.first_response_seconds = None
+        self._started = None
+        self._next_id = 0
+        self._pending = {}
+        self._reader = None
+    
+    @property
+    def running(self) -> bool:
+        """서버 프로세스가 실행 중이고 응답을 읽고 있는지"""
+        return (self.process is not None and self.process.returncode is None
+                and self._reader is not None and not self._reader.done())
+    
+    async def start(self) -> None:
+        """서버 프로세스 실행"""
+        import asyncio
+        
+        env = dict(os.environ, **{k: str(v) for k, v in self.env.items()}) if self.env else None
+        self._started = time.perf_counter()
+        self.process = await asyncio.create_subprocess_exec(
+            self.command, *self.args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            env=env,
+            limit=self.STREAM_LIMIT,
+        )
+        self.spawn_seconds = time.perf_counter() - self._started
+        self._reader = asyncio.ensure_future(self._read_loop())
+    
+    async def _read_loop(self) -> None:
+        """서버 응답을 읽어 대기 중인 요청에 전달"""
+        try:
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    # JSON이 아닌 로그 출력은 무시
+                    continue
+                if not isinstance(message, dict) or 'method' in message:
+                    continue
+                future = self._pending.pop(message.get('id'), None)
+                if future is None or future.done():
+                    continue
+                if self.first_response_seconds is None:
+                    self.first_response_seconds = time.perf_counter() - self._started
+                if 'error' in message:
+                    error = message['error'] if isinstance(message['error'], dict) else {}
+                    future.set_exception(MCPError(error.get('message', str(message['error']))))
+                else:
+                    future.set_result(message.get('result'))
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(MCPError("서버 프로세스가 종료되었습니다."))
+            self._pending.clear()
+    
+    async def _send(self, message: Dict) -> None:
+        try:
+            self.process.stdin.write((json.dumps(message) + '\n').encode('utf-8'))
+            await self.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise MCPError(f"서버에 요청을 보낼 수 없습니다: {str(e)}")
+    
+    async def request(self, method: str, params: Optional[Dict] = None) -> Any:
+        """요청을 보내고 결과를 기다림"""
+        import asyncio
+        
+        if self._reader is not None and self._reader.done():
+            raise MCPError("서버 프로세스가 종료되었습니다.")
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_event_loop().create_future()
+        self._pending[request_id] = future
+        await self._send({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params or {}})
+        return await future
+    
+    async def notify(self, method: str, params: Optional[Dict] = None) -> None:
+        """알림 전송 (응답 없음)"""
+        await self._send({'jsonrpc': '2.0', 'method': method, 'params': params or {}})
+    
+    async def initialize(self) -> Dict:
+        """initialize 핸드셰이크 수행"""
+        result = await self.request('initialize', {
+            'protocolVersion': MCP_PROTOCOL_VERSION,
+            'capabilities': {},
+            'clientInfo': {'name': 'mcp_setup', 'version': '1.0'},
+        })
+        result = result if isinstance(result, dict) else {}
+        self.server_info = result.get('serverInfo')
+        await self.notify('notifications/initialized')
+        return result
+    
+    async def close(self, timeout: float = 2.0) -> None:
+        """서버 프로세스 종료"""
+        import asyncio
+        
+        if self.process is None:
+            return
+        if self.process.stdin and not self.process.stdin.is_closing():
+            self.process.stdin.close()
+        if self.process.returncode is None:
+            try:
+                self.process.terminate()
+                await asyncio.wait_for(self.process.wait(), timeout)
+            except ProcessLookupError:
+                pass
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """프로세스와 모든 자식 프로세스의 RSS 합계(바이트). 측정할 수 없으면 None
+
+    psutil이 있으면 사용하고, 없으면 Linux의 /proc을 직접 읽습니다.
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            procs = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for proc in procs:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+    
+    if not sys.platform.startswith('linux'):
+        return None
+    
+    total = 0
+    found = False
+    for current in process_tree_pids(pid):
+        try:
+            with open(f'/proc/{current}/status', 'r') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        found = True
+                        break
+        except (OSError, ValueError):
+            continue
+    return total if found else None
+
+def process_tree_pids(pid: int) -> List[int]:
+    """프로세스와 모든 자식 프로세스의 pid (Linux /proc 기준, 종료된 프로세스는 제외)"""
+    pids = []
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        if current in pids:
+            continue
+        try:
+            children = []
+            for tid in os.listdir(f'/proc/{current}/task'):
+                with open(f'/proc/{current}/task/{tid}/children', 'r') as f:
+                    children.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+        pids.append(current)
+        stack.extend(children)
+    return pids
+
+def process_open_files(pid: int) -> Optional[int]:
+    """프로세스와 모든 자식 프로세스가 연 파일 디스크립터 수 (측정할 수 없으면 None)"""
+    if not sys.platform.startswith('linux'):
+        return None
+    total = None
+    for current in process_tree_pids(pid):
+        try:
+            total = (total or 0) + len(os.listdir(f'/proc/{current}/fd'))
+        except OSError:
+            continue
+    return total
+
+async def probe_mcp_server(name: str, server: Dict, timeout: float, sample_interval: float = 0.05) -> Dict:
+    """MCP 서버 하나를 실행해 initialize 응답 시간과 최대 메모리 측정"""
+    import asyncio
+    
+    result = {
+        'name': name,
+        'status': 'ok',
+        'spawn_ms': None,
+        'first_response_ms': None,
+        'peak_rss_bytes': None,
+        'server_info': None,
+        'error': None,
+    }
+    client = MCPStdioClient(server.get('command', ''), server.get('args', []), server.get('env'))
+    peak = [None]
+    
+    def sample():
+        rss = process_tree_rss(client.process.pid)
+        if rss is not None and (peak[0] is None or rss > peak[0]):
+            peak[0] = rss
+    
+    async def sample_loop():
+        while True:
+            sample()
+            await asyncio.sleep(sample_interval)
+    
+    sampler = None
+    try:
+        await client.start()
+        sampler = asyncio.ensure_future(sample_loop())
+        await asyncio.wait_for(client.initialize(), timeout)
+        result['server_info'] = client.server_info
+    except asyncio.TimeoutError:
+        result['status'] = 'timeout'
+        result['error'] = f"{timeout}초 안에 응답이 없습니다."
+    except (OSError, MCPError) as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+    finally:
+        if sampler is not None:
+            sampler.cancel()
+            sample()
+        await client.close()
+    
+    if client.spawn_seconds is not None:
+        result['spawn_ms'] = client.spawn_seconds * 1000
+    if client.first_response_seconds is not None:
+        result['first_response_ms'] = client.first_response_seconds * 1000
+    result['peak_rss_bytes'] = peak[0]
+    return result
+
+async def probe_mcp_servers(servers: Dict[str, Dict], concurrency: int = 4, timeout: float = 30.0) -> List[Dict]:
+    """여러 MCP 서버를 동시에 측정 (동시 실행 수는 concurrency로 제한)"""
+    import asyncio
+    
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    
+    async def run(name, server):
+        async with semaphore:
+            return await probe_mcp_server(name, server, timeout)
+    
+    return await asyncio.gather(*(run(name, server) for name, server in servers.items()))
+
+def percentile(ordered: List[float], p: float) -> Optional[float]:
+    """정렬된 값의 p 분위수 (nearest-rank, 값이 없으면 None)"""
+    if not ordered:
+        return None
+    import math
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(len(ordered) * p) - 1))]
+
+# 부하 테스트 지연 시간 히스토그램 구간 상한(ms)
+LOADTEST_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+def read_recorded_calls(path: str) -> List[Dict]:
+    """기록된 tools/call 요청 읽기 (tools/call 매개변수 목록 반환)
+
+    JSON 배열 또는 JSON Lines이며, 각 항목은 tools/call JSON-RPC 메시지나
+    {"name": ..., "arguments": {...}} 형태입니다. 다른 메서드는 건너뜁니다.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith('['):
+        items = json.loads(text)
+    else:
+        items = [json.loads(line) for line in text.splitlines() if line.strip()]
+    
+    calls = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f"#{i}: 요청은 JSON 객체여야 합니다.")
+        if 'method' in item:
+            if item['method'] != 'tools/call':
+                continue
+            item = item.get('params') or {}
+        if not isinstance(item.get('name'), str) or not isinstance(item.get('arguments', {}), dict):
+            raise ValueError(f"#{i}: 'name' 문자열과 'arguments' 객체가 필요합니다.")
+        calls.append({'name': item['name'], 'arguments': item.get('arguments', {})})
+    if not calls:
+        raise ValueError("tools/call 요청이 없습니다.")
+    return calls
+
+async def run_load_test(server: Dict, calls: Optional[List[Dict]] = None, concurrency: int = 4,
+                        rate: Optional[float] = None, total: Optional[int] = 100,
+                        duration: Optional[float] = None, timeout: float = 30.0,
+                        warmup: int = 0) -> Dict:
+    """MCP 서버 하나에 tools/call 요청을 보내 처리량과 지연 시간 측정
+
+    calls를 차례로 반복해 보내며, 없으면 인자 없이 호출할 수 있는 첫 도구를
+    사용합니다. concurrency는 동시에 처리 중인 요청 수의 상한이고, rate가
+    있으면 초당 rate개씩 예정된 시각에 보냅니다. 이때 지연 시간은 예정 시각부터
+    재므로 서버가 밀려 늦게 보낸 시간도 포함됩니다.
+    """
+    import asyncio
+    
+    client = MCPStdioClient(server.get('command', ''), server.get('args', []), server.get('env'))
+    report = {
+        'status': 'ok',
+        'error': None,
+        'concurrency': concurrency,
+        'rate': rate,
+        'requests': 0,
+        'errors': 0,
+        'error_rate': None,
+        'error_messages': {},
+        'elapsed_s': None,
+        'throughput_rps': None,
+        'latency_ms': None,
+        'histogram': None,
+        'server_info': None,
+    }
+    try:
+        await client.start()
+        await asyncio.wait_for(client.initialize(), timeout)
+        report['server_info'] = client.server_info
+        
+        if not calls:
+            result = await asyncio.wait_for(client.request('tools/list'), timeout) or {}
+            tool = next((tool for tool in result.get('tools', [])
+                         if not (tool.get('inputSchema') or {}).get('required')), None)
+            if tool is None:
+                raise MCPError("인자 없이 호출할 수 있는 도구가 없습니다. --tool 또는 --calls를 지정하세요.")
+            calls = [{'name': tool['name'], 'arguments': {}}]
+        
+        for i in range(warmup):
+            await asyncio.wait_for(client.request('tools/call', calls[i % len(calls)]), timeout)
+        
+        latencies = []
+        errors = {}
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        loop = asyncio.get_event_loop()
+        
+        async def one(params, scheduled):
+            try:
+                result = await asyncio.wait_for(client.request('tools/call', params), timeout)
+                error = 'isError' if isinstance(result, dict) and result.get('isError') else None
+            except asyncio.TimeoutError:
+                error = 'timeout'
+            except MCPError as e:
+                error = str(e)
+            finally:
+                semaphore.release()
+            latencies.append((loop.time() - scheduled) * 1000)
+            if error is not None:
+                errors[error] = errors.get(error, 0) + 1
+        
+        started = loop.time()
+        deadline = started + duration if duration else None
+        tasks = []
+        i = 0
+        with Tracer.span('loadtest', 'loadtest', concurrency=concurrency, rate=rate):
+            while total is None or i < total:
+                if rate:
+                    scheduled = started + i / rate
+                    if deadline is not None and scheduled >= deadline:
+                        break
+                    if scheduled > loop.time():
+                        await asyncio.sleep(scheduled - loop.time())
+                elif deadline is not None and loop.time() >= deadline:
+                    break
+                await semaphore.acquire()
+                if not client.running:
+                    semaphore.release()
+                    raise MCPError("서버 프로세스가 종료되었습니다.")
+                tasks.append(asyncio.ensure_future(one(calls[i % len(calls)], scheduled if rate else loop.time())))
+                i += 1
+            await asyncio.gather(*tasks)
+        elapsed = loop.time() - started
+        
+        latencies.sort()
+        count = len(latencies)
+        failed = sum(errors.values())
+        histogram = []
+        index = 0
+        for bound in LOADTEST_BUCKETS_MS + (None,):
+            start = index
+            while index < count and (bound is None or latencies[index] <= bound):
+                index += 1
+            histogram.append({'le_ms': bound, 'count': index - start})
+        report.update({
+            'requests': count,
+            'errors': failed,
+            'error_rate': failed / count if count else None,
+            'error_messages': errors,
+            'elapsed_s': elapsed,
+            'throughput_rps': count / elapsed if elapsed > 0 else None,
+            'latency_ms': {
+                'min': latencies[0] if latencies else None,
+                'mean': sum(latencies) / count if count else None,
+                'p50': percentile(latencies, 0.50),
+                'p95': percentile(latencies, 0.95),
+                'p99': percentile(latencies, 0.99),
+                'max': latencies[-1] if latencies else None,
+            },
+            'histogram': histogram,
+        })
+    except asyncio.TimeoutError:
+        report['status'] = 'timeout'
+        report['error'] = f"{timeout}초 안에 응답이 없습니다."
+    except (OSError, MCPError) as e:
+        report['status'] = 'error'
+        report['error'] = str(e)
+    finally:
+        await client.close()
+    return report
+
+def print_load_report(name: str, report: Dict) -> None:
+    """부하 테스트 결과 출력"""
+    def ms(value):
+        return f"{value:.2f}" if value is not None else "-"
+    
+    def rps(value):
+        return f"{value:.1f}" if value is not None else "-"
+    
+    def percent(value):
+        return f"{value * 100:.2f}%" if value is not None else "-"
+    
+    print_colored(f"\n===== MCP 부하 테스트: {name} =====", Colors.HEADER)
+    if report['status'] != 'ok':
+        print_colored(f"  {report['status']}: {report['error']}", Colors.FAIL)
+        return
+    rate = f"{report['rate']:g}/s" if report['rate'] else "제한 없음"
+    print(f"  동시 요청 {report['concurrency']}개, 속도 {rate}, 요청 {report['requests']}개, {report['elapsed_s']:.2f}s")
+    print(f"  처리량: {rps(report['throughput_rps'])} 요청/s")
+    latency = report['latency_ms']
+    print(f"  지연 시간(ms): p50 {ms(latency['p50'])}  p95 {ms(latency['p95'])}  p99 {ms(latency['p99'])}  "
+          f"최대 {ms(latency['max'])}  평균 {ms(latency['mean'])}")
+    color = Colors.GREEN if not report['errors'] else Colors.FAIL
+    print_colored(f"  오류: {report['errors']}개 ({percent(report['error_rate'])})", color)
+    for message, count in sorted(report['error_messages'].items(), key=lambda item: -item[1]):
+        print(f"    {count:>6}  {message}")
+    
+    peak = max((bucket['count'] for bucket in report['histogram']), default=0)
+    if peak:
+        print("  분포:")
+        lower = 0
+        for bucket in report['histogram']:
+            bound = bucket['le_ms']
+            if bucket['count']:
+                label = f"{lower:g}-{bound:g}ms" if bound is not None else f">{lower:g}ms"
+                bar = '#' * max(1, round(bucket['count'] / peak * 40))
+                print(f"    {label:>14} {bucket['count']:>7} {bar}")
+            lower = bound
+    print_colored("=" * 36, Colors.HEADER)
+
+def run_stub_server(startup_delay: float = 0.0, latency_ms: float = 0.0,
+                    extra_tools: int = 0, fail_rate: float = 0.0) -> None:
+    """테스트용 MCP stdio 서버
+
+    initialize, ping, tools/list, tools/call(echo, add)을 지원합니다.
+    latency_ms가 있으면 tools/call을 별도 스레드에서 처리해 동시 요청이
+    겹쳐서 처리되도록 합니다.
+    """
+    import random
+    import threading
+    
+    time.sleep(startup_delay)
+    print(f"[mcp-setup-stub] 시작 (pid {os.getpid()})", file=sys.stderr, flush=True)
+    write_lock = threading.Lock()
+    stdout = sys.stdout
+    
+    def send(message):
+        with write_lock:
+            stdout.write(json.dumps(message, ensure_ascii=False) + '\n')
+            stdout.flush()
+    
+    tools = [
+        {
+            'name': 'echo',
+            'description': '입력한 문자열을 그대로 반환합니다.',
+            'inputSchema': {'type': 'object', 'properties': {'text': {'type': 'string'}}},
+        },
+        {
+            'name': 'add',
+            'description': '두 숫자의 합을 반환합니다.',
+            'inputSchema': {
+                'type': 'object',
+                'properties': {'a': {'type': 'number'}, 'b': {'type': 'number'}},
+                'required': ['a', 'b'],
+            },
+        },
+    ]
+    tools += [
+        {'name': f'tool_{i}', 'description': f'테스트용 도구 {i}', 'inputSchema': {'type': 'object'}}
+        for i in range(extra_tools)
+    ]
+    
+    def call_tool(request_id, params):
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        name = params.get('name')
+        arguments = params.get('arguments') or {}
+        if not isinstance(arguments, dict):
+            send({'jsonrpc': '2.0', 'id': request_id,
+                  'error': {'code': -32602, 'message': 'Invalid params: arguments must be an object'}})
+        elif fail_rate and random.random() < fail_rate:
+            send({'jsonrpc': '2.0', 'id': request_id, 'error': {'code': -32000, 'message': 'stub failure'}})
+        elif name == 'echo':
+            text = str(arguments.get('text', ''))
+            send({'jsonrpc': '2.0', 'id': request_id, 'result': {'content': [{'type': 'text', 'text': text}]}})
+        elif name == 'add':
+            numbers = [arguments.get('a', 0), arguments.get('b', 0)]
+            if all(isinstance(n, (int, float)) and not isinstance(n, bool) for n in numbers):
+                result = {'content': [{'type': 'text', 'text': str(numbers[0] + numbers[1])}]}
+            else:
+                result = {'content': [{'type': 'text', 'text': 'a and b must be numbers'}], 'isError': True}
+            send({'jsonrpc': '2.0', 'id': request_id, 'result': result})
+        elif any(tool['name'] == name for tool in tools):
+            send({'jsonrpc': '2.0', 'id': request_id, 'result': {'content': []}})
+        else:
+            send({'jsonrpc': '2.0', 'id': request_id, 'error': {'code': -32602, 'message': f'Unknown tool: {name}'}})
+    
+    for line in sys.stdin:
+        try:
+            message = json.loads(line)
+        except ValueError:
+            send({'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': 'Parse error'}})
+            continue
+        if not isinstance(message, dict):
+            send({'jsonrpc': '2.0', 'id': None, 'error': {'code': -32600, 'message': 'Invalid Request'}})
+            continue
+        method = message.get('method')
+        request_id = message.get('id')
+        if request_id is None:
+            continue
+        
+        if method == 'initialize':
+            send({'jsonrpc': '2.0', 'id': request_id, 'result': {
+                'protocolVersion': MCP_PROTOCOL_VERSION,
+                'capabilities': {'tools': {}},
+                'serverInfo': {'name': 'mcp-setup-stub', 'version': '1.0'},
+            }})
+        elif method == 'ping':
+            send({'jsonrpc': '2.0', 'id': request_id, 'result': {}})
+        elif method == 'tools/list':
+            send({'jsonrpc': '2.0', 'id': request_id, 'result': {'tools': tools}})
+        elif method == 'tools/call':
+            params = message.get('params') or {}
+            if not isinstance(params, dict):
+                send({'jsonrpc': '2.0', 'id': request_id,
+                      'error': {'code': -32602, 'message': 'Invalid params: params must be an object'}})
+            elif latency_ms:
+                threading.Thread(target=call_tool, args=(request_id, params), daemon=True).start()
+            else:
+                call_tool(request_id, params)
+        else:
+            send({'jsonrpc': '2.0', 'id': request_id, 'error': {'code': -32601, 'message': f'Method not found: {method}'}})
+
+def stub_server_entry(*stub_args: str) -> Dict:
+    """내장 테스트 서버를 실행하는 mcp.json 항목"""
+    return {
+        'command': sys.executable,
+        'args': [str(Path(__file__).resolve()), 'stub-server'] + list(stub_args),
+    }
+
+# 게이트웨이 항목 이름과 백엔드 목록 파일 (mcp.json과 같은 디렉토리)
+GATEWAY_SERVER_NAME = 'mcp-gateway'
+GATEWAY_BACKENDS_FILE = 'mcp_backends.json'
+
+class ToolManifestCache:
+    """MCP 서버별 도구 목록(매니페스트) 캐시
+
+    서버 항목(명령어, 인자, 환경 변수)과 항목이 실행하는 캐시된 npm 패키지의
+    버전을 해시한 값을 키로 저장합니다. 항목이 바뀌거나 패키지가 다시 설치될
+    때만 키가 달라지므로, 그 전까지는 tools 명령과 게이트웨이가 도구 목록을
+    위해 서버를 실행하지 않습니다.
+    """
+    CACHE_FILE = 'tool_manifests.json'
+    
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else get_cache_dir() / self.CACHE_FILE
+        self._entries = None
+    
+    @staticmethod
+    def package_versions(server: Dict) -> Dict[str, str]:
+        """인자에 있는 node_modules 경로의 패키지 버전 ({이름: 버전})
+
+        npx 항목은 패키지 명세가 인자에 그대로 들어 있으므로, 버전이 인자에
+        드러나지 않는 캐시된 실행 파일 경로만 package.json에서 읽습니다.
+        """
+        versions = {}
+        for arg in server.get('args') or []:
+            parts = str(arg).replace('\\', '/').split('/')
+            if 'node_modules' not in parts:
+                continue
+            i = len(parts) - 1 - parts[::-1].index('node_modules')
+            width = 2 if i + 1 < len(parts) and parts[i + 1].startswith('@') else 1
+            package = parts[i + 1:i + 1 + width]
+            if len(package) != width:
+                continue
+            package_json = Path('/'.join(parts[:i + 1] + package + ['package.json']))
+            try:
+                with open(package_json, 'r', encoding='utf-8') as f:
+                    versions['/'.join(package)] = str(json.load(f).get('version', ''))
+            except (OSError, ValueError, AttributeError):
+                versions['/'.join(package)] = ''
+        return versions
+    
+    @classmethod
+    def server_key(cls, server: Dict) -> str:
+        """서버 항목과 패키지 버전의 해시 (환경 변수에 토큰이 있을 수 있으므로 해시만 사용)"""
+        import hashlib
+        
+        material = [server.get('command'), server.get('args', []), server.get('env', {}),
+                    cls.package_versions(server)]
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        entries = data.get('servers') if isinstance(data, dict) else None
+        return entries if isinstance(entries, dict) else {}
+    
+    def lookup(self, server: Dict) -> Optional[Dict]:
+        """캐시 항목 ({tools, server_info, updated}, 없으면 None)"""
+        if self._entries is None:
+            self._entries = self._read()
+        entry = self._entries.get(self.server_key(server))
+        if isinstance(entry, dict) and isinstance(entry.get('tools'), list):
+            return entry
+        return None
+    
+    def get(self, server: Dict) -> Optional[List[Dict]]:
+        """캐시된 도구 목록 (없으면 None)"""
+        entry = self.lookup(server)
+        return entry['tools'] if entry is not None else None
+    
+    def put_many(self, items: List[tuple]) -> bool:
+        """(서버 항목, 도구 목록, serverInfo) 여러 개를 한 번에 저장
+
+        다른 프로세스가 기록한 항목과 병합하며, 저장하지 못하면 False를 반환합니다.
+        """
+        now = time.time()
+        updates = {
+            self.server_key(server): {'tools': tools, 'server_info': server_info, 'updated': now}
+            for server, tools, server_info in items
+        }
+        try:
+            with FileLock(self.path.with_name(self.path.name + '.lock')):
+                entries = self._read()
+                entries.update(updates)
+                write_json_atomic(self.path, {'version': 1, 'servers': entries}, indent=None)
+        except (OSError, LockTimeout):
+            return False
+        self._entries = entries
+        return True
+    
+    def put(self, server: Dict, tools: List[Dict], server_info: Optional[Dict] = None) -> bool:
+        """도구 목록 저장"""
+        return self.put_many([(server, tools, server_info)])
+
+async def read_tool_list(request) -> List[Dict]:
+    """tools/list를 nextCursor가 없을 때까지 읽음
+
+    request(method, params)는 JSON-RPC 응답의 result를 돌려주는 코루틴 함수입니다.
+    """
+    tools = []
+    cursor = None
+    while True:
+        result = await request('tools/list', {'cursor': cursor} if cursor else {}) or {}
+        tools += [tool for tool in result.get('tools', []) if isinstance(tool, dict) and tool.get('name')]
+        cursor = result.get('nextCursor')
+        if not cursor:
+            return tools
+
+async def fetch_tool_manifest(name: str, server: Dict, timeout: float) -> Dict:
+    """MCP 서버 하나를 실행해 initialize와 tools/list 결과를 읽음"""
+    import asyncio
+    
+    result = {'name': name, 'status': 'ok', 'tools': None, 'server_info': None, 'error': None}
+    client = MCPStdioClient(server.get('command', ''), server.get('args', []), server.get('env'))
+    
+    async def handshake():
+        await client.start()
+        await client.initialize()
+        return await read_tool_list(client.request)
+    
+    try:
+        with Tracer.span(f"tools/list {name}", 'tools'):
+            result['tools'] = await asyncio.wait_for(handshake(), timeout)
+        result['server_info'] = client.server_info
+    except asyncio.TimeoutError:
+        result['status'] = 'timeout'
+        result['error'] = f"{timeout}초 안에 도구 목록을 받지 못했습니다."
+    except (OSError, MCPError) as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+    finally:
+        await client.close()
+    return result
+
+async def fetch_tool_manifests(servers: Dict[str, Dict], concurrency: int = 8,
+                               timeout: float = 30.0) -> List[Dict]:
+    """여러 MCP 서버의 도구 목록을 동시에 읽음 (동시 실행 수는 concurrency로 제한)"""
+    import asyncio
+    
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    
+    async def run(name, server):
+        async with semaphore:
+            return await fetch_tool_manifest(name, server, timeout)
+    
+    return await asyncio.gather(*(run(name, server) for name, server in servers.items()))
+
+def search_tools(manifests: List[Dict], query: str) -> List[tuple]:
+    """도구 이름과 설명에서 검색어를 모두 포함하는 도구 찾기
+
+    (서버 이름, 도구) 목록을 이름에 검색어가 많이 들어간 순서로 반환합니다.
+    """
+    terms = query.lower().split()
+    matches = []
+    for manifest in manifests:
+        for tool in manifest.get('tools') or []:
+            name = str(tool.get('name', '')).lower()
+            text = f"{name} {str(tool.get('description') or '').lower()}"
+            if all(term in text for term in terms):
+                score = sum(term in name for term in terms)
+                matches.append((-score, manifest['name'], name, tool))
+    matches.sort(key=lambda match: match[:3])
+    return [(server_name, tool) for _, server_name, _, tool in matches]
+
+def tool_summary(tool: Dict, width: int = 72) -> str:
+    """도구 설명의 첫 줄 (width자를 넘으면 자름)"""
+    lines = str(tool.get('description') or '').strip().splitlines()
+    line = lines[0] if lines else ''
+    return line if len(line) <= width else line[:width - 1] + '…'
+
+def print_tool_manifests(manifests: List[Dict], query: Optional[str] = None) -> None:
+    """도구 목록 또는 검색 결과 출력"""
+    if query is not None:
+        matches = search_tools(manifests, query)
+        print_colored(f"\n===== 도구 검색: {query} ({len(matches)}개) =====", Colors.HEADER)
+        for server_name, tool in matches:
+            print(f"  {server_name}: {tool['name']}  {tool_summary(tool)}")
+        if not matches:
+            print_colored("  조건에 맞는 도구가 없습니다.", Colors.WARNING)
+    else:
+        print_colored("\n===== MCP 도구 목록 =====", Colors.HEADER)
+        for manifest in manifests:
+            if manifest['tools'] is None:
+                print_colored(f"\n[{manifest['name']}] {manifest['error']}", Colors.FAIL)
+                continue
+            source = '캐시' if manifest['cached'] else '새로 읽음'
+            print_colored(f"\n[{manifest['name']}] 도구 {len(manifest['tools'])}개 ({source})", Colors.BOLD)
+            for tool in manifest['tools']:
+                print(f"  {tool['name']}  {tool_summary(tool)}")
+    print_colored("========================", Colors.HEADER)
+
+class GatewayBackend:
+    """게이트웨이 뒤의 MCP 서버 하나
+
+    처음 요청이 올 때 프로세스를 시작하고, 도구 목록은 프로세스가 유휴 종료된
+    뒤에도 보관해 tools/list 때문에 다시 시작하지 않습니다.
+    """
+    def __init__(self, name: str, server: Dict, start_timeout: float = 60.0,
+                 tools: Optional[List[Dict]] = None):
+        self.name = name
+        self.server = server
+        self.start_timeout = start_timeout
+        self.client = None
+        self.tools = tools
+        # 도구 목록을 캐시에서 가져왔으면 처음 시작할 때 실제 목록과 비교
+        self.tools_verified = tools is None
+        self.active = 0
+        self.last_used = 0.0
+        self.starts = 0
+        self._lock = None
+    
+    @property
+    def running(self) -> bool:
+        return self.client is not None and self.client.running
+    
+    async def ensure_started(self) -> 'MCPStdioClient':
+        """프로세스가 없거나 종료되었으면 시작하고 initialize까지 수행"""
+        import asyncio
+        
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.running:
+                return self.client
+            if self.client is not None:
+                await self.client.close()
+                self.client = None
+            
+            client = MCPStdioClient(self.server.get('command', ''), self.server.get('args', []), self.server.get('env'))
+            with Tracer.span(f"gateway start {self.name}", 'gateway'):
+                try:
+                    await client.start()
+                    await asyncio.wait_for(client.initialize(), self.start_timeout)
+                except asyncio.TimeoutError:
+                    await client.close()
+                    raise MCPError(f"{self.name}: {self.start_timeout}초 안에 initialize 응답이 없습니다.")
+                except (OSError, MCPError) as e:
+                    await client.close()
+                    raise MCPError(f"{self.name}: 서버를 시작할 수 없습니다: {str(e)}")
+            self.client = client
+            self.starts += 1
+            log_gateway(f"{self.name} 시작 (pid {client.process.pid})")
+            return client
+    
+    async def request(self, method: str, params: Optional[Dict], timeout: Optional[float]) -> Any:
+        """백엔드에 요청 전달 (필요하면 먼저 시작)"""
+        import asyncio
+        
+        self.active += 1
+        try:
+            client = await self.ensure_started()
+            try:
+                return await asyncio.wait_for(client.request(method, params), timeout)
+            except asyncio.TimeoutError:
+                raise MCPError(f"{self.name}: {timeout}초 안에 {method} 응답이 없습니다.")
+        finally:
+            self.active -= 1
+            self.last_used = time.monotonic()
+    
+    async def fetch_tools(self, timeout: Optional[float]) -> List[Dict]:
+        """백엔드에서 도구 목록을 읽음 (nextCursor가 있으면 끝까지)"""
+        tools = await read_tool_list(lambda method, params: self.request(method, params, timeout))
+        self.tools = tools
+        self.tools_verified = True
+        return tools
+    
+    async def stop(self) -> None:
+        """프로세스 종료 (도구 목록은 유지)"""
+        if self.client is not None:
+            client, self.client = self.client, None
+            await client.close()
+            log_gateway(f"{self.name} 종료")
+
+def log_gateway(message: str) -> None:
+    """게이트웨이 로그 (표준 출력은 JSON-RPC 전용이므로 표준 오류로 출력)"""
+    print(f"[mcp-gateway] {message}", file=sys.stderr, flush=True)
+
+class MCPGateway:
+    """여러 MCP 서버를 하나의 stdio 엔드포인트로 묶는 게이트웨이
+
+    도구는 `백엔드__도구` 이름으로 노출하고 tools/call을 해당 백엔드로
+    전달합니다. 백엔드는 처음 쓰일 때 시작하며 idle_timeout초 동안 요청이
+    없으면 종료합니다 (0이면 종료하지 않음). 캐시된 도구 목록이 실제와
+    다르면 캐시를 갱신하고 클라이언트에 tools/list_changed 알림을 보냅니다.
+    """
+    SEPARATOR = '__'
+    
+    def __init__(self, servers: Dict[str, Dict], idle_timeout: float = 300.0,
+                 start_timeout: float = 60.0, request_timeout: Optional[float] = 300.0,
+                 tool_cache: Optional[ToolManifestCache] = None):
+        self.tool_cache = tool_cache
+        self.backends = {
+            name: GatewayBackend(name, server, start_timeout, tool_cache.get(server) if tool_cache else None)
+            for name, server in servers.items()
+        }
+        self.idle_timeout = idle_timeout
+        self.request_timeout = request_timeout
+        self._send = None
+        self._background = set()
+    
+    def split_tool_name(self, name: Any) -> tuple:
+        """`백엔드__도구` 이름을 (백엔드, 도구)로 분리 (알 수 없으면 MCPError)
+
+        백엔드 이름에도 구분자가 들어갈 수 있으므로 가장 긴 백엔드 이름부터 맞춰 봅니다.
+        """
+        if isinstance(name, str):
+            for backend_name in sorted(self.backends, key=len, reverse=True):
+                prefix = backend_name + self.SEPARATOR
+                if name.startswith(prefix) and len(name) > len(prefix):
+                    return self.backends[backend_name], name[len(prefix):]
+        raise MCPError(f"알 수 없는 도구입니다: {name}")
+    
+    def save_tools(self, backend: GatewayBackend, tools: List[Dict]) -> None:
+        """백엔드 도구 목록을 캐시에 저장"""
+        if self.tool_cache is None:
+            return
+        server_info = backend.client.server_info if backend.client is not None else None
+        if not self.tool_cache.put(backend.server, tools, server_info):
+            log_gateway(f"도구 목록 캐시를 저장할 수 없습니다: {self.tool_cache.path}")
+    
+    async def backend_tools(self, backend: GatewayBackend) -> List[Dict]:
+        """백엔드 도구 목록 (캐시에 없으면 백엔드를 시작해 읽고 저장)"""
+        if backend.tools is None:
+            tools = await backend.fetch_tools(self.request_timeout)
+            self.save_tools(backend, tools)
+        return backend.tools
+    
+    async def list_tools(self) -> List[Dict]:
+        """모든 백엔드의 도구를 동시에 모아 이름에 백엔드 접두어를 붙임"""
+        import asyncio
+        
+        backends = list(self.backends.values())
+        results = await asyncio.gather(*(self.backend_tools(backend) for backend in backends),
+                                       return_exceptions=True)
+        tools = []
+        for backend, result in zip(backends, results):
+            if isinstance(result, BaseException):
+                log_gateway(f"{backend.name} 도구 목록을 가져올 수 없습니다: {str(result)}")
+                continue
+            for tool in result:
+                tools.append(dict(tool, name=f"{backend.name}{self.SEPARATOR}{tool['name']}"))
+        return tools
+    
+    async def verify_tools(self, backend: GatewayBackend) -> None:
+        """캐시에서 가져온 도구 목록을 실제 목록과 비교해 갱신"""
+        cached = backend.tools
+        try:
+            tools = await backend.fetch_tools(self.request_timeout)
+        except MCPError as e:
+            log_gateway(f"{backend.name} 도구 목록을 확인할 수 없습니다: {str(e)}")
+            return
+        if tools != cached:
+            self.save_tools(backend, tools)
+            if self._send is not None:
+                self._send({'jsonrpc': '2.0', 'method': 'notifications/tools/list_changed'})
+    
+    async def call_tool(self, params: Dict) -> Any:
+        """tools/call을 백엔드로 전달"""
+        import asyncio
+        
+        backend, tool = self.split_tool_name(params.get('name'))
+        with Tracer.span(f"gateway call {backend.name}", 'gateway', tool=tool):
+            result = await backend.request('tools/call', dict(params, name=tool), self.request_timeout)
+        if not backend.tools_verified:
+            # 응답을 늦추지 않도록 확인은 따로 진행
+            backend.tools_verified = True
+            task = asyncio.ensure_future(self.verify_tools(backend))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+        return result
+    
+    async def handle(self, message: Dict) -> Optional[Dict]:
+        """클라이언트 메시지 처리 (알림이면 None 반환)"""
+        method = message.get('method')
+        request_id = message.get('id')
+        params = message.get('params')
+        if request_id is None:
+            return None
+        if params is None:
+            params = {}
+        elif not isinstance(params, dict):
+            return {'jsonrpc': '2.0', 'id': request_id,
+                    'error': {'code': -32602, 'message': 'Invalid params: params는 객체여야 합니다.'}}
+        
+        try:
+            if method == 'initialize':
+                result = {
+                    'protocolVersion': params.get('protocolVersion') or MCP_PROTOCOL_VERSION,
+                    'capabilities': {'tools': {'listChanged': True}},
+                    'serverInfo': {'name': 'mcp-setup-gateway', 'version': '1.0'},
+                }
+            elif method == 'ping':
+                result = {}
+            elif method == 'tools/list':
+                result = {'tools': await self.list_tools()}
+            elif method == 'tools/call':
+                result = await self.call_tool(params)
+            else:
+                return {'jsonrpc': '2.0', 'id': request_id,
+                        'error': {'code': -32601, 'message': f'Method not found: {method}'}}
+        except MCPError as e:
+            return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': -32603, 'message': str(e)}}
+        return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
     
-    def setup_default_mcp_servers(self) -> bool:
-        """기본 MCP 서버 설정"""
-        # Node.js 설치 확인
-        if not NodeJSChecker.is_nodejs_installed():
-            print_colored("Node.js가 설치되어 있어야 합니다.", Colors.FAIL)
-            return False
+    async def reap_idle(self) -> None:
+        """유휴 백엔드를 주기적으로 종료"""
+        import asyncio
         
-        # 백업 먼저 수행
-        self.backup_mcp_config()
+        interval = min(max(self.idle_timeout / 4, 0.1), 5.0)
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for backend in self.backends.values():
+                if backend.client is not None and not backend.active and now - backend.last_used >= self.idle_timeout:
+                    await backend.stop()
+    
+    async def serve(self, stdin=None, stdout=None) -> None:
+        """표준 입력이 닫힐 때까지 요청 처리
+
+        입력은 별도 스레드에서 줄 단위로 읽으므로(Windows 파이프 호환) 요청은
+        도착하는 대로 동시에 처리되고 응답은 완료 순서대로 기록됩니다.
+        """
+        import asyncio
         
-        config = self.load_mcp_config()
+        stdin = stdin or sys.stdin.buffer
+        stdout = stdout or sys.stdout.buffer
+        loop = asyncio.get_event_loop()
+        tasks = set()
         
-        if 'mcpServers' not in config:
-            config['mcpServers'] = {}
-        
-        # 기본 인자 설정
-        think_args = [
-            '-y',
-            '@smithery/cli@latest',
-            'run',
-            '@PhillipRt/think-mcp-server',
-            '--key',
-            'f120217f-d8f9-4b5e-b9c9-cf9feb0aad83'
-        ]
+        def send(message):
+            stdout.write((json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8'))
+            stdout.flush()
+        self._send = send
         
-        sequential_args = [
-            '-y',
-            '@smithery/cli@latest',
-            'run',
-            '@smithery-ai/server-sequential-thinking',
-            '--key',
-            'f120217f-d8f9-4b5e-b9c9-cf9feb0aad83'
-        ]
+        async def process(message):
+            try:
+                response = await self.handle(message)
+            except Exception as e:
+                # 예상하지 못한 오류에도 id가 있는 요청에는 항상 응답
+                log_gateway(f"요청 처리 중 오류: {message.get('method')} ({type(e).__name__}: {str(e)})")
+                if message.get('id') is None:
+                    return
+                response = {'jsonrpc': '2.0', 'id': message.get('id'),
+                            'error': {'code': -32603, 'message': f'Internal error: {str(e)}'}}
+            if response is not None:
+                send(response)
         
-        # OS별 명령어 설정
-        if OSInfo.is_windows():
-            # Windows에서는 cmd /c npx ... 형태로 실행
-            think_cmd, think_full_args = 'cmd', ['/c', 'npx'] + think_args
-            seq_cmd, seq_full_args = 'cmd', ['/c', 'npx'] + sequential_args
-        else:
-            # macOS, Linux에서는 npx ... 형태로 실행
-            think_cmd, think_full_args = 'npx', think_args
-            seq_cmd, seq_full_args = 'npx', sequential_args
-        
-        # Think MCP 서버 설정
-        config['mcpServers']['think-mcp-server'] = {
-            'command': think_cmd,
-            'args': think_full_args
-        }
+        reaper = asyncio.ensure_future(self.reap_idle()) if self.idle_timeout else None
+        log_gateway(f"백엔드 {len(self.backends)}개: {', '.join(self.backends) or '-'}")
+        try:
+            while True:
+                line = await loop.run_in_executor(None, stdin.readline)
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    send({'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': 'Parse error'}})
+                    continue
+                if not isinstance(message, dict):
+                    send({'jsonrpc': '2.0', 'id': None, 'error': {'code': -32600, 'message': 'Invalid Request'}})
+                    continue
+                task = asyncio.ensure_future(process(message))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._send = None
+            if reaper is not None:
+                reaper.cancel()
+            for task in self._background:
+                task.cancel()
+            await asyncio.gather(*(backend.stop() for backend in self.backends.values()), return_exceptions=True)
+
+def run_gateway(backends_path: Path, idle_timeout: float = 300.0, start_timeout: float = 60.0,
+                request_timeout: Optional[float] = 300.0, use_cache: bool = True) -> bool:
+    """백엔드 목록 파일을 읽어 게이트웨이 실행"""
+    import asyncio
+    
+    try:
+        with open(backends_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        log_gateway(f"백엔드 목록을 읽을 수 없습니다: {backends_path} ({str(e)})")
+        return False
+    
+    index = ServerIndex.build(config)
+    for error in index.errors:
+        log_gateway(f"잘못된 백엔드 설정을 건너뜁니다: {error}")
+    servers = {}
+    for name, record in index.records.items():
+        if record.url:
+            log_gateway(f"{name}: url 서버는 게이트웨이로 묶을 수 없어 건너뜁니다.")
+            continue
+        servers[name] = config['mcpServers'][name]
+    
+    gateway = MCPGateway(servers, idle_timeout, start_timeout, request_timeout,
+                         ToolManifestCache() if use_cache else None)
+    asyncio.run(gateway.serve())
+    return True
+
+def pool_socket_path() -> Path:
+    """웜 풀 소켓 경로"""
+    return runtime_socket_path('mcp_setup_pool.sock', 'MCP_SETUP_POOL_SOCKET')
+
+# 웜 풀이 미리 실행한 프로세스에 설정하는 환경 변수 (limit은 슬롯을 잡지 않음)
+POOL_PROCESS_ENV = 'MCP_SETUP_POOLED'
+
+def launch_spec(argv: List[str], env: Optional[Dict[str, str]] = None,
+                initialize: Optional[Dict] = None) -> Dict:
+    """웜 풀에서 같은 프로세스로 취급할 실행 조건
+
+    initialize는 클라이언트가 보낸 initialize 매개변수이며, 풀의 프로세스는
+    같은 protocolVersion과 capabilities로 미리 초기화되어 있어야 넘겨줄 수
+    있습니다.
+    """
+    initialize = dict(initialize or {})
+    initialize.setdefault('protocolVersion', MCP_PROTOCOL_VERSION)
+    initialize.setdefault('capabilities', {})
+    initialize.setdefault('clientInfo', {'name': 'mcp_setup', 'version': '1.0'})
+    return {'argv': list(argv), 'env': dict(env or {}), 'initialize': initialize}
+
+def launch_spec_key(spec: Dict) -> str:
+    """실행 조건의 해시 (clientInfo는 제외)"""
+    import hashlib
+    
+    initialize = spec['initialize']
+    material = [spec['argv'], spec['env'], initialize.get('protocolVersion'), initialize.get('capabilities')]
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode('utf-8')).hexdigest()
+
+def parse_launch_entry(server: Any) -> Optional[Dict]:
+    """`launch` 명령을 가리키는 mcp.json 항목에서 실행 조건 추출 (아니면 None)"""
+    if not isinstance(server, dict) or not isinstance(server.get('args'), list):
+        return None
+    args = server['args']
+    if 'launch' not in args or '--' not in args or args.index('launch') > args.index('--'):
+        return None
+    options = args[args.index('launch') + 1:args.index('--')]
+    argv = args[args.index('--') + 1:]
+    if not argv:
+        return None
+    names = []
+    if '--pass-env' in options and options.index('--pass-env') + 1 < len(options):
+        names = [name for name in options[options.index('--pass-env') + 1].split(',') if name]
+    env = server.get('env') if isinstance(server.get('env'), dict) else {}
+    return launch_spec(argv, {name: str(env[name]) for name in names if name in env})
+
+class PooledProcess:
+    """초기화가 끝나 넘겨줄 준비가 된 MCP 서버 프로세스"""
+    __slots__ = ('proc', 'init_result', 'pending', 'spawn_ms', 'key')
+    
+    def __init__(self, proc, init_result: Dict, pending: bytes, spawn_ms: float):
+        self.key = None
+        self.proc = proc
+        self.init_result = init_result
+        # initialize 응답 뒤에 이미 읽어 버린 출력 (넘겨받은 쪽에서 먼저 전달)
+        self.pending = pending
+        self.spawn_ms = spawn_ms
+
+def spawn_initialized(spec: Dict, timeout: float = 60.0) -> PooledProcess:
+    """서버 프로세스를 실행하고 initialize 핸드셰이크까지 수행
+
+    출력은 파이프 파일 디스크립터에서 직접 읽으므로 버퍼에 남는 데이터가
+    없고, 응답 뒤에 읽은 바이트는 pending으로 돌려줍니다. 표준 오류도
+    파이프로 받아 두었다가 넘겨줄 때 함께 넘기므로, 대기 중에 남긴 로그는
+    파이프 버퍼에 남아 있다가 launch가 클라이언트의 표준 오류로 전달합니다.
+    """
+    import selectors
+    import subprocess
+    
+    started = time.perf_counter()
+    env = dict(os.environ, **spec['env'])
+    env[POOL_PROCESS_ENV] = '1'
+    proc = subprocess.Popen(spec['argv'], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, env=env, bufsize=0, start_new_session=True)
+    try:
+        request = {'jsonrpc': '2.0', 'id': 0, 'method': 'initialize', 'params': spec['initialize']}
+        os.write(proc.stdin.fileno(), (json.dumps(request) + '\n').encode('utf-8'))
         
-        # Sequential Thinking 서버 설정
-        config['mcpServers']['server-sequential-thinking'] = {
-            'command': seq_cmd,
-            'args': seq_full_args
-        }
+        deadline = time.monotonic() + timeout
+        buffer = b''
+        with selectors.DefaultSelector() as selector:
+            selector.register(proc.stdout.fileno(), selectors.EVENT_READ)
+            while True:
+                newline = buffer.find(b'\n')
+                if newline >= 0:
+                    line, buffer = buffer[:newline], buffer[newline + 1:]
+                    try:
+                        message = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(message, dict) and message.get('id') == 0 and 'method' not in message:
+                        break
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    raise MCPError(f"{timeout}초 안에 initialize 응답이 없습니다.")
+                chunk = os.read(proc.stdout.fileno(), 65536)
+                if not chunk:
+                    raise MCPError("서버 프로세스가 initialize 전에 종료되었습니다.")
+                buffer += chunk
         
-        result = self.save_mcp_config(config)
-        if result:
-            print_colored("기본 MCP 서버 설정 완료!", Colors.GREEN)
+        if 'error' in message:
+            error = message['error'] if isinstance(message['error'], dict) else {}
+            raise MCPError(error.get('message', str(message['error'])))
+        notification = {'jsonrpc': '2.0', 'method': 'notifications/initialized', 'params': {}}
+        os.write(proc.stdin.fileno(), (json.dumps(notification) + '\n').encode('utf-8'))
+    except BaseException:
+        terminate_process(proc, 1.0)
+        raise
+    return PooledProcess(proc, message.get('result') or {}, buffer, (time.perf_counter() - started) * 1000)
+
+class WarmPool:
+    """미리 실행해 초기화한 MCP 서버 프로세스를 보관하는 감독 프로세스
+
+    launch 명령이 Unix 소켓으로 실행 조건을 보내면 같은 조건의 프로세스를
+    꺼내 표준 입출력 파이프를 SCM_RIGHTS로 넘겨주고 빈자리를 다시
+    채웁니다 (표준 오류 읽기 끝도 함께 넘김). 처음 보는 조건은 miss로
+    응답한 뒤 풀에 등록합니다.
+    """
+    HANDOFF_SAMPLES = 200
+    
+    def __init__(self, socket_path: Path, size: int = 1, init_timeout: float = 60.0,
+                 idle_timeout: Optional[float] = None):
+        import threading
         
-        return result
+        self.socket_path = Path(socket_path)
+        self.size = max(1, size)
+        self.init_timeout = init_timeout
+        self.idle_timeout = idle_timeout
+        self.pools = {}
+        self._handed = []
+        self._lock = threading.Lock()
+        self._last_activity = time.monotonic()
+        self._server = None
+        self._stopping = threading.Event()
     
-    def setup_github_mcp(self, token: str) -> bool:
-        """GitHub MCP 설정"""
-        # Node.js 설치 확인
-        if not NodeJSChecker.is_nodejs_installed():
-            print_colored("Node.js가 설치되어 있어야 합니다.", Colors.FAIL)
-            return False
-            
-        if not token:
-            print_colored("GitHub 토큰이 필요합니다.", Colors.WARNING)
-            return False
+    def register(self, spec: Dict, label: Optional[str] = None) -> Dict:
+        """실행 조건을 풀에 등록하고 채우기 시작"""
+        from collections import deque
         
-        config = self.load_mcp_config()
+        key = launch_spec_key(spec)
+        with self._lock:
+            pool = self.pools.get(key)
+            if pool is None:
+                pool = {
+                    'label': label or format_command(spec['argv']),
+                    'spec': spec,
+                    'ready': deque(),
+                    'filling': 0,
+                    'hits': 0,
+                    'misses': 0,
+                    'failures': 0,
+                    'handoff_ms': deque(maxlen=self.HANDOFF_SAMPLES),
+                    'spawn_ms': deque(maxlen=self.HANDOFF_SAMPLES),
+                    'last_error': None,
+                }
+                self.pools[key] = pool
+        self._fill(pool)
+        return pool
+    
+    def _fill(self, pool: Dict) -> None:
+        """빈자리만큼 프로세스를 백그라운드에서 실행"""
+        import threading
         
-        if 'mcpServers' not in config:
-            config['mcpServers'] = {}
-        
-        # 기본 인자 설정
-        github_args = [
-            '-y',
-            '@smithery/cli@latest',
-            'run',
-            '@smithery-ai/github',
-            '--config',
-            f'{{"githubPersonalAccessToken":"{token}"}}'
-        ]
+        with self._lock:
+            missing = self.size - len(pool['ready']) - pool['filling']
+            if self._stopping.is_set() or missing <= 0:
+                return
+            pool['filling'] += missing
+        for _ in range(missing):
+            threading.Thread(target=self._spawn_into, args=(pool,), daemon=True).start()
+    
+    def _spawn_into(self, pool: Dict) -> None:
+        """프로세스 하나를 실행해 풀에 추가"""
+        try:
+            with Tracer.span('pool.spawn', 'pool', label=pool['label']):
+                pooled = spawn_initialized(pool['spec'], self.init_timeout)
+        except (OSError, MCPError) as e:
+            with self._lock:
+                pool['filling'] -= 1
+                pool['failures'] += 1
+                pool['last_error'] = str(e)
+            print_colored(f"풀 프로세스 실행 실패: {pool['label']} ({str(e)})", Colors.FAIL, file=sys.stderr)
+            return
+        pooled.key = launch_spec_key(pool['spec'])
+        with self._lock:
+            pool['filling'] -= 1
+            pool['spawn_ms'].append(pooled.spawn_ms)
+            stopping = self._stopping.is_set()
+            if not stopping:
+                pool['ready'].append(pooled)
+        if stopping:
+            terminate_process(pooled.proc, 1.0)
+    
+    def acquire(self, spec: Dict) -> Optional[PooledProcess]:
+        """조건에 맞는 준비된 프로세스 꺼내기 (없으면 None, 풀은 다시 채움)"""
+        pool = self.register(spec)
+        pooled = None
+        with self._lock:
+            self._last_activity = time.monotonic()
+            while pool['ready']:
+                candidate = pool['ready'].popleft()
+                if candidate.proc.poll() is None:
+                    pooled = candidate
+                    break
+            if pooled is None:
+                pool['misses'] += 1
+            else:
+                pool['hits'] += 1
+                self._handed.append(pooled.proc)
+        self._fill(pool)
+        return pooled
+    
+    def record_handoff(self, pooled: PooledProcess, elapsed_ms: float) -> None:
+        """넘겨주기에 걸린 시간 기록"""
+        with self._lock:
+            pool = self.pools.get(pooled.key)
+            if pool is not None:
+                pool['handoff_ms'].append(elapsed_ms)
+    
+    def status(self) -> Dict:
+        """풀별 적중/실패 수와 넘겨주기 지연 시간"""
+        with self._lock:
+            pools = [{
+                'label': pool['label'],
+                'ready': len(pool['ready']),
+                'filling': pool['filling'],
+                'hits': pool['hits'],
+                'misses': pool['misses'],
+                'failures': pool['failures'],
+                'handoff_p50_ms': percentile(sorted(pool['handoff_ms']), 0.5),
+                'handoff_max_ms': max(pool['handoff_ms']) if pool['handoff_ms'] else None,
+                'spawn_p50_ms': percentile(sorted(pool['spawn_ms']), 0.5),
+                'last_error': pool['last_error'],
+            } for pool in self.pools.values()]
+        return {'ok': True, 'pid': os.getpid(), 'size': self.size, 'pools': pools}
+    
+    def respond(self, request: Dict) -> tuple:
+        """요청 하나 처리. (응답, 넘겨줄 프로세스) 반환"""
+        import threading
         
-        # OS별 명령어 설정
-        if OSInfo.is_windows():
-            # Windows에서는 cmd /c npx ... 형태로 실행
-            github_cmd, github_full_args = 'cmd', ['/c', 'npx'] + github_args
+        request_id = request.get('id')
+        method = request.get('method')
+        params = request.get('params') or {}
+        pooled = None
+        if method == 'acquire':
+            spec = params.get('spec')
+            if not isinstance(spec, dict) or not isinstance(spec.get('argv'), list) or not spec['argv']:
+                return {'jsonrpc': '2.0', 'id': request_id,
+                        'error': {'code': -32602, 'message': "acquire에는 spec.argv가 필요합니다."}}, None
+            pooled = self.acquire(launch_spec(spec['argv'], spec.get('env'), spec.get('initialize')))
+            if pooled is None:
+                result = {'ok': False, 'reason': 'miss'}
+            else:
+                result = {'ok': True, 'init_result': pooled.init_result,
+                          'pending': pooled.pending.decode('latin-1'), 'pid': pooled.proc.pid}
+        elif method == 'ping' or method == 'status':
+            result = self.status()
+        elif method == 'shutdown':
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+            result = {'ok': True}
         else:
-            # macOS, Linux에서는 npx ... 형태로 실행
-            github_cmd, github_full_args = 'npx', github_args
+            return {'jsonrpc': '2.0', 'id': request_id,
+                    'error': {'code': -32601, 'message': f'Method not found: {method}'}}, None
+        return {'jsonrpc': '2.0', 'id': request_id, 'result': result}, pooled
+    
+    def serve_forever(self) -> None:
+        """소켓을 열고 종료 요청이나 시그널을 받을 때까지 처리"""
+        import signal
+        import socket
+        import socketserver
+        import threading
         
-        # GitHub MCP 서버 설정
-        config['mcpServers']['github'] = {
-            'command': github_cmd,
-            'args': github_full_args
-        }
+        pool = self
         
-        result = self.save_mcp_config(config)
-        if result:
-            print_colored("GitHub MCP 서버 설정 완료!", Colors.GREEN)
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    started = time.perf_counter()
+                    try:
+                        request = json.loads(line)
+                        if not isinstance(request, dict):
+                            raise ValueError("요청은 JSON 객체여야 합니다.")
+                    except ValueError as e:
+                        response, pooled = {'jsonrpc': '2.0', 'id': None,
+                                            'error': {'code': -32700, 'message': str(e)}}, None
+                    else:
+                        response, pooled = pool.respond(request)
+                    data = (json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8')
+                    if pooled is None:
+                        self.wfile.write(data)
+                        self.wfile.flush()
+                        continue
+                    # 표준 입력 쓰기 끝과 표준 출력/오류 읽기 끝을 넘기고 감독 프로세스의 사본은 닫음
+                    pipes = [pooled.proc.stdin, pooled.proc.stdout, pooled.proc.stderr]
+                    try:
+                        socket.send_fds(self.connection, [data], [pipe.fileno() for pipe in pipes])
+                    finally:
+                        for pipe in pipes:
+                            pipe.close()
+                    pool.record_handoff(pooled, (time.perf_counter() - started) * 1000)
         
-        return result
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+        
+        self.socket_path.parent.mkdir(exist_ok=True, parents=True)
+        if daemon_request(self.socket_path, 'ping', {}, timeout=1.0) is not None:
+            raise DaemonError(-32000, f"이미 실행 중인 웜 풀이 있습니다: {self.socket_path}")
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+        
+        old_umask = os.umask(0o177)
+        try:
+            self._server = Server(str(self.socket_path), Handler)
+        finally:
+            os.umask(old_umask)
+        
+        def stop(signum, frame):
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+        
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        threading.Thread(target=self._watch, daemon=True).start()
+        
+        try:
+            self._server.serve_forever()
+        finally:
+            self._stopping.set()
+            self._server.server_close()
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                procs = [pooled.proc for pool in self.pools.values() for pooled in pool['ready']]
+                for pool in self.pools.values():
+                    pool['ready'].clear()
+            for proc in procs:
+                terminate_process(proc, 1.0)
     
-    def setup_all(self, github_token=None):
-        """모든 MCP 설정"""
-        # Node.js 설치 확인
-        if not NodeJSChecker.is_nodejs_installed():
-            print_colored("Node.js가 설치되어 있어야 합니다.", Colors.FAIL)
+    def _watch(self) -> None:
+        """넘겨준 프로세스 회수와 유휴 종료"""
+        while not self._stopping.wait(1.0):
+            with self._lock:
+                self._handed = [proc for proc in self._handed if proc.poll() is None]
+                idle = time.monotonic() - self._last_activity
+            if self.idle_timeout and idle >= self.idle_timeout:
+                self._server.shutdown()
+                return
+
+def pool_acquire(socket_path: Path, spec: Dict, timeout: float = 5.0) -> Optional[tuple]:
+    """웜 풀에서 프로세스를 받음. (결과, [stdin_fd, stdout_fd, stderr_fd]) 또는 None"""
+    import socket
+    
+    if not hasattr(socket, 'recv_fds') or not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    fds = []
+    try:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return None
+        request = {'jsonrpc': '2.0', 'id': 1, 'method': 'acquire', 'params': {'spec': spec}}
+        sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+        data = b''
+        while not data.endswith(b'\n'):
+            chunk, received, _, _ = socket.recv_fds(sock, 1 << 20, 3)
+            fds += received
+            if not chunk:
+                break
+            data += chunk
+        response = json.loads(data) if data else {}
+        result = response.get('result') or {}
+        if not result.get('ok') or len(fds) != 3:
+            for fd in fds:
+                os.close(fd)
+            return None
+        return result, fds
+    except (OSError, ValueError):
+        for fd in fds:
+            os.close(fd)
+        return None
+    finally:
+        sock.close()
+
+def log_launcher(message: str) -> None:
+    """launch 로그 (표준 출력은 JSON-RPC 전용이므로 표준 오류로 출력)"""
+    print(f"[mcp-launch] {message}", file=sys.stderr, flush=True)
+
+def is_initialized_notification(line: bytes) -> bool:
+    """JSON-RPC 한 줄이 notifications/initialized 알림인지 (id가 있는 요청은 제외)"""
+    if b'notifications/initialized' not in line:
+        return False
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return False
+    return (isinstance(message, dict) and message.get('method') == 'notifications/initialized'
+            and 'id' not in message)
+
+def pump_stderr(fd: int) -> None:
+    """넘겨받은 서버의 표준 오류를 launch의 표준 오류로 복사"""
+    try:
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            sys.stderr.buffer.write(chunk)
+            sys.stderr.buffer.flush()
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def run_launcher(argv: List[str], pass_env: List[str], socket_path: Optional[Path] = None,
+                 use_pool: bool = True) -> int:
+    """MCP 서버 실행 셔틀
+
+    클라이언트의 첫 initialize 요청을 읽고 웜 풀에 같은 조건의 프로세스가
+    있으면 넘겨받아 캐시된 initialize 결과로 바로 응답합니다. 없으면 서버를
+    직접 실행(콜드 스타트)하고 요청을 그대로 전달합니다. 이후에는 표준
+    입출력을 서버와 그대로 중계합니다. 넘겨받은 프로세스가 limit 명령으로
+    감싸여 있으면 동시 실행 슬롯은 launch가 잡아 종료할 때까지 유지합니다.
+    """
+    import subprocess
+    import threading
+    
+    started = time.perf_counter()
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+    first = stdin.readline()
+    if not first:
+        return 0
+    try:
+        message = json.loads(first)
+    except ValueError:
+        message = None
+    
+    env = {name: os.environ[name] for name in pass_env if name in os.environ}
+    handoff = None
+    if use_pool and isinstance(message, dict) and message.get('method') == 'initialize':
+        spec = launch_spec(argv, env, message.get('params'))
+        handoff = pool_acquire(socket_path or pool_socket_path(), spec)
+    
+    proc = None
+    skip_initialized = False
+    if handoff is not None:
+        result, (child_in, child_out, child_err) = handoff
+        # 슬롯 디스크립터는 launch가 종료될 때 닫혀 슬롯이 풀림
+        if claim_handoff_slot(argv, result.get('pid')) is None:
+            for fd in (child_in, child_out, child_err):
+                os.close(fd)
+            return 75
+        # 직접 실행할 때처럼 서버의 표준 오류를 클라이언트의 표준 오류로 전달
+        stderr_pump = threading.Thread(target=pump_stderr, args=(child_err,), daemon=True)
+        stderr_pump.start()
+        response = {'jsonrpc': '2.0', 'id': message.get('id'), 'result': result.get('init_result') or {}}
+        stdout.write((json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8'))
+        stdout.write(result.get('pending', '').encode('latin-1'))
+        stdout.flush()
+        # 풀의 프로세스는 이미 notifications/initialized를 받았음
+        skip_initialized = True
+        log_launcher(f"웜 풀 적중: pid {result.get('pid')}, {(time.perf_counter() - started) * 1000:.1f}ms")
+    else:
+        try:
+            proc = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=0)
+        except OSError as e:
+            log_launcher(f"서버를 실행할 수 없습니다: {format_command(argv)} ({str(e)})")
+            return 127
+        child_in, child_out = proc.stdin.fileno(), proc.stdout.fileno()
+        os.write(child_in, first)
+        if use_pool:
+            log_launcher("웜 풀 없음: 직접 실행")
+    
+    def pump_input():
+        nonlocal skip_initialized
+        try:
+            for line in stdin:
+                if skip_initialized and is_initialized_notification(line):
+                    skip_initialized = False
+                    continue
+                os.write(child_in, line)
+        except OSError:
+            pass
+        finally:
+            if proc is None:
+                os.close(child_in)
+            else:
+                proc.stdin.close()
+    
+    threading.Thread(target=pump_input, daemon=True).start()
+    try:
+        while True:
+            chunk = os.read(child_out, 65536)
+            if not chunk:
+                break
+            stdout.write(chunk)
+            stdout.flush()
+    except (OSError, BrokenPipeError):
+        pass
+    if proc is None:
+        os.close(child_out)
+        # 서버가 종료 직전에 남긴 로그까지 전달
+        stderr_pump.join(1.0)
+        return 0
+    return proc.wait()
+
+def serve_pool(mcp_setup: 'MCPSetup', args) -> bool:
+    """pool 명령 실행 (웜 풀 시작, --status, --stop)"""
+    import socket
+    
+    socket_path = Path(args.pool_socket) if args.pool_socket else pool_socket_path()
+    if not hasattr(socket, 'send_fds'):
+        print_colored("이 플랫폼에서는 파일 디스크립터를 넘길 수 없어 웜 풀을 실행할 수 없습니다.", Colors.FAIL)
+        return False
+    
+    if args.status or args.stop:
+        try:
+            response = daemon_request(socket_path, 'shutdown' if args.stop else 'status', {}, timeout=5.0)
+        except (OSError, ValueError, DaemonError) as e:
+            print_colored(f"웜 풀 요청 오류: {str(e)}", Colors.FAIL)
             return False
-            
-        # MCP 설치
-        installer = MCPInstaller()
-        install_success = installer.install_all_mcps(github_token)
-        
-        if not install_success:
-            print_colored("MCP 설치 중 문제가 발생했습니다.", Colors.WARNING)
-            # 설치 문제가 있어도 설정은 진행
+        if response is None:
+            print_colored(f"실행 중인 웜 풀이 없습니다: {socket_path}", Colors.WARNING)
+            return False
+        if args.stop:
+            print_colored(f"웜 풀 종료 요청 완료: {socket_path}", Colors.GREEN)
+            return True
         
-        # 기본 MCP 서버 설정
-        setup_success = self.setup_default_mcp_servers()
+        def ms(value):
+            return f"{value:.1f}" if value is not None else "-"
         
-        # GitHub MCP 서버 설정 (토큰이 제공된 경우)
-        if github_token and setup_success:
-            self.setup_github_mcp(github_token)
+        result = response.get('result') or {}
+        print_colored(f"웜 풀 실행 중: {socket_path} (pid {result.get('pid')}, 조건별 {result.get('size')}개)", Colors.GREEN)
+        print(f"  {'준비':>4} {'적중':>5} {'미적중':>5} {'넘기기 p50/최대(ms)':>20} {'초기화 p50(ms)':>15}  명령")
+        for pool in result.get('pools', []):
+            handoff = f"{ms(pool['handoff_p50_ms'])}/{ms(pool['handoff_max_ms'])}"
+            print(f"  {pool['ready']:>4} {pool['hits']:>5} {pool['misses']:>5} {handoff:>20} "
+                  f"{ms(pool['spawn_p50_ms']):>15}  {pool['label']}")
+            if pool.get('last_error'):
+                print_colored(f"       마지막 오류: {pool['last_error']}", Colors.WARNING)
+        return True
+    
+    pool = WarmPool(socket_path, args.size, args.init_timeout, args.idle_timeout)
+    if not args.no_prewarm:
+        servers = mcp_setup.load_mcp_config().get('mcpServers') or {}
+        for name, server in servers.items():
+            spec = parse_launch_entry(server)
+            if spec is not None:
+                pool.register(spec, name)
+    print_colored(f"웜 풀 시작: {socket_path} (미리 실행 {len(pool.pools)}개 조건)", Colors.GREEN)
+    sys.stdout.flush()
+    try:
+        pool.serve_forever()
+    except DaemonError as e:
+        print_colored(str(e), Colors.FAIL)
+        return False
+    print_colored("웜 풀 종료", Colors.CYAN)
+    return True
+
+class ResourceLimits:
+    """MCP 서버 프로세스의 리소스 제한
+
+    memory는 데이터 영역 상한(바이트, RLIMIT_DATA), nice는 CPU 우선순위,
+    nofile은 열 수 있는 파일 디스크립터 수, max_instances는 같은 서버를
+    동시에 실행할 수 있는 수입니다. None이면 제한하지 않습니다. Node.js는
+    가상 주소 공간을 크게 예약하므로 RLIMIT_AS 대신 RLIMIT_DATA를 사용합니다.
+    """
+    __slots__ = ('memory', 'nice', 'nofile', 'max_instances')
+    SIZE_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+    
+    def __init__(self, memory: Optional[int] = None, nice: Optional[int] = None,
+                 nofile: Optional[int] = None, max_instances: Optional[int] = None):
+        self.memory = memory
+        self.nice = nice
+        self.nofile = nofile
+        self.max_instances = max_instances
+    
+    def __bool__(self) -> bool:
+        return any(getattr(self, field) is not None for field in self.__slots__)
+    
+    @classmethod
+    def parse_size(cls, text: str) -> int:
+        """'512M', '2G', '65536' 형식의 크기를 바이트로 변환"""
+        value = str(text).strip().upper()
+        if value.endswith('B'):
+            value = value[:-1]
+        unit = value[-1:] if value[-1:] in cls.SIZE_UNITS else ''
+        try:
+            size = int(float(value[:len(value) - len(unit)]) * cls.SIZE_UNITS[unit])
+        except ValueError:
+            raise ValueError(f"크기 형식이 잘못되었습니다: {text} (예: 512M, 2G)")
+        if size <= 0:
+            raise ValueError(f"크기는 0보다 커야 합니다: {text}")
+        return size
+    
+    @staticmethod
+    def format_size(size: int) -> str:
+        """바이트를 parse_size가 읽을 수 있는 가장 짧은 형식으로 변환"""
+        for unit, factor in (('G', 1 << 30), ('M', 1 << 20), ('K', 1 << 10)):
+            if size % factor == 0:
+                return f"{size // factor}{unit}"
+        return str(size)
+    
+    @classmethod
+    def from_args(cls, args) -> 'ResourceLimits':
+        """add_limit_arguments()로 받은 인자에서 생성"""
+        return cls(getattr(args, 'memory_limit', None), getattr(args, 'nice', None),
+                   getattr(args, 'nofile', None), getattr(args, 'max_instances', None))
+    
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> 'ResourceLimits':
+        """to_dict() 형식에서 생성 (값이 잘못되었으면 ValueError)"""
+        if data is not None and not isinstance(data, dict):
+            raise ValueError("limits는 객체여야 합니다.")
+        data = data or {}
+        limits = cls(*(data.get(field) for field in cls.__slots__))
+        limits.validate()
+        return limits
+    
+    def validate(self) -> None:
+        """값 범위 확인 (nice는 -20~19, 나머지는 1 이상의 정수)"""
+        for field in self.__slots__:
+            value = getattr(self, field)
+            if value is None:
+                continue
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise ValueError(f"{field}는 정수여야 합니다: {value!r}")
+            if field == 'nice':
+                if not -20 <= value <= 19:
+                    raise ValueError(f"nice는 -20~19 사이여야 합니다: {value}")
+            elif value <= 0:
+                raise ValueError(f"{field}는 1 이상이어야 합니다: {value}")
+    
+    def to_dict(self) -> Dict[str, Optional[int]]:
+        return {field: getattr(self, field) for field in self.__slots__}
+    
+    def to_args(self) -> List[str]:
+        """limit 명령 인자 (add_limit_arguments와 같은 이름)"""
+        args = []
+        if self.memory is not None:
+            args += ['--memory-limit', self.format_size(self.memory)]
+        if self.nice is not None:
+            args += ['--nice', str(self.nice)]
+        if self.nofile is not None:
+            args += ['--nofile', str(self.nofile)]
+        if self.max_instances is not None:
+            args += ['--max-instances', str(self.max_instances)]
+        return args
+    
+    def apply(self) -> List[str]:
+        """현재 프로세스에 제한 적용 (exec 뒤에도 유지됨). 적용하지 못한 항목의 경고 목록 반환"""
+        import resource
         
-        return setup_success
+        warnings = []
+        for name, limit, value in (('memory', resource.RLIMIT_DATA, self.memory),
+                                   ('nofile', resource.RLIMIT_NOFILE, self.nofile)):
+            if value is None:
+                continue
+            try:
+                _, hard = resource.getrlimit(limit)
+                if hard != resource.RLIM_INFINITY:
+                    value = min(value, hard)
+                resource.setrlimit(limit, (value, value))
+            except (OSError, ValueError) as e:
+                warnings.append(f"{name} 제한을 적용할 수 없습니다: {str(e)}")
+        if self.nice is not None:
+            try:
+                os.setpriority(os.PRIO_PROCESS, 0, self.nice)
+            except OSError as e:
+                warnings.append(f"nice {self.nice}을(를) 적용할 수 없습니다: {str(e)} (권한 없이는 우선순위를 낮추기만 가능)")
+        return warnings
+
+class InstanceSlots:
+    """서버별 동시 실행 슬롯
+
+    슬롯마다 잠금 파일을 두고 flock으로 잡습니다. 잠금 파일 디스크립터는
+    exec한 서버 프로세스와 자식 프로세스에 상속되므로 서버가 종료되면
+    슬롯이 자동으로 풀립니다. 잠금 파일에는 슬롯을 잡은 pid를 기록합니다.
+    """
+    def __init__(self, key: str, directory: Optional[Path] = None):
+        import re
         
-    def list_mcp_servers(self) -> None:
-        """MCP 서버 목록 출력"""
-        config = self.load_mcp_config()
+        self.key = re.sub(r'[^A-Za-z0-9_.-]', '_', key) or 'server'
+        self.directory = Path(directory) if directory else runtime_socket_path('mcp_setup_slots',
+                                                                              'MCP_SETUP_SLOTS_DIR')
+    
+    def slot_path(self, index: int) -> Path:
+        return self.directory / f"{self.key}.{index}.lock"
+    
+    def try_acquire(self, limit: Optional[int], pid: Optional[int] = None) -> Optional[int]:
+        """빈 슬롯 하나를 잡아 상속 가능한 디스크립터 반환 (모두 사용 중이면 None)
+
+        limit이 None이면 슬롯 수를 제한하지 않고 실행 중인 인스턴스만 기록합니다.
+        pid는 잠금 파일에 기록할 서버 프로세스 (기본값: 현재 프로세스)입니다.
+        """
+        import fcntl
+        import itertools
         
-        if 'mcpServers' not in config or not config['mcpServers']:
-            print_colored("설정된 MCP 서버가 없습니다.", Colors.WARNING)
-            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for index in (range(limit) if limit is not None else itertools.count()):
+            fd = os.open(self.slot_path(index), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                continue
+            os.ftruncate(fd, 0)
+            os.write(fd, str(pid or os.getpid()).encode('ascii'))
+            os.set_inheritable(fd, True)
+            return fd
+        return None
+    
+    def acquire(self, limit: Optional[int], wait: float = 0.0, interval: float = 0.2,
+                pid: Optional[int] = None) -> Optional[int]:
+        """wait초 동안 빈 슬롯을 기다려 잡음"""
+        deadline = time.monotonic() + wait
+        while True:
+            fd = self.try_acquire(limit, pid)
+            if fd is not None or time.monotonic() >= deadline:
+                return fd
+            time.sleep(interval)
+    
+    def holders(self) -> List[int]:
+        """슬롯을 잡고 실행 중인 프로세스의 pid"""
+        import fcntl
         
-        print_colored("\n===== MCP 서버 목록 =====", Colors.HEADER)
-        for name, server in config['mcpServers'].items():
-            print_colored(f"\n[{name}]", Colors.BOLD)
-            print(f"  명령어: {server.get('command', 'N/A')}")
-            print(f"  인자: {' '.join(server.get('args', []))}")
+        pids = []
+        for path in sorted(self.directory.glob(f"{self.key}.*.lock")):
+            if not path.name[len(self.key) + 1:-len('.lock')].isdigit():
+                continue
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                # 잠글 수 있으면 비어 있는 슬롯
+            except OSError:
+                try:
+                    pids.append(int(os.read(fd, 32).decode('ascii')))
+                except ValueError:
+                    pass
+            finally:
+                os.close(fd)
+        return pids
+
+def parse_limit_entry(server: Any) -> Optional[tuple]:
+    """`limit` 명령을 가리키는 항목에서 (이름, ResourceLimits, 서버 명령, 대기 시간) 추출 (아니면 None)"""
+    if not isinstance(server, dict) or not isinstance(server.get('args'), list):
+        return None
+    args = server['args']
+    if 'limit' not in args or '--' not in args[args.index('limit'):]:
+        return None
+    start = args.index('limit') + 1
+    end = args.index('--', start)
+    options = dict(zip(args[start:end:2], args[start + 1:end:2]))
+    try:
+        limits = ResourceLimits(
+            ResourceLimits.parse_size(options['--memory-limit']) if '--memory-limit' in options else None,
+            *(int(options[flag]) if flag in options else None
+              for flag in ('--nice', '--nofile', '--max-instances'))
+        )
+        limits.validate()
+        wait = float(options.get('--wait', 0.0))
+    except ValueError:
+        return None
+    return options.get('--name'), limits, args[end + 1:], wait
+
+def log_limit(message: str) -> None:
+    """limit 로그 (표준 출력은 JSON-RPC 전용이므로 표준 오류로 출력)"""
+    print(f"[mcp-limit] {message}", file=sys.stderr, flush=True)
+
+def limit_slot_name(name: Optional[str], argv: List[str]) -> str:
+    """동시 실행 수를 셀 이름 (없으면 서버 명령의 해시)"""
+    if name is None:
+        import hashlib
+        name = hashlib.sha256(json.dumps(argv).encode('utf-8')).hexdigest()[:16]
+    return name
+
+def claim_limit_slot(name: Optional[str], argv: List[str], limits: ResourceLimits, wait: float = 0.0,
+                     pid: Optional[int] = None) -> Optional[int]:
+    """동시 실행 슬롯을 잡아 디스크립터 반환 (슬롯 디렉토리를 쓸 수 없으면 -1, 가득 찼으면 None)"""
+    name = limit_slot_name(name, argv)
+    slots = InstanceSlots(name)
+    try:
+        fd = slots.acquire(limits.max_instances, wait, pid=pid)
+    except OSError as e:
+        log_limit(f"실행 슬롯을 만들 수 없습니다: {slots.directory} ({str(e)})")
+        return -1
+    if fd is None:
+        log_limit(f"{name}: 최대 동시 실행 수({limits.max_instances})에 도달했습니다.")
+    return fd
+
+def claim_handoff_slot(argv: List[str], pid: Optional[int]) -> Optional[int]:
+    """웜 풀에서 넘겨받은 limit 프로세스의 슬롯을 launch가 대신 잡음
+
+    limit 명령이 아니거나 POSIX가 아니면 -1, 슬롯이 가득 찼으면 None을 반환합니다.
+    """
+    parsed = parse_limit_entry({'command': argv[0], 'args': argv[1:]})
+    if parsed is None or os.name != 'posix':
+        return -1
+    name, limits, server_argv, wait = parsed
+    return claim_limit_slot(name, server_argv, limits, wait, pid)
+
+def run_limited(argv: List[str], limits: ResourceLimits, name: Optional[str] = None, wait: float = 0.0) -> int:
+    """리소스 제한을 적용하고 서버 명령으로 교체 (exec)
+
+    동시 실행 슬롯을 잡지 못하면 75(EX_TEMPFAIL)를 반환합니다. 웜 풀이 미리
+    실행한 프로세스는 아직 클라이언트에 연결되지 않았으므로 슬롯을 잡지
+    않고, 넘겨받는 launch가 대신 잡습니다. POSIX가 아닌 환경에서는 제한
+    없이 서버를 실행합니다.
+    """
+    if os.name != 'posix':
+        import subprocess
         
-        print_colored("\n========================", Colors.HEADER)
+        log_limit("이 운영 체제에서는 리소스 제한을 지원하지 않아 제한 없이 실행합니다.")
+        try:
+            return subprocess.call(argv)
+        except OSError as e:
+            log_limit(f"서버를 실행할 수 없습니다: {format_command(argv)} ({str(e)})")
+            return 127
     
-    def show_os_info(self) -> None:
-        """OS 정보 표시"""
-        os_details = OSInfo.get_os_details()
+    if not os.environ.pop(POOL_PROCESS_ENV, None) and claim_limit_slot(name, argv, limits, wait) is None:
+        return 75
+    
+    for warning in limits.apply():
+        log_limit(warning)
+    try:
+        os.execvp(argv[0], argv)
+    except OSError as e:
+        log_limit(f"서버를 실행할 수 없습니다: {format_command(argv)} ({str(e)})")
+        return 127
+
+def host_resources() -> Dict[str, Any]:
+    """호스트 CPU 수, 부하, 메모리 (Linux /proc/meminfo, 측정할 수 없으면 None)"""
+    info = {'cpus': os.cpu_count(), 'load': None, 'mem_total': None, 'mem_available': None}
+    try:
+        info['load'] = list(os.getloadavg())
+    except (AttributeError, OSError):
+        pass
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('MemTotal', 'MemAvailable'):
+                    info['mem_total' if key == 'MemTotal' else 'mem_available'] = int(value.split()[0]) * 1024
+    except (OSError, ValueError):
+        pass
+    return info
+
+def collect_resource_usage(servers: Dict[str, Dict]) -> Dict[str, Any]:
+    """limit 명령으로 감싼 서버별 실행 인스턴스의 사용량과 제한"""
+    report = {'host': host_resources(), 'servers': [], 'unlimited': [],
+              'session_memory': None, 'sessions_available': None}
+    session_memory = 0
+    for name, server in servers.items():
+        parsed = parse_limit_entry(server)
+        if parsed is None:
+            report['unlimited'].append(name)
+            continue
+        slot_name, limits, _, _ = parsed
+        instances = []
+        for pid in InstanceSlots(slot_name or name).holders():
+            try:
+                nice = os.getpriority(os.PRIO_PROCESS, pid)
+            except OSError:
+                continue
+            instances.append({'pid': pid, 'rss': process_tree_rss(pid), 'open_files': process_open_files(pid),
+                              'nice': nice})
+        report['servers'].append({'name': name, 'limits': limits.to_dict(), 'instances': instances})
+        if limits.memory is not None and session_memory is not None:
+            session_memory += limits.memory
+        else:
+            session_memory = None
+    
+    if report['servers'] and not report['unlimited'] and session_memory is not None:
+        report['session_memory'] = session_memory
+        available = report['host']['mem_available']
+        if available is not None:
+            report['sessions_available'] = available // session_memory
+    return report
+
+def print_resource_usage(report: Dict[str, Any]) -> None:
+    """collect_resource_usage() 결과 출력"""
+    def mb(value):
+        return f"{value / (1024 * 1024):.1f}MB" if value is not None else "-"
+    
+    def ratio(value, limit):
+        return f" ({value * 100 / limit:.0f}%)" if value is not None and limit else ""
+    
+    host = report['host']
+    print_colored("\n===== MCP 서버 리소스 사용량 =====", Colors.HEADER)
+    load = ' / '.join(f"{value:.2f}" for value in host['load']) if host['load'] else '-'
+    print(f"CPU: {host['cpus']}개, 부하(1/5/15분): {load}")
+    print(f"메모리: 사용 가능 {mb(host['mem_available'])} / 전체 {mb(host['mem_total'])}")
+    
+    for server in report['servers']:
+        limits = server['limits']
+        policy = [
+            f"메모리 {mb(limits['memory'])}" if limits['memory'] is not None else None,
+            f"nice {limits['nice']}" if limits['nice'] is not None else None,
+            f"파일 {limits['nofile']}개" if limits['nofile'] is not None else None,
+        ]
+        running = f"{len(server['instances'])}/{limits['max_instances'] or '∞'}"
+        print_colored(f"\n[{server['name']}] 실행 {running}, 제한: {', '.join(p for p in policy if p) or '없음'}",
+                      Colors.BOLD)
+        for instance in server['instances']:
+            over = limits['memory'] is not None and (instance['rss'] or 0) > limits['memory'] * 0.9
+            files = instance['open_files']
+            print_colored(
+                f"  pid {instance['pid']}: RSS {mb(instance['rss'])}{ratio(instance['rss'], limits['memory'])}, "
+                f"파일 {files if files is not None else '-'}{ratio(files, limits['nofile'])}, "
+                f"nice {instance['nice']}",
+                Colors.WARNING if over else Colors.ENDC
+            )
+    
+    if report['unlimited']:
+        print_colored(f"\n제한 없는 서버: {', '.join(report['unlimited'])}", Colors.WARNING)
+    if report['session_memory'] is not None:
+        print(f"\n세션당 메모리 상한 합계: {mb(report['session_memory'])}")
+        if report['sessions_available'] is not None:
+            print(f"사용 가능한 메모리로 추가할 수 있는 세션: {report['sessions_available']}개")
+    print_colored("==================================", Colors.HEADER)
+
+class FileWatcher:
+    """파일 변경 감시
+
+    Linux에서는 ctypes로 inotify를 사용해 변경 즉시 깨어나고, 그 밖의
+    환경이나 inotify를 쓸 수 없으면 poll_interval초마다 stat을 비교합니다.
+    설정 파일은 원자적 교체(rename)로 바뀌므로 파일이 있는 디렉토리를
+    감시하고 이름으로 거릅니다.
+    """
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    
+    def __init__(self, paths: List[Path], poll_interval: float = 1.0, debounce: float = 0.05):
+        self.paths = [Path(os.path.abspath(path)) for path in paths]
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self._watches = {}
+        self._fd = self._init_inotify() if sys.platform.startswith('linux') else None
+        self._snapshot = self._stat_all()
+    
+    @property
+    def backend(self) -> str:
+        return 'inotify' if self._fd is not None else 'poll'
+    
+    def _init_inotify(self) -> Optional[int]:
+        """inotify 디스크립터를 만들고 각 파일의 디렉토리 감시 (실패하면 None)"""
+        import ctypes
+        import ctypes.util
         
-        print_colored("\n===== 시스템 정보 =====", Colors.HEADER)
-        print(f"운영 체제: {os_details['system']}")
-        print(f"버전: {os_details['release']} ({os_details['version']})")
-        print(f"아키텍처: {os_details['machine']}")
-        print(f"프로세서: {os_details['processor']}")
-        print(f"Python 버전: {os_details['python_version']}")
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        for directory in {path.parent for path in self.paths}:
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), self.WATCH_MASK)
+            if wd < 0:
+                os.close(fd)
+                return None
+            self._watches[wd] = directory
+        return fd
+    
+    def _stat_all(self) -> Dict[Path, Optional[tuple]]:
+        snapshot = {}
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+                snapshot[path] = (st.st_mtime_ns, st.st_size, st.st_ino)
+            except OSError:
+                snapshot[path] = None
+        return snapshot
+    
+    def _read_events(self) -> set:
+        """대기 중인 inotify 이벤트에서 감시 대상 경로 추출"""
+        import struct
         
-        # Node.js 정보 표시
-        node_installed = NodeJSChecker.is_nodejs_installed()
-        node_version = NodeJSChecker.get_nodejs_version() if node_installed else "설치되지 않음"
-        print(f"Node.js 설치 여부: {node_installed}")
-        print(f"Node.js 버전: {node_version}")
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset + 16 <= len(data):
+                wd, _, _, length = struct.unpack_from('iIII', data, offset)
+                name = data[offset + 16:offset + 16 + length].rstrip(b'\0')
+                offset += 16 + length
+                directory = self._watches.get(wd)
+                if directory is not None:
+                    path = directory / os.fsdecode(name)
+                    if path in self.paths:
+                        changed.add(path)
+    
+    def wait(self, timeout: Optional[float] = None) -> List[Path]:
+        """감시 대상 파일이 바뀔 때까지 대기해 바뀐 경로 반환 (시간 초과면 빈 목록)
+
+        연달아 일어난 변경은 debounce초 동안 모아 한 번에 반환합니다.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        if self._fd is not None:
+            import select
+            
+            while True:
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+                ready, _, _ = select.select([self._fd], [], [], remaining)
+                if not ready:
+                    return []
+                changed = self._read_events()
+                if changed:
+                    while select.select([self._fd], [], [], self.debounce)[0]:
+                        changed |= self._read_events()
+                    self._snapshot = self._stat_all()
+                    return sorted(changed)
         
-        print(f"Cursor 설정 경로: {self.cursor_dir}")
-        print(f"MCP 설정 파일: {self.mcp_json_path}")
-        print_colored("========================", Colors.HEADER)
+        while deadline is None or time.monotonic() < deadline:
+            time.sleep(self.poll_interval if deadline is None
+                       else max(min(self.poll_interval, deadline - time.monotonic()), 0))
+            snapshot = self._stat_all()
+            changed = [path for path in self.paths if snapshot[path] != self._snapshot[path]]
+            self._snapshot = snapshot
+            if changed:
+                return changed
+        return []
+    
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+def read_batch_operations(source: str) -> Optional[List[Dict]]:
+    """배치 작업 목록 읽기 ('-'이면 표준 입력)
+
+    JSON 배열, {"operations": [...]} 객체, 또는 한 줄에 하나씩 작성된
+    JSON Lines 형식을 지원합니다.
+    """
+    try:
+        if source == '-':
+            text = sys.stdin.read()
+        else:
+            with open(source, 'r', encoding='utf-8') as f:
+                text = f.read()
+    except OSError as e:
+        print_colored(f"배치 파일 읽기 오류: {str(e)}", Colors.FAIL)
+        return None
+    
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            data = [json.loads(line) for line in text.splitlines() if line.strip()]
+        except json.JSONDecodeError as e:
+            print_colored(f"배치 파일 파싱 오류: {str(e)}", Colors.FAIL)
+            return None
+    
+    if isinstance(data, dict):
+        data = data.get('operations')
+    if not isinstance(data, list):
+        print_colored("배치 파일은 작업 목록이어야 합니다.", Colors.FAIL)
+        return None
+    return data
+
+def add_cache_arguments(parser):
+    """패키지 캐시 인자 추가"""
+    parser.add_argument('--cache-dir', help='미리 받아 둔 패키지 캐시 디렉토리 (지정하면 npx 대신 캐시 사용)')
+
+def add_install_arguments(parser):
+    """설치 관련 공통 인자 추가"""
+    add_cache_arguments(parser)
+    parser.add_argument('--parallel', action='store_true', help='MCP 패키지를 동시에 설치')
+    parser.add_argument('--jobs', type=positive_int, default=None, help='병렬 설치 작업자 수 (기본값: 설치 단계 수)')
+    parser.add_argument('--fail-fast', action='store_true', help='설치 실패 시 나머지 설치 중단')
+    parser.add_argument('--install-timeout', type=float, default=None, help='설치 명령별 제한 시간(초)')
+    parser.add_argument('--force', action='store_true', help='설치 기록을 무시하고 모든 MCP 패키지를 다시 설치')
+    parser.add_argument('--retries', type=int, default=MCPInstaller.DEFAULT_RETRIES,
+                        help=f'실패한 설치의 재시도 횟수 (기본값: {MCPInstaller.DEFAULT_RETRIES})')
+    parser.add_argument('--retry-delay', type=float, default=MCPInstaller.DEFAULT_RETRY_DELAY,
+                        help=f'첫 재시도 전 대기 시간(초), 이후 두 배씩 증가 (기본값: {MCPInstaller.DEFAULT_RETRY_DELAY})')
+
+def create_installer(mcp_setup: 'MCPSetup', args) -> MCPInstaller:
+    """설치 인자로 MCPInstaller 생성"""
+    return MCPInstaller(mcp_setup.package_cache, args.install_timeout, InstallState(),
+                        args.force, args.retries, args.retry_delay)
+
+def filter_argument(spec: str) -> tuple:
+    """list --filter 인자 해석"""
+    try:
+        return ServerIndex.parse_filter(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def add_gateway_argument(parser):
+    """게이트웨이/웜 풀 설정 인자 추가"""
+    parser.add_argument('--gateway', action='store_true',
+                        help=f'서버를 mcp.json 대신 {GATEWAY_BACKENDS_FILE}에 기록하고 게이트웨이 항목 하나만 설정')
+    parser.add_argument('--launcher', action='store_true',
+                        help='서버 항목을 웜 풀(pool)에서 미리 초기화된 프로세스를 받아 쓰는 launch 명령으로 감쌈')
+
+def positive_int(text: str) -> int:
+    """1 이상의 정수 인자 해석"""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"정수가 아닙니다: {text}")
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"1 이상이어야 합니다: {text}")
+    return value
+
+def positive_float(text: str) -> float:
+    """0보다 큰 실수 인자 해석"""
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"숫자가 아닙니다: {text}")
+    if not value > 0:
+        raise argparse.ArgumentTypeError(f"0보다 커야 합니다: {text}")
+    return value
 
-def setup_argument_parser():
-    """명령행 인자 파서 설정"""
+def size_argument(text: str) -> int:
+    """--memory-limit 인자 해석"""
+    try:
+        return ResourceLimits.parse_size(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def add_limit_arguments(parser):
+    """서버 리소스 제한 인자 추가 (limit 명령과 설정 명령이 같은 이름을 사용)"""
+    parser.add_argument('--memory-limit', type=size_argument, metavar='SIZE',
+                        help='서버 프로세스의 메모리(데이터 영역) 상한 (예: 512M, 2G)')
+    parser.add_argument('--nice', type=int, choices=range(-20, 20), metavar='N',
+                        help='서버 프로세스의 CPU 우선순위 (-20~19, 클수록 낮음)')
+    parser.add_argument('--nofile', type=positive_int, metavar='N', help='서버 프로세스가 열 수 있는 파일 수')
+    parser.add_argument('--max-instances', type=positive_int, metavar='N', help='같은 서버의 최대 동시 실행 수')
+
+def add_retention_arguments(parser):
+    """백업 보존 정책 인자 추가"""
+    parser.add_argument('--keep-last', type=int, default=BackupStore.DEFAULT_KEEP_LAST,
+                        help=f'보존할 최근 백업 수 (기본값: {BackupStore.DEFAULT_KEEP_LAST})')
+    parser.add_argument('--max-age-days', type=float, help='이 기간(일)보다 오래된 백업 삭제')
+    parser.add_argument('--max-bytes', type=int, help='백업 전체 크기 상한(바이트)')
+
+def setup_argument_parser(command: Optional[str] = None):
+    """명령행 인자 파서 설정
+
+    command가 주어지면 해당 서브 명령의 인자만 구성하고, 나머지 서브 명령은
+    이름과 도움말만 등록해 시작 시간을 줄입니다.
+    """
+    def wanted(name):
+        return command is None or command == name
+    
     parser = argparse.ArgumentParser(description='MCP 설정 도구')
+    parser.add_argument('--lock-timeout', type=float, default=10.0, help='설정 파일 잠금 대기 시간(초)')
+    parser.add_argument('--target-os', choices=OSInfo.SUPPORTED_OS_TYPES,
+                        help='설정을 생성할 대상 운영 체제 (기본값: 현재 운영 체제)')
+    parser.add_argument('--target-home', metavar='DIR',
+                        help='대상 운영 체제의 홈 디렉토리로 쓸 경로 (--target-os가 현재 운영 체제와 다르면 설정 변경 시 필수)')
+    parser.add_argument('--templates', metavar='PATH', help='서버 템플릿 파일 (기본값: 스크립트 옆 mcp_servers.json)')
+    parser.add_argument('--socket', metavar='PATH', help='serve 데몬 소켓 경로 (기본값: $XDG_RUNTIME_DIR/mcp_setup.sock)')
+    parser.add_argument('--no-daemon', action='store_true', help='serve 데몬이 실행 중이어도 현재 프로세스에서 실행')
+    parser.add_argument('--profile', action='store_true', help='종료 시 단계별 실행 시간 요약 출력 (표준 오류)')
+    parser.add_argument('--trace', metavar='PATH', help='구간별 실행 시간을 JSON Lines로 기록 (-이면 표준 오류)')
     subparsers = parser.add_subparsers(dest='command', help='명령')
     
     # 기본 설정 명령
-    subparsers.add_parser('setup', help='기본 MCP 서버 설정')
+    setup_parser = subparsers.add_parser('setup', help='기본 MCP 서버 설정')
+    if wanted('setup'):
+        add_cache_arguments(setup_parser)
+        add_gateway_argument(setup_parser)
+        add_limit_arguments(setup_parser)
     
     # GitHub 설정 명령
     github_parser = subparsers.add_parser('github', help='GitHub MCP 설정')
-    github_parser.add_argument('--token', required=True, help='GitHub 개인 액세스 토큰')
+    if wanted('github'):
+        github_parser.add_argument('--token', required=True, help='GitHub 개인 액세스 토큰')
+        add_gateway_argument(github_parser)
+        add_limit_arguments(github_parser)
     
     # 서버 추가 명령
     add_parser = subparsers.add_parser('add', help='MCP 서버 추가')
-    add_parser.add_argument('--name', required=True, help='서버 이름')
-    add_parser.add_argument('--command', required=True, help='실행 명령어')
-    add_parser.add_argument('--args', required=True, help='명령어 인자 (쉼표로 구분)')
+    if wanted('add'):
+        add_parser.add_argument('--name', help='서버 이름 (--template을 쓰면 기본값은 템플릿 이름)')
+        add_parser.add_argument('--command', dest='server_command', help='실행 명령어')
+        add_parser.add_argument('--args', help='명령어 인자 (쉼표로 구분)')
+        add_parser.add_argument('--template', help='서버 템플릿 이름 (--command/--args 대신 사용)')
+        add_parser.add_argument('--param', action='append', default=[], metavar='KEY=VALUE',
+                                help='템플릿 매개변수 (여러 번 지정 가능, 예: token=...)')
+        add_limit_arguments(add_parser)
     
     # 서버 제거 명령
     remove_parser = subparsers.add_parser('remove', help='MCP 서버 제거')
-    remove_parser.add_argument('--name', required=True, help='서버 이름')
+    if wanted('remove'):
+        remove_parser.add_argument('--name', required=True, help='서버 이름')
+    
+    # 배치 편집 명령
+    batch_parser = subparsers.add_parser('batch', help='여러 서버 추가/제거를 한 번에 적용')
+    if wanted('batch'):
+        batch_parser.add_argument('--file', default='-', help='작업 목록 파일 경로 (기본값: 표준 입력)')
     
     # 설정 내보내기 명령
     export_parser = subparsers.add_parser('export', help='MCP 설정 내보내기')
-    export_parser.add_argument('--output', help='출력 파일 경로')
+    if wanted('export'):
+        export_parser.add_argument('--output', help='출력 파일 경로')
+        export_parser.add_argument('--compact', action='store_true', help='들여쓰기 없이 압축 형식으로 저장')
     
     # 설정 가져오기 명령
     import_parser = subparsers.add_parser('import', help='MCP 설정 가져오기')
-    import_parser.add_argument('--input', required=True, help='입력 파일 경로')
+    if wanted('import'):
+        import_parser.add_argument('--input', required=True, help='입력 파일 경로')
+        import_parser.add_argument('--compact', action='store_true', help='들여쓰기 없이 압축 형식으로 저장')
+        import_parser.add_argument('--merge', action='store_true', help='서버 단위로 비교해 바뀐 항목만 반영')
+        import_parser.add_argument('--keep-missing', action='store_true', help='--merge 시 가져올 파일에 없는 서버를 유지')
+        import_parser.add_argument('--dry-run', action='store_true', help='--merge 시 변경 사항만 출력하고 저장하지 않음')
     
     # 서버 목록 명령
-    subparsers.add_parser('list', help='MCP 서버 목록 출력')
+    list_parser = subparsers.add_parser('list', help='MCP 서버 목록 출력')
+    if wanted('list'):
+        list_parser.add_argument('--filter', action='append', default=[], type=filter_argument, metavar='KEY=VALUE',
+                                 help='name(와일드카드)/command/package/os 조건으로 거르기 '
+                                      '(여러 번 지정하면 모두 만족, 예: package=@smithery-ai/github, os=windows)')
     
     # 백업 명령
-    subparsers.add_parser('backup', help='MCP 설정 백업')
+    backup_parser = subparsers.add_parser('backup', help='MCP 설정 백업')
+    if wanted('backup'):
+        add_retention_arguments(backup_parser)
+    
+    # 백업 관리 명령
+    backups_parser = subparsers.add_parser('backups', help='MCP 설정 백업 관리')
+    if wanted('backups'):
+        backups_subparsers = backups_parser.add_subparsers(dest='backups_command', help='백업 관리 명령')
+        backups_subparsers.add_parser('list', help='백업 목록 출력')
+        prune_parser = backups_subparsers.add_parser('prune', help='보존 정책에 따라 백업 정리')
+        add_retention_arguments(prune_parser)
+    
+    # 복원 명령
+    restore_parser = subparsers.add_parser('restore', help='백업에서 MCP 설정 복원')
+    if wanted('restore'):
+        restore_parser.add_argument('--hash', help='복원할 백업 해시 (접두어 가능, 기본값: 가장 최근 백업)')
     
     # 시스템 정보 명령
     subparsers.add_parser('sysinfo', help='시스템 정보 표시')
     
+    # 리소스 사용량 명령
+    usage_parser = subparsers.add_parser('usage', help='리소스 제한을 둔 MCP 서버의 실행 인스턴스별 사용량 표시')
+    if wanted('usage'):
+        usage_parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    
+    # 서버 시작 측정 명령
+    probe_parser = subparsers.add_parser('probe', help='설정된 MCP 서버의 시작 시간과 메모리 측정')
+    if wanted('probe'):
+        probe_parser.add_argument('--name', action='append', help='측정할 서버 이름 (여러 번 지정 가능, 기본값: 전체)')
+        probe_parser.add_argument('--concurrency', type=int, default=4, help='동시에 실행할 서버 수')
+        probe_parser.add_argument('--timeout', type=float, default=30.0, help='서버별 응답 대기 시간(초)')
+        probe_parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    
+    # 부하 테스트 명령
+    loadtest_parser = subparsers.add_parser('loadtest', help='MCP 서버에 tools/call 부하를 걸어 처리량과 지연 시간 측정')
+    if wanted('loadtest'):
+        target = loadtest_parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--name', help='측정할 mcp.json 서버 이름')
+        target.add_argument('--stub', action='store_true', help='내장 테스트 서버를 측정 (오프라인)')
+        loadtest_parser.add_argument('--tool', help='호출할 도구 이름 (기본값: 인자 없이 호출할 수 있는 첫 도구)')
+        loadtest_parser.add_argument('--arguments', default='{}', help='--tool에 전달할 인자 (JSON 객체)')
+        loadtest_parser.add_argument('--calls', metavar='PATH', help='기록된 tools/call 요청 파일 (JSON 배열 또는 JSON Lines, 차례로 반복)')
+        loadtest_parser.add_argument('--concurrency', type=int, default=4, help='동시에 처리 중인 요청 수 (기본값: 4)')
+        loadtest_parser.add_argument('--rate', type=float, help='초당 요청 수 (기본값: 제한 없음)')
+        loadtest_parser.add_argument('--requests', type=positive_int, default=None, help='보낼 요청 수 (기본값: 200, --duration이 없을 때)')
+        loadtest_parser.add_argument('--duration', type=positive_float, help='측정 시간(초)')
+        loadtest_parser.add_argument('--warmup', type=int, default=0, help='측정 전에 보낼 요청 수')
+        loadtest_parser.add_argument('--timeout', type=float, default=30.0, help='요청별 응답 대기 시간(초)')
+        loadtest_parser.add_argument('--stub-latency-ms', type=float, default=1.0, help='--stub 서버의 tools/call 처리 지연 시간(ms)')
+        loadtest_parser.add_argument('--stub-fail-rate', type=float, default=0.0, help='--stub 서버의 tools/call 실패 비율 (0~1)')
+        loadtest_parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    
+    # 도구 목록 명령
+    tools_parser = subparsers.add_parser('tools', help='설정된 MCP 서버의 도구 목록 표시 및 검색 (캐시 사용)')
+    if wanted('tools'):
+        tools_parser.add_argument('query', nargs='?', help='도구 이름과 설명에서 찾을 검색어 (공백으로 구분, 모두 포함)')
+        tools_parser.add_argument('--name', action='append', help='대상 서버 이름 (여러 번 지정 가능, 기본값: 전체)')
+        tools_parser.add_argument('--refresh', action='store_true', help='캐시를 무시하고 모든 서버에서 다시 읽기')
+        tools_parser.add_argument('--cached', action='store_true', help='서버를 실행하지 않고 캐시된 목록만 사용')
+        tools_parser.add_argument('--concurrency', type=int, default=8, help='동시에 실행할 서버 수')
+        tools_parser.add_argument('--timeout', type=float, default=30.0, help='서버별 응답 대기 시간(초)')
+        tools_parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    
+    # 테스트용 MCP 서버 명령
+    stub_parser = subparsers.add_parser('stub-server', help='테스트용 MCP stdio 서버 실행')
+    if wanted('stub-server'):
+        stub_parser.add_argument('--startup-delay', type=float, default=0.0, help='시작 지연 시간(초)')
+        stub_parser.add_argument('--latency-ms', type=float, default=0.0, help='tools/call 처리 지연 시간(ms)')
+        stub_parser.add_argument('--extra-tools', type=int, default=0, help='추가로 노출할 테스트 도구 수')
+        stub_parser.add_argument('--fail-rate', type=float, default=0.0, help='tools/call 실패 비율 (0~1)')
+    
+    # 게이트웨이 명령
+    gateway_parser = subparsers.add_parser('gateway', help='여러 MCP 서버를 하나로 묶는 stdio 게이트웨이 실행')
+    if wanted('gateway'):
+        gateway_parser.add_argument('--backends', metavar='PATH',
+                                    help=f'백엔드 서버 목록 (기본값: Cursor 설정 디렉토리의 {GATEWAY_BACKENDS_FILE})')
+        gateway_parser.add_argument('--idle-timeout', type=float, default=300.0,
+                                    help='요청이 없는 백엔드를 종료할 시간(초, 0이면 종료하지 않음, 기본값: 300)')
+        gateway_parser.add_argument('--start-timeout', type=float, default=60.0, help='백엔드 시작 대기 시간(초)')
+        gateway_parser.add_argument('--request-timeout', type=float, default=300.0, help='백엔드 요청별 제한 시간(초)')
+        gateway_parser.add_argument('--no-tool-cache', action='store_true',
+                                    help='캐시된 도구 목록을 쓰지 않고 tools/list 때 백엔드를 모두 시작')
+    
+    # 웜 풀 명령
+    pool_parser = subparsers.add_parser('pool', help='미리 초기화한 MCP 서버 프로세스를 보관하는 웜 풀 실행')
+    if wanted('pool'):
+        pool_parser.add_argument('--size', type=int, default=1, help='실행 조건별로 준비해 둘 프로세스 수 (기본값: 1)')
+        pool_parser.add_argument('--init-timeout', type=float, default=60.0, help='프로세스 initialize 대기 시간(초)')
+        pool_parser.add_argument('--idle-timeout', type=float, default=None, help='요청이 없으면 종료할 시간(초)')
+        pool_parser.add_argument('--no-prewarm', action='store_true', help='mcp.json의 launch 항목을 미리 실행하지 않음')
+        pool_parser.add_argument('--status', action='store_true', help='실행 중인 웜 풀의 적중/실패 수와 지연 시간 출력')
+        pool_parser.add_argument('--stop', action='store_true', help='실행 중인 웜 풀 종료')
+        pool_parser.add_argument('--pool-socket', metavar='PATH',
+                                 help='웜 풀 소켓 경로 (기본값: $XDG_RUNTIME_DIR/mcp_setup_pool.sock)')
+    
+    # 서버 실행 셔틀 명령
+    launch_parser = subparsers.add_parser('launch', help='웜 풀의 프로세스를 받아 MCP 서버 실행 (없으면 직접 실행)')
+    if wanted('launch'):
+        launch_parser.add_argument('--pass-env', default='', metavar='NAMES',
+                                   help='풀의 프로세스에도 전달할 환경 변수 이름 (쉼표로 구분)')
+        launch_parser.add_argument('--no-pool', action='store_true', help='웜 풀을 쓰지 않고 항상 직접 실행')
+        launch_parser.add_argument('--pool-socket', metavar='PATH', help='웜 풀 소켓 경로')
+        launch_parser.add_argument('server_argv', nargs=argparse.REMAINDER, metavar='-- COMMAND [ARGS ...]',
+                                   help='실행할 서버 명령')
+    
+    # 리소스 제한 실행 명령
+    limit_parser = subparsers.add_parser('limit', help='리소스 제한을 적용해 MCP 서버 실행 (mcp.json 항목용)')
+    if wanted('limit'):
+        add_limit_arguments(limit_parser)
+        limit_parser.add_argument('--name', help='동시 실행 수를 셀 서버 이름 (기본값: 서버 명령의 해시)')
+        limit_parser.add_argument('--wait', type=float, default=0.0,
+                                  help='동시 실행 수가 가득 찼을 때 빈자리를 기다릴 시간(초)')
+        limit_parser.add_argument('server_argv', nargs=argparse.REMAINDER, metavar='-- COMMAND [ARGS ...]',
+                                  help='실행할 서버 명령')
+    
+    # 데몬 명령
+    serve_parser = subparsers.add_parser('serve', help='설정을 메모리에 유지하는 데몬 실행 (Unix 소켓, JSON-RPC)')
+    if wanted('serve'):
+        serve_parser.add_argument('--idle-timeout', type=float, default=None, help='요청이 없으면 종료할 시간(초)')
+        serve_parser.add_argument('--status', action='store_true', help='실행 중인 데몬 상태 확인')
+        serve_parser.add_argument('--stop', action='store_true', help='실행 중인 데몬 종료')
+    
+    # 인벤토리 일괄 생성 명령
+    render_parser = subparsers.add_parser('render', help='인벤토리의 여러 대상에 대해 mcp.json 일괄 생성')
+    if wanted('render'):
+        render_parser.add_argument('--inventory', required=True, help='대상 목록 파일 (JSON 또는 JSON Lines, -이면 표준 입력)')
+        render_parser.add_argument('--jobs', type=int, default=None, help='작업 프로세스 수 (기본값: CPU 수, 1이면 현재 프로세스에서 실행)')
+        render_parser.add_argument('--output-root', help='대상 경로를 이 디렉토리 아래에 생성 (배포 전 준비용)')
+        render_parser.add_argument('--replace', action='store_true', help='기존 서버 항목을 유지하지 않고 교체')
+        render_parser.add_argument('--dry-run', action='store_true', help='파일을 쓰지 않고 결과만 확인')
+        render_parser.add_argument('--no-fsync', dest='fsync', action='store_false',
+                                   help='파일마다 fsync하지 않음 (--output-root로 준비 디렉토리에 생성할 때 유용)')
+    
     # MCP 설치 명령
     install_parser = subparsers.add_parser('install', help='MCP 설치')
-    install_parser.add_argument('--github-token', help='GitHub MCP 설치에 사용할 토큰')
+    if wanted('install'):
+        install_parser.add_argument('--github-token', help='GitHub MCP 설치에 사용할 토큰')
+        add_install_arguments(install_parser)
+        install_parser.add_argument('--prefetch', action='store_true',
+                                    help='설치 전에 Smithery CLI 등 패키지를 캐시 디렉토리에 받아 버전 고정')
+        install_parser.add_argument('--package', action='append', default=[],
+                                    help='--prefetch 시 추가로 캐시할 npm 패키지 (여러 번 지정 가능)')
+        install_parser.add_argument('--registry', help='--prefetch 시 사용할 npm 레지스트리 URL')
+        install_parser.add_argument('--package-source', help='--prefetch 시 npm pack tarball을 가져올 로컬 디렉토리')
+    
+    # 상태 조정 명령
+    reconcile_parser = subparsers.add_parser('reconcile', help='원하는 상태 파일에 맞게 필요한 설치와 설정 변경만 수행')
+    if wanted('reconcile'):
+        reconcile_parser.add_argument('desired', help='원하는 상태 파일 (가져오기 파일과 같은 형식)')
+        reconcile_parser.add_argument('--keep-missing', action='store_true', help='원하는 상태 파일에 없는 서버를 유지')
+        reconcile_parser.add_argument('--dry-run', action='store_true', help='필요한 변경만 출력하고 적용하지 않음')
+        reconcile_parser.add_argument('--watch', action='store_true',
+                                      help='원하는 상태 파일이나 mcp.json이 바뀔 때마다 다시 조정 (Linux는 inotify)')
+        reconcile_parser.add_argument('--poll-interval', type=float, default=1.0,
+                                      help='inotify를 쓸 수 없을 때 변경을 확인할 간격(초)')
+        add_install_arguments(reconcile_parser)
     
     # 모든 설정 명령 (설치 + 설정)
     all_parser = subparsers.add_parser('all', help='MCP 설치 및 설정 모두 수행')
-    all_parser.add_argument('--github-token', help='GitHub MCP 설치 및 설정에 사용할 토큰')
+    if wanted('all'):
+        all_parser.add_argument('--github-token', help='GitHub MCP 설치 및 설정에 사용할 토큰')
+        add_install_arguments(all_parser)
+        add_gateway_argument(all_parser)
+        add_limit_arguments(all_parser)
     
     return parser
 
+# 서브 명령 목록
+COMMANDS = (
+    'setup', 'github', 'add', 'remove', 'batch', 'export', 'import', 'list',
+    'backup', 'backups', 'restore', 'sysinfo', 'usage', 'probe', 'loadtest', 'tools', 'stub-server', 'gateway', 'pool', 'launch', 'limit', 'serve', 'render', 'install', 'reconcile', 'all',
+)
+
+# 설정을 바꾸지 않는 명령 (OS 정보 출력과 디렉토리 생성을 건너뜀)
+READ_ONLY_COMMANDS = {'list', 'export', 'backups', 'sysinfo', 'usage', 'probe', 'loadtest', 'tools', 'render', 'serve', 'gateway', 'pool'}
+
+def find_command(argv: List[str]) -> Optional[str]:
+    """명령행 인자에서 서브 명령 이름 찾기"""
+    for arg in argv:
+        if arg in COMMANDS:
+            return arg
+    return None
+
 def main():
     """메인 함수"""
-    parser = setup_argument_parser()
-    args = parser.parse_args()
+    argv = sys.argv[1:]
+    parser = setup_argument_parser(find_command(argv))
+    args = parser.parse_args(argv)
+    
+    if args.command is None:
+        print_colored(f"사용법: python mcp_setup.py {{{'|'.join(COMMANDS)}}}", Colors.WARNING)
+        parser.print_help()
+        return
+    
+    if args.command == 'stub-server':
+        # 표준 출력은 JSON-RPC 전용이므로 다른 출력 없이 바로 실행
+        run_stub_server(args.startup_delay, args.latency_ms, args.extra_tools, args.fail_rate)
+        return
+    
+    if args.command == 'launch':
+        server_argv = args.server_argv[1:] if args.server_argv[:1] == ['--'] else args.server_argv
+        if not server_argv:
+            parser.error("launch에는 -- 뒤에 실행할 서버 명령이 필요합니다.")
+        pass_env = [name for name in args.pass_env.split(',') if name]
+        socket_path = Path(args.pool_socket) if args.pool_socket else None
+        sys.exit(run_launcher(server_argv, pass_env, socket_path, not args.no_pool))
+    
+    if args.command == 'limit':
+        server_argv = args.server_argv[1:] if args.server_argv[:1] == ['--'] else args.server_argv
+        if not server_argv:
+            parser.error("limit에는 -- 뒤에 실행할 서버 명령이 필요합니다.")
+        sys.exit(run_limited(server_argv, ResourceLimits.from_args(args), args.name, args.wait))
+    
+    if (args.command in DAEMON_COMMANDS and not (args.no_daemon or os.environ.get('MCP_SETUP_NO_DAEMON'))
+            and not (args.profile or args.trace or args.target_os or args.target_home or args.templates)):
+        # serve 데몬이 실행 중이면 명령을 전달하고 종료
+        if forward_to_daemon(args):
+            return
+    
+    if args.profile or args.trace:
+        try:
+            Tracer.enable(args.trace)
+        except OSError as e:
+            print_colored(f"추적 파일을 열 수 없습니다: {args.trace} ({str(e)})", Colors.FAIL)
+            sys.exit(1)
+    try:
+        with Tracer.span(args.command, 'command'):
+            run_subcommand(parser, args)
+    finally:
+        if Tracer.enabled:
+            if args.profile:
+                Tracer.print_profile()
+            Tracer.disable()
+
+def run_subcommand(parser, args) -> None:
+    """MCPSetup을 구성하고 서브 명령 실행"""
+    if args.target_os or args.target_home:
+        profile = OSInfo.set_target_os(args.target_os, args.target_home)
+        if profile.simulated and not args.target_home and args.command not in READ_ONLY_COMMANDS:
+            # 다른 운영 체제의 디렉토리 구조를 실제 홈 디렉토리에 만들지 않음
+            print_colored(f"--target-os {profile.os_type}로 설정을 변경하려면 --target-home으로 "
+                          f"설정을 기록할 디렉토리를 지정해야 합니다.", Colors.FAIL)
+            sys.exit(1)
+    if args.templates:
+        ServerRegistry.set_path(args.templates)
+    
+    package_cache = None
+    if getattr(args, 'cache_dir', None) or getattr(args, 'prefetch', False):
+        package_cache = PackageCache(Path(args.cache_dir) if args.cache_dir else PackageCache.default_root())
     
-    mcp_setup = MCPSetup()
+    mcp_setup = MCPSetup(lock_timeout=args.lock_timeout, package_cache=package_cache)
+    if args.command not in READ_ONLY_COMMANDS:
+        with Tracer.span('environment', 'startup'):
+            mcp_setup.print_environment()
     
+    try:
+        dispatch_command(mcp_setup, parser, args)
+    except LockTimeout as e:
+        print_colored(str(e), Colors.FAIL)
+        sys.exit(1)
+
+def dispatch_command(mcp_setup: 'MCPSetup', parser, args) -> None:
+    """서브 명령 실행"""
     if args.command == 'setup':
-        mcp_setup.setup_default_mcp_servers()
+        mcp_setup.setup_default_mcp_servers(args.gateway, args.launcher, ResourceLimits.from_args(args))
     
     elif args.command == 'github':
-        mcp_setup.setup_github_mcp(args.token)
+        mcp_setup.setup_github_mcp(args.token, args.gateway, args.launcher, ResourceLimits.from_args(args))
     
     elif args.command == 'add':
-        mcp_setup.add_mcp_server(
-            args.name,
-            args.command,
-            args.args.split(',')
-        )
+        if args.template:
+            params = dict(param.partition('=')[::2] for param in args.param)
+            mcp_setup.add_template_server(args.template, args.name, params, ResourceLimits.from_args(args))
+        elif args.name and args.server_command and args.args is not None:
+            mcp_setup.add_mcp_server(
+                args.name,
+                args.server_command,
+                args.args.split(','),
+                ResourceLimits.from_args(args)
+            )
+        else:
+            parser.error("add에는 --template 또는 --name, --command, --args가 필요합니다.")
     
     elif args.command == 'remove':
         mcp_setup.remove_mcp_server(args.name)
     
+    elif args.command == 'batch':
+        operations = read_batch_operations(args.file)
+        if operations is not None:
+            mcp_setup.apply_batch(operations)
+    
     elif args.command == 'export':
-        mcp_setup.export_mcp_config(args.output)
+        mcp_setup.export_mcp_config(args.output, args.compact)
     
     elif args.command == 'import':
-        mcp_setup.import_mcp_config(args.input)
+        if args.merge:
+            mcp_setup.merge_mcp_config(args.input, args.keep_missing, args.dry_run)
+        else:
+            mcp_setup.import_mcp_config(args.input, args.compact)
     
     elif args.command == 'list':
-        mcp_setup.list_mcp_servers()
+        mcp_setup.list_mcp_servers(dict(args.filter))
     
     elif args.command == 'backup':
-        mcp_setup.backup_mcp_config()
+        mcp_setup.backup_mcp_config(args.keep_last, args.max_age_days, args.max_bytes)
+    
+    elif args.command == 'backups':
+        if args.backups_command == 'list':
+            mcp_setup.list_backups()
+        elif args.backups_command == 'prune':
+            removed = mcp_setup.backup_store.prune(args.keep_last, args.max_age_days, args.max_bytes)
+            print_colored(f"백업 {len(removed)}개를 삭제했습니다.", Colors.GREEN)
+        else:
+            parser.parse_args(['backups', '--help'])
+    
+    elif args.command == 'restore':
+        mcp_setup.restore_mcp_config(args.hash)
     
     elif args.command == 'sysinfo':
         mcp_setup.show_os_info()
+    
+    elif args.command == 'usage':
+        if not mcp_setup.show_resource_usage(args.json):
+            sys.exit(1)
+    
+    elif args.command == 'probe':
+        if not mcp_setup.probe_mcp_servers(args.name, args.concurrency, args.timeout, args.json):
+            sys.exit(1)
         
+    elif args.command == 'loadtest':
+        calls = None
+        try:
+            if args.calls:
+                calls = read_recorded_calls(args.calls)
+            elif args.tool:
+                arguments = json.loads(args.arguments)
+                if not isinstance(arguments, dict):
+                    raise ValueError("--arguments는 JSON 객체여야 합니다.")
+                calls = [{'name': args.tool, 'arguments': arguments}]
+        except (OSError, ValueError) as e:
+            print_colored(f"요청 목록을 읽을 수 없습니다: {str(e)}", Colors.FAIL)
+            sys.exit(1)
+        if args.stub and calls is None:
+            calls = [{'name': 'echo', 'arguments': {'text': 'ping'}}]
+        stub_args = None
+        if args.stub:
+            stub_args = ['--latency-ms', str(args.stub_latency_ms), '--fail-rate', str(args.stub_fail_rate)]
+        total = args.requests if args.requests is not None else (None if args.duration else 200)
+        if not mcp_setup.loadtest_mcp_server(args.name, calls, args.concurrency, args.rate, total, args.duration,
+                                             args.timeout, args.warmup, args.json, stub_args):
+            sys.exit(1)
+    
+    elif args.command == 'tools':
+        if not mcp_setup.list_tools(args.name, args.query, args.refresh, args.cached, args.concurrency,
+                                    args.timeout, args.json):
+            sys.exit(1)
+    
+    elif args.command == 'gateway':
+        backends_path = Path(args.backends) if args.backends else mcp_setup.gateway_backends_path()
+        if not run_gateway(backends_path, args.idle_timeout, args.start_timeout, args.request_timeout,
+                           not args.no_tool_cache):
+            sys.exit(1)
+    
+    elif args.command == 'pool':
+        if not serve_pool(mcp_setup, args):
+            sys.exit(1)
+    
+    elif args.command == 'serve':
+        if not serve_daemon(mcp_setup, args):
+            sys.exit(1)
+    
+    elif args.command == 'render':
+        if not mcp_setup.render_inventory(args.inventory, args.jobs, args.output_root,
+                                         args.replace, args.dry_run, args.fsync):
+            sys.exit(1)
+    
     elif args.command == 'install':
+        if OSInfo.profile().simulated:
+            print_colored("--target-os가 실행 환경과 다르면 MCP 패키지를 설치할 수 없습니다.", Colors.FAIL)
+            return
+        
         if not NodeJSChecker.is_nodejs_installed():
             print_colored("Node.js가 설치되어 있어야 합니다.", Colors.FAIL)
             return
         
-        installer = MCPInstaller()
-        installer.install_all_mcps(args.github_token)
+        if args.prefetch:
+            specs = list(PackageCache.DEFAULT_PACKAGES) + args.package
+            if not mcp_setup.package_cache.prefetch(specs, args.registry, args.package_source):
+                return
+        
+        installer = create_installer(mcp_setup, args)
+        installer.install_all_mcps(args.github_token, args.parallel, args.jobs, args.fail_fast)
         
+    elif args.command == 'reconcile':
+        installer = create_installer(mcp_setup, args)
+        options = {'keep_missing': args.keep_missing, 'dry_run': args.dry_run,
+                   'parallel': args.parallel, 'max_workers': args.jobs}
+        if args.watch:
+            ok = mcp_setup.watch_reconcile(args.desired, installer, args.poll_interval, **options)
+        else:
+            ok = mcp_setup.reconcile(args.desired, installer, **options)
+        if not ok:
+            sys.exit(1)
+    
     elif args.command == 'all':
-        mcp_setup.setup_all(args.github_token)
+        mcp_setup.setup_all(args.github_token, args.parallel, args.jobs, args.fail_fast,
+                            create_installer(mcp_setup, args), args.gateway, args.launcher,
+                            ResourceLimits.from_args(args))
     
     else:
-        print_colored("사용법: python mcp_setup.py {setup|github|add|remove|export|import|list|backup|sysinfo|install|all}", Colors.WARNING)
+        print_colored(f"사용법: python mcp_setup.py {{{'|'.join(COMMANDS)}}}", Colors.WARNING)
         parser.print_help()
 
 if __name__ == '__main__':
@@ -1,3 +1,5 @@
 #!/bin/bash
 
-python mcp_setup.py "$@" 
\ No newline at end of file
+# 모듈로 실행하면 __pycache__의 바이트코드를 재사용해 매번 컴파일하지 않습니다.
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+PYTHONPATH="$SCRIPT_DIR${PYTHONPATH:+:$PYTHONPATH}" exec python -m mcp_setup "$@"
@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 저장소 루트의 mcp_setup.py를 가져올 수 있도록 경로 추가
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import mcp_setup  # noqa: E402
+
+SCRIPT = Path(mcp_setup.__file__).resolve()
+
+
+@pytest.fixture(autouse=True)
+def isolated_home(tmp_path, monkeypatch):
+    """캐시와 Cursor 설정 경로를 임시 디렉토리로 격리"""
+    home = tmp_path / 'home'
+    home.mkdir()
+    monkeypatch.setenv('HOME', str(home))
+    monkeypatch.setenv('MCP_SETUP_NO_DAEMON', '1')
+    monkeypatch.delenv('XDG_CACHE_HOME', raising=False)
+    return home
+
+
+@pytest.fixture
+def run_cli(tmp_path):
+    """mcp_setup.py를 별도 프로세스로 실행 (작업 디렉토리는 기본적으로 임시 디렉토리)"""
+    def run(*args, cwd=None, env=None, input=None):
+        return subprocess.run([sys.executable, str(SCRIPT)] + list(args), capture_output=True, text=True,
+                              cwd=cwd or tmp_path, env=env, input=input, timeout=60)
+    return run
+
+
+class PoolHarness:
+    """임시 소켓으로 실행한 웜 풀과 mcp.json 항목을 실행하는 클라이언트"""
+
+    def __init__(self, env):
+        self.env = env
+        self.socket_path = env['MCP_SETUP_POOL_SOCKET']
+        self.proc = None
+
+    @staticmethod
+    def initialize_line(protocol_version=mcp_setup.MCP_PROTOCOL_VERSION, capabilities=None):
+        request = {'jsonrpc': '2.0', 'id': 1, 'method': 'initialize',
+                   'params': {'protocolVersion': protocol_version, 'capabilities': capabilities or {},
+                              'clientInfo': {'name': 'test', 'version': '1.0'}}}
+        return (json.dumps(request) + '\n').encode('utf-8')
+
+    def start_client(self, entry, line=None):
+        """항목을 실행하고 initialize를 보낸 뒤 (프로세스, 응답 한 줄) 반환"""
+        proc = subprocess.Popen([entry['command']] + entry['args'], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, env=self.env)
+        proc.stdin.write(line or self.initialize_line())
+        proc.stdin.flush()
+        return proc, proc.stdout.readline()
+
+    @staticmethod
+    def stop_client(proc):
+        """입력을 닫고 종료를 기다린 뒤 표준 오류 반환"""
+        proc.stdin.close()
+        proc.stdout.close()
+        proc.wait(timeout=30)
+        return proc.stderr.read().decode('utf-8')
+
+    def start(self):
+        self.proc = subprocess.Popen([sys.executable, str(SCRIPT), 'pool', '--no-prewarm'],
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=self.env)
+        deadline = time.monotonic() + 30
+        while mcp_setup.daemon_request(self.socket_path, 'ping', {}, timeout=1.0) is None:
+            assert time.monotonic() < deadline and self.proc.poll() is None, '웜 풀을 시작하지 못했습니다.'
+            time.sleep(0.05)
+
+    def stop(self):
+        try:
+            mcp_setup.daemon_request(self.socket_path, 'shutdown', {}, timeout=5.0)
+        except mcp_setup.DaemonError:
+            # 응답을 쓰기 전에 풀이 종료될 수 있음
+            pass
+        self.proc.wait(timeout=30)
+
+    def wait_ready(self, count=1, timeout=30):
+        """준비된 프로세스가 count개가 될 때까지 대기"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            response = mcp_setup.daemon_request(self.socket_path, 'status', {}, timeout=1.0)
+            pools = (response or {}).get('result', {}).get('pools', [])
+            if pools and pools[0]['ready'] >= count:
+                return
+            time.sleep(0.1)
+        raise AssertionError('웜 풀이 준비되지 않았습니다.')
+
+
+@pytest.fixture
+def warm_pool(tmp_path, monkeypatch):
+    """웜 풀 소켓과 슬롯 디렉토리를 임시 디렉토리로 격리해 pool 실행"""
+    monkeypatch.setenv('MCP_SETUP_POOL_SOCKET', str(tmp_path / 'pool.sock'))
+    monkeypatch.setenv('MCP_SETUP_SLOTS_DIR', str(tmp_path / 'slots'))
+    harness = PoolHarness(dict(os.environ))
+    harness.start()
+    yield harness
+    harness.stop()
@@ -0,0 +1,67 @@
+"""serve 데몬의 설정 캐시 테스트"""
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from mcp_setup import MCPSetup, MCPSetupDaemon
+
+
+def write_config(path: Path, servers: dict) -> None:
+    path.write_text(json.dumps({'mcpServers': servers}), encoding='utf-8')
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    mcp_json = tmp_path / 'mcp.json'
+    write_config(mcp_json, {'one': {'command': 'npx', 'args': ['-y', 'one']}})
+    setup = MCPSetup(mcp_json_path=mcp_json, work_dir=tmp_path, cache_config=True)
+    return MCPSetupDaemon(setup, tmp_path / 'daemon.sock')
+
+
+def listed_names(daemon):
+    return [server['name'] for server in daemon.handle('list', {})['servers']]
+
+
+def test_daemon_cache_reuses_parsed_config(daemon, monkeypatch):
+    assert listed_names(daemon) == ['one']
+    
+    loads = []
+    real_load = json.load
+    monkeypatch.setattr(json, 'load', lambda f, **kw: loads.append(f) or real_load(f, **kw))
+    assert listed_names(daemon) == ['one']
+    assert loads == []
+
+
+def test_daemon_cache_invalidated_by_atomic_replace(daemon):
+    mcp_json = daemon.mcp_setup.mcp_json_path
+    assert listed_names(daemon) == ['one']
+    
+    # 다른 프로세스가 원자적 교체로 다시 쓴 경우 (inode가 바뀜)
+    other = MCPSetup(mcp_json_path=mcp_json, work_dir=mcp_json.parent)
+    assert other.add_mcp_server('two', 'npx', ['-y', 'two'])
+    assert listed_names(daemon) == ['one', 'two']
+
+
+def test_daemon_cache_invalidated_by_in_place_rewrite(daemon):
+    mcp_json = daemon.mcp_setup.mcp_json_path
+    assert listed_names(daemon) == ['one']
+    inode = os.stat(mcp_json).st_ino
+    stat = os.stat(mcp_json)
+    
+    # 같은 inode, 같은 크기로 덮어쓰고 mtime만 다른 경우
+    write_config(mcp_json, {'uno': {'command': 'npx', 'args': ['-y', 'one']}})
+    os.utime(mcp_json, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert os.stat(mcp_json).st_ino == inode
+    assert os.stat(mcp_json).st_size == stat.st_size
+    assert listed_names(daemon) == ['uno']
+
+
+def test_daemon_cache_sees_own_writes(daemon):
+    daemon.handle('add', {'name': 'two', 'command': 'npx', 'args': ['-y', 'two']})
+    daemon.handle('remove', {'name': 'one'})
+    
+    assert listed_names(daemon) == ['two']
+    on_disk = json.loads(daemon.mcp_setup.mcp_json_path.read_text(encoding='utf-8'))
+    assert list(on_disk['mcpServers']) == ['two']
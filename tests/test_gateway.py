@@ -0,0 +1,107 @@
+"""stdio 게이트웨이 테스트 (stub-server 백엔드)"""
+import asyncio
+import io
+import json
+
+import pytest
+
+import mcp_setup
+from mcp_setup import MCPGateway
+
+
+def run_gateway(servers, messages, gateway=None):
+    """메시지를 차례로 보내고 입력이 끝나면 id별 응답과 알림 목록 반환"""
+    stdin = io.BytesIO(b''.join(json.dumps(message).encode('utf-8') + b'\n' for message in messages))
+    stdout = io.BytesIO()
+    gateway = gateway or MCPGateway(servers, idle_timeout=0, start_timeout=30, request_timeout=30)
+    asyncio.run(gateway.serve(stdin, stdout))
+    responses, notifications = {}, []
+    for line in stdout.getvalue().splitlines():
+        message = json.loads(line)
+        if 'id' in message:
+            responses[message['id']] = message
+        else:
+            notifications.append(message)
+    return responses, notifications
+
+
+def request(request_id, method, params=None):
+    message = {'jsonrpc': '2.0', 'id': request_id, 'method': method}
+    if params is not None:
+        message['params'] = params
+    return message
+
+
+def call(request_id, name, arguments):
+    return request(request_id, 'tools/call', {'name': name, 'arguments': arguments})
+
+
+def test_gateway_lists_and_routes_prefixed_tools():
+    servers = {'one': mcp_setup.stub_server_entry(), 'two': mcp_setup.stub_server_entry('--extra-tools', '1')}
+    responses, _ = run_gateway(servers, [
+        request(1, 'initialize', {'protocolVersion': mcp_setup.MCP_PROTOCOL_VERSION}),
+        request(2, 'tools/list'),
+        call(3, 'one__echo', {'text': 'hi'}),
+        call(4, 'two__add', {'a': 1, 'b': 2}),
+        call(5, 'three__echo', {}),
+    ])
+
+    assert responses[1]['result']['serverInfo']['name'] == 'mcp-setup-gateway'
+    names = sorted(tool['name'] for tool in responses[2]['result']['tools'])
+    assert names == ['one__add', 'one__echo', 'two__add', 'two__echo', 'two__tool_0']
+    assert responses[3]['result']['content'][0]['text'] == 'hi'
+    assert responses[4]['result']['content'][0]['text'] == '3'
+    assert '알 수 없는 도구' in responses[5]['error']['message']
+
+
+def test_gateway_backend_name_with_separator():
+    servers = {'my': mcp_setup.stub_server_entry(), 'my__x': mcp_setup.stub_server_entry('--extra-tools', '1')}
+    responses, _ = run_gateway(servers, [
+        request(1, 'tools/list'),
+        call(2, 'my__x__echo', {'text': 'x'}),
+        call(3, 'my__x__tool_0', {}),
+        call(4, 'my__echo', {'text': 'plain'}),
+    ])
+
+    names = {tool['name'] for tool in responses[1]['result']['tools']}
+    assert {'my__x__echo', 'my__x__tool_0', 'my__echo'} <= names
+    assert responses[2]['result']['content'][0]['text'] == 'x'
+    assert 'error' not in responses[3]
+    assert responses[4]['result']['content'][0]['text'] == 'plain'
+
+
+def test_split_tool_name_prefers_longest_backend():
+    gateway = MCPGateway({'a': {'command': 'x'}, 'a__b': {'command': 'y'}}, idle_timeout=0)
+
+    backend, tool = gateway.split_tool_name('a__b__c')
+    assert (backend.name, tool) == ('a__b', 'c')
+    backend, tool = gateway.split_tool_name('a__c')
+    assert (backend.name, tool) == ('a', 'c')
+    for name in ('a__', 'b__c', 'a', None):
+        with pytest.raises(mcp_setup.MCPError):
+            gateway.split_tool_name(name)
+
+
+def test_gateway_rejects_non_object_params():
+    responses, _ = run_gateway({'one': mcp_setup.stub_server_entry()}, [
+        {'jsonrpc': '2.0', 'id': 1, 'method': 'tools/call', 'params': 'bad'},
+        {'jsonrpc': '2.0', 'id': 2, 'method': 'initialize', 'params': [1]},
+        request(3, 'ping'),
+    ])
+
+    assert responses[1]['error']['code'] == -32602
+    assert responses[2]['error']['code'] == -32602
+    assert responses[3]['result'] == {}
+
+
+def test_gateway_answers_unexpected_errors():
+    gateway = MCPGateway({'one': mcp_setup.stub_server_entry()}, idle_timeout=0)
+
+    async def broken(params):
+        raise RuntimeError('boom')
+    gateway.call_tool = broken
+    responses, _ = run_gateway(None, [call(1, 'one__echo', {}), request(2, 'ping')], gateway)
+
+    assert responses[1]['error']['code'] == -32603
+    assert 'boom' in responses[1]['error']['message']
+    assert responses[2]['result'] == {}
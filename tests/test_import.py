@@ -0,0 +1,63 @@
+"""import --merge 서버 단위 병합 테스트"""
+import json
+
+import pytest
+
+from mcp_setup import MCPSetup
+
+
+def write_config(path, servers):
+    path.write_text(json.dumps({'mcpServers': servers}), encoding='utf-8')
+
+
+@pytest.fixture
+def setup(tmp_path):
+    return MCPSetup(mcp_json_path=tmp_path / 'mcp.json', work_dir=tmp_path)
+
+
+def test_merge_applies_only_server_changes(setup, tmp_path, capsys):
+    write_config(setup.mcp_json_path, {'same': {'command': 'npx', 'args': ['same']},
+                                      'old': {'command': 'npx', 'args': ['old']},
+                                      'edit': {'command': 'npx', 'args': ['v1']}})
+    source = tmp_path / 'import.json'
+    write_config(source, {'same': {'command': 'npx', 'args': ['same']},
+                          'edit': {'command': 'npx', 'args': ['v2']},
+                          'new': {'command': 'npx', 'args': ['new']}})
+
+    assert setup.merge_mcp_config(str(source))
+    assert '추가 1개, 변경 1개, 제거 1개, 동일 1개' in capsys.readouterr().out
+    servers = json.loads(setup.mcp_json_path.read_text(encoding='utf-8'))['mcpServers']
+    assert sorted(servers) == ['edit', 'new', 'same']
+    assert servers['edit']['args'] == ['v2']
+
+
+def test_merge_without_changes_keeps_file(setup, tmp_path):
+    write_config(setup.mcp_json_path, {'same': {'command': 'npx', 'args': ['same']}})
+    before = setup.mcp_json_path.stat().st_mtime_ns
+    source = tmp_path / 'import.json'
+    write_config(source, {'same': {'command': 'npx', 'args': ['same']}})
+
+    assert setup.merge_mcp_config(str(source))
+    assert setup.mcp_json_path.stat().st_mtime_ns == before
+
+
+def test_merge_into_corrupt_config_reports_nothing_applied(setup, tmp_path, capsys):
+    setup.mcp_json_path.write_text('{bad', encoding='utf-8')
+    source = tmp_path / 'import.json'
+    write_config(source, {'a': {'command': 'npx', 'args': ['a']}, 'b': {'command': 'npx', 'args': ['b']}})
+
+    assert setup.merge_mcp_config(str(source)) is False
+    out = capsys.readouterr().out
+    assert '읽을 수 없어' in out
+    assert '+ a' not in out and '추가 2개' not in out
+    assert setup.mcp_json_path.read_text(encoding='utf-8') == '{bad'
+
+
+def test_merge_dry_run_prints_without_saving(setup, tmp_path, capsys):
+    write_config(setup.mcp_json_path, {})
+    source = tmp_path / 'import.json'
+    write_config(source, {'a': {'command': 'npx', 'args': ['a']}})
+
+    assert setup.merge_mcp_config(str(source), dry_run=True)
+    assert '+ a' in capsys.readouterr().out
+    assert json.loads(setup.mcp_json_path.read_text(encoding='utf-8')) == {'mcpServers': {}}
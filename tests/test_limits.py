@@ -0,0 +1,121 @@
+"""limit 리소스 제한과 동시 실행 슬롯 테스트"""
+import json
+import os
+
+import pytest
+
+import mcp_setup
+from mcp_setup import InstanceSlots, MCPSetup, ResourceLimits
+
+pytestmark = pytest.mark.skipif(os.name != 'posix', reason='limit은 POSIX에서만 슬롯을 사용')
+
+
+def test_launcher_max_instances_counts_attached_processes_only(tmp_path, warm_pool):
+    setup = MCPSetup(mcp_json_path=tmp_path / 'mcp.json', work_dir=tmp_path)
+    entry = setup.launcher_entry(setup.limit_entry('lim', mcp_setup.stub_server_entry(),
+                                                   ResourceLimits(max_instances=1)))
+    slots = InstanceSlots('lim')
+
+    # 첫 실행은 미적중으로 직접 실행되고, 풀이 같은 조건의 프로세스를 미리 준비
+    first, response = warm_pool.start_client(entry)
+    assert json.loads(response)['result']['serverInfo']['name'] == 'mcp-setup-stub'
+    assert '웜 풀 없음' in warm_pool.stop_client(first)
+    warm_pool.wait_ready()
+    # 클라이언트에 연결되지 않은 풀의 프로세스는 슬롯을 차지하지 않음
+    assert slots.holders() == []
+
+    # 다른 initialize 조건은 미적중이어도 빈 슬롯으로 직접 실행됨
+    other, response = warm_pool.start_client(entry, warm_pool.initialize_line('2025-03-26', {'roots': {}}))
+    assert json.loads(response)['result']['serverInfo']['name'] == 'mcp-setup-stub'
+    assert len(slots.holders()) == 1
+
+    # 슬롯이 가득 찬 상태에서 풀 적중은 넘겨받은 프로세스를 닫고 75로 종료
+    full, response = warm_pool.start_client(entry)
+    assert response == b''
+    assert full.wait(timeout=30) == 75
+    assert '최대 동시 실행 수(1)' in warm_pool.stop_client(full)
+    warm_pool.stop_client(other)
+
+    # 슬롯이 비면 풀 적중으로 넘겨받고 서버 pid가 슬롯에 기록됨
+    warm_pool.wait_ready()
+    hit, response = warm_pool.start_client(entry)
+    assert json.loads(response)['result']['serverInfo']['name'] == 'mcp-setup-stub'
+    holders = slots.holders()
+    assert len(holders) == 1 and holders[0] != hit.pid
+    assert '웜 풀 적중' in warm_pool.stop_client(hit)
+    assert slots.holders() == []
+
+
+def test_parse_limit_entry_round_trip(tmp_path):
+    setup = MCPSetup(mcp_json_path=tmp_path / 'mcp.json', work_dir=tmp_path)
+    limits = ResourceLimits(memory=512 << 20, nice=10, nofile=1024, max_instances=2)
+    entry = setup.limit_entry('lim', {'command': 'npx', 'args': ['-y', 'pkg']}, limits)
+
+    name, parsed, argv, wait = mcp_setup.parse_limit_entry(entry)
+    assert name == 'lim'
+    assert parsed.to_dict() == limits.to_dict()
+    assert argv == ['npx', '-y', 'pkg']
+    assert wait == 0.0
+    assert mcp_setup.parse_limit_entry({'command': 'npx', 'args': ['-y', 'pkg']}) is None
+
+
+@pytest.mark.parametrize('flag, value', [('--max-instances', '0'), ('--nofile', '-5'), ('--nice', '30'),
+                                         ('--memory-limit', '0')])
+def test_parse_limit_entry_rejects_out_of_range(flag, value):
+    entry = {'command': 'python3', 'args': ['mcp_setup.py', 'limit', flag, value, '--', 'npx', 'pkg']}
+    assert mcp_setup.parse_limit_entry(entry) is None
+
+
+@pytest.mark.parametrize('data', [{'max_instances': 0}, {'nofile': -5}, {'nice': 20}, {'memory': '1G'},
+                                  {'max_instances': True}, ['bad']])
+def test_limits_from_dict_rejects_invalid_values(data):
+    with pytest.raises(ValueError):
+        ResourceLimits.from_dict(data)
+
+
+def test_daemon_add_rejects_invalid_limits(tmp_path):
+    setup = MCPSetup(mcp_json_path=tmp_path / 'mcp.json', work_dir=tmp_path)
+    daemon = mcp_setup.MCPSetupDaemon(setup, tmp_path / 'daemon.sock')
+
+    with pytest.raises(mcp_setup.DaemonError) as error:
+        daemon.handle('add', {'name': 'q', 'command': 'npx', 'limits': {'max_instances': 0}})
+    assert error.value.code == -32602
+    assert not (tmp_path / 'mcp.json').exists()
+
+
+@pytest.mark.parametrize('args', [['--max-instances', '0'], ['--nofile', '-5']])
+def test_cli_rejects_non_positive_limits(run_cli, isolated_home, args):
+    result = run_cli('add', '--name', 'q', '--command', 'npx', '--args', 'a', *args)
+
+    assert result.returncode == 2
+    assert 'Traceback' not in result.stderr
+    assert not list(isolated_home.rglob('mcp.json'))
+
+
+def test_instance_slots_limit_and_release(tmp_path):
+    slots = InstanceSlots('srv/1', tmp_path)
+    assert slots.key == 'srv_1'
+
+    first = slots.try_acquire(2)
+    second = slots.try_acquire(2, pid=4242)
+    assert first is not None and second is not None
+    assert slots.try_acquire(2) is None
+    assert sorted(slots.holders()) == sorted([os.getpid(), 4242])
+
+    os.close(first)
+    assert slots.holders() == [4242]
+    third = slots.try_acquire(2)
+    assert third is not None
+    for fd in (second, third):
+        os.close(fd)
+    assert slots.holders() == []
+
+
+def test_instance_slots_unlimited_counts_instances(tmp_path):
+    slots = InstanceSlots('srv', tmp_path)
+    fds = [slots.try_acquire(None) for _ in range(3)]
+
+    assert None not in fds
+    assert len(slots.holders()) == 3
+    for fd in fds:
+        os.close(fd)
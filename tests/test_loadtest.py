@@ -0,0 +1,61 @@
+"""loadtest 부하 테스트 하네스 테스트"""
+import asyncio
+import json
+
+import pytest
+
+import mcp_setup
+
+ECHO_CALL = [{'name': 'echo', 'arguments': {'text': 'ping'}}]
+
+
+def test_loadtest_stub_counts_requests():
+    report = asyncio.run(mcp_setup.run_load_test(mcp_setup.stub_server_entry(), ECHO_CALL,
+                                                 concurrency=4, total=50))
+    
+    assert report['status'] == 'ok', report['error']
+    assert report['requests'] == 50
+    assert report['errors'] == 0
+    assert report['error_rate'] == 0
+    assert sum(bucket['count'] for bucket in report['histogram']) == 50
+    assert report['latency_ms']['p50'] <= report['latency_ms']['p99'] <= report['latency_ms']['max']
+
+
+def test_loadtest_zero_requests_report_prints(capsys):
+    report = asyncio.run(mcp_setup.run_load_test(mcp_setup.stub_server_entry(), ECHO_CALL, total=0))
+    
+    assert report['status'] == 'ok'
+    assert report['requests'] == 0
+    assert report['error_rate'] is None
+    mcp_setup.print_load_report('stub', report)
+    assert '오류: 0개 (-)' in capsys.readouterr().out
+
+
+def test_loadtest_stub_fail_rate():
+    entry = mcp_setup.stub_server_entry('--fail-rate', '0.5')
+    report = asyncio.run(mcp_setup.run_load_test(entry, ECHO_CALL, concurrency=8, total=400))
+    
+    assert report['status'] == 'ok'
+    assert report['requests'] == 400
+    # 실패 비율 0.5에서 400개 중 오류가 전혀 없거나 모두 오류일 확률은 무시할 만함
+    assert 0 < report['errors'] < 400
+    assert report['error_rate'] == pytest.approx(report['errors'] / 400)
+    assert sum(report['error_messages'].values()) == report['errors']
+
+
+@pytest.mark.parametrize('args', [['--requests', '0'], ['--requests', '-3'], ['--duration', '0']])
+def test_loadtest_cli_rejects_non_positive_bounds(run_cli, args):
+    result = run_cli('loadtest', '--stub', *args)
+    
+    assert result.returncode == 2
+    assert 'Traceback' not in result.stderr
+
+
+def test_loadtest_cli_stub_json(run_cli):
+    result = run_cli('loadtest', '--stub', '--requests', '30', '--stub-fail-rate', '1', '--json')
+    
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+    assert report['requests'] == 30
+    assert report['errors'] == 30
+    assert report['error_rate'] == 1
@@ -0,0 +1,68 @@
+"""웜 풀(pool)과 launch 셔틀 테스트 (stub-server)"""
+import json
+import socket
+
+import pytest
+
+import mcp_setup
+from mcp_setup import MCPSetup
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'send_fds'), reason='파일 디스크립터를 넘길 수 없는 플랫폼')
+
+
+def echo_line(request_id, text):
+    request = {'jsonrpc': '2.0', 'id': request_id, 'method': 'tools/call',
+               'params': {'name': 'echo', 'arguments': {'text': text}}}
+    return (json.dumps(request) + '\n').encode('utf-8')
+
+
+def test_launch_hit_relays_server_io_and_stderr(tmp_path, warm_pool):
+    setup = MCPSetup(mcp_json_path=tmp_path / 'mcp.json', work_dir=tmp_path)
+    entry = setup.launcher_entry(mcp_setup.stub_server_entry())
+
+    cold, response = warm_pool.start_client(entry)
+    assert json.loads(response)['result']['serverInfo']['name'] == 'mcp-setup-stub'
+    stderr = warm_pool.stop_client(cold)
+    assert '웜 풀 없음' in stderr
+    assert '[mcp-setup-stub] 시작' in stderr
+    warm_pool.wait_ready()
+
+    hit, response = warm_pool.start_client(entry)
+    assert json.loads(response)['result']['serverInfo']['name'] == 'mcp-setup-stub'
+    # 풀의 프로세스는 이미 초기화되었으므로 클라이언트의 알림은 건너뛰고 다음 요청은 그대로 전달
+    hit.stdin.write(b'{"jsonrpc": "2.0", "method": "notifications/initialized"}\n' + echo_line(2, 'hello'))
+    hit.stdin.flush()
+    assert json.loads(hit.stdout.readline()) == {
+        'jsonrpc': '2.0', 'id': 2, 'result': {'content': [{'type': 'text', 'text': 'hello'}]}}
+    stderr = warm_pool.stop_client(hit)
+    assert hit.returncode == 0
+    assert '웜 풀 적중' in stderr
+    # 직접 실행할 때처럼 풀에서 대기하던 서버의 로그도 클라이언트 표준 오류로 전달
+    assert '[mcp-setup-stub] 시작' in stderr
+
+    status = mcp_setup.daemon_request(warm_pool.socket_path, 'status', {})['result']
+    assert (status['pools'][0]['hits'], status['pools'][0]['misses']) == (1, 1)
+
+
+def test_parse_launch_entry_matches_launcher_entry(tmp_path):
+    setup = MCPSetup(mcp_json_path=tmp_path / 'mcp.json', work_dir=tmp_path)
+    server = {'command': 'npx', 'args': ['-y', 'pkg'], 'env': {'TOKEN': 'secret', 'OTHER': 'x'}}
+    entry = setup.launcher_entry(server)
+
+    spec = mcp_setup.parse_launch_entry(entry)
+    assert spec['argv'] == ['npx', '-y', 'pkg']
+    assert spec['env'] == {'TOKEN': 'secret', 'OTHER': 'x'}
+    assert mcp_setup.launch_spec_key(spec) == mcp_setup.launch_spec_key(
+        mcp_setup.launch_spec(['npx', '-y', 'pkg'], {'OTHER': 'x', 'TOKEN': 'secret'}))
+    assert mcp_setup.parse_launch_entry(server) is None
+
+
+@pytest.mark.parametrize('line, expected', [
+    (b'{"jsonrpc": "2.0", "method": "notifications/initialized"}\n', True),
+    (b'{"jsonrpc": "2.0", "id": 3, "method": "notifications/initialized"}\n', False),
+    (b'{"jsonrpc": "2.0", "id": 4, "method": "tools/call", "params": {"name": "echo", '
+     b'"arguments": {"text": "notifications/initialized"}}}\n', False),
+    (b'notifications/initialized\n', False),
+])
+def test_is_initialized_notification(line, expected):
+    assert mcp_setup.is_initialized_notification(line) is expected
@@ -0,0 +1,41 @@
+"""내장 stub-server와 probe 테스트"""
+import asyncio
+import json
+
+import mcp_setup
+
+
+def test_probe_stub_server():
+    result = asyncio.run(mcp_setup.probe_mcp_server('stub', mcp_setup.stub_server_entry(), timeout=30))
+    
+    assert result['status'] == 'ok', result['error']
+    assert result['server_info']['name'] == 'mcp-setup-stub'
+    assert result['first_response_ms'] is not None
+
+
+def test_probe_reports_startup_timeout():
+    entry = mcp_setup.stub_server_entry('--startup-delay', '5')
+    result = asyncio.run(mcp_setup.probe_mcp_server('slow', entry, timeout=0.5))
+    
+    assert result['status'] == 'timeout'
+    assert result['first_response_ms'] is None
+
+
+def test_stub_server_rejects_invalid_messages(run_cli):
+    lines = [
+        '[1]',
+        '{"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": "add", "arguments": {"a": "x", "b": 2}}}',
+        '{"jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": {"name": "add", "arguments": [1, 2]}}',
+        '{"jsonrpc": "2.0", "id": 3, "method": "tools/call", "params": "bad"}',
+        '{"jsonrpc": "2.0", "id": 4, "method": "tools/call", "params": {"name": "add", "arguments": {"a": 1, "b": 2}}}',
+    ]
+    result = run_cli('stub-server', input='\n'.join(lines) + '\n')
+
+    assert result.returncode == 0, result.stderr
+    invalid, *responses = [json.loads(line) for line in result.stdout.splitlines()]
+    assert invalid['error']['code'] == -32600
+    responses = {response['id']: response for response in responses}
+    assert responses[1]['result']['isError'] is True
+    assert responses[2]['error']['code'] == -32602
+    assert responses[3]['error']['code'] == -32602
+    assert responses[4]['result']['content'][0]['text'] == '3'
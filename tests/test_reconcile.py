@@ -0,0 +1,69 @@
+"""reconcile 원하는 상태 맞추기와 FileWatcher 테스트"""
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from mcp_setup import FileWatcher, MCPInstaller, MCPSetup, ServerDiff
+
+ONE = {'command': 'npx', 'args': ['-y', 'one']}
+TWO = {'command': 'npx', 'args': ['-y', 'two']}
+
+
+def write_config(path, servers):
+    path.write_text(json.dumps({'mcpServers': servers}), encoding='utf-8')
+
+
+def test_server_diff_compute():
+    current = {'same': ONE, 'edit': ONE, 'gone': TWO}
+    desired = {'same': ONE, 'edit': TWO, 'new': ONE}
+
+    diff = ServerDiff.compute(current, desired)
+    assert (diff.added, diff.changed, diff.removed, diff.unchanged) == (['new'], ['edit'], ['gone'], 1)
+    assert ServerDiff.compute(current, desired, keep_missing=True).removed == []
+    assert not ServerDiff.compute(current, dict(current))
+
+
+def test_reconcile_applies_desired_servers(tmp_path, capsys):
+    setup = MCPSetup(mcp_json_path=tmp_path / 'mcp.json', work_dir=tmp_path)
+    write_config(setup.mcp_json_path, {'one': ONE, 'old': TWO})
+    desired = tmp_path / 'desired.json'
+    write_config(desired, {'one': ONE, 'two': TWO})
+
+    assert setup.reconcile(str(desired), MCPInstaller(), dry_run=True)
+    assert sorted(json.loads(setup.mcp_json_path.read_text(encoding='utf-8'))['mcpServers']) == ['old', 'one']
+
+    assert setup.reconcile(str(desired), MCPInstaller())
+    assert json.loads(setup.mcp_json_path.read_text(encoding='utf-8'))['mcpServers'] == {'one': ONE, 'two': TWO}
+    before = setup.mcp_json_path.stat().st_mtime_ns
+    assert setup.reconcile(str(desired), MCPInstaller())
+    assert setup.mcp_json_path.stat().st_mtime_ns == before
+    assert '이미 원하는 상태입니다' in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('force_poll', [False, True])
+def test_file_watcher_reports_atomic_replace(tmp_path, monkeypatch, force_poll):
+    target = tmp_path / 'desired.json'
+    write_config(target, {})
+    if force_poll:
+        monkeypatch.setattr(FileWatcher, '_init_inotify', lambda self: None)
+    watcher = FileWatcher([target], poll_interval=0.05)
+    try:
+        if force_poll:
+            assert watcher.backend == 'poll'
+        assert watcher.wait(timeout=0.2) == []
+
+        def replace():
+            time.sleep(0.1)
+            temp = tmp_path / 'desired.json.tmp'
+            write_config(temp, {'one': ONE})
+            os.replace(temp, target)
+        thread = threading.Thread(target=replace)
+        thread.start()
+        changed = watcher.wait(timeout=10)
+        thread.join()
+        assert changed == [target]
+    finally:
+        watcher.close()
@@ -0,0 +1,61 @@
+"""mcpServers 항목 검사(validate_server_entry)와 ServerIndex 조회 테스트"""
+import pytest
+
+from mcp_setup import ServerIndex, validate_server_entry
+
+CONFIG = {'mcpServers': {
+    'posix': {'command': 'npx', 'args': ['-y', '@smithery/cli@latest', 'run', '@scope/server@1.2']},
+    'windows': {'command': 'cmd', 'args': ['/c', 'npx', '-y', '@smithery/cli@latest', 'install', 'other']},
+    'node': {'command': 'node', 'args': ['/cache/node_modules/@scope/server/dist/index.js', '--port', '1']},
+    'remote': {'url': 'https://example.com/mcp'},
+    'limited': {'command': 'python3', 'args': ['mcp_setup.py', 'limit', '--name', 'limited', '--', 'npx', 'solo']},
+    'broken': {'command': 'npx', 'args': ['-y', 1]},
+}}
+
+
+@pytest.mark.parametrize('server, problem', [
+    ({'command': 'npx', 'args': ['a']}, None),
+    ({'url': 'https://example.com'}, None),
+    ([], 'JSON 객체'),
+    ({}, "'command' 또는 'url'"),
+    ({'command': ''}, "'command'는"),
+    ({'command': 'npx', 'args': 'a'}, "'args'는 목록"),
+    ({'command': 'npx', 'args': ['a', 2]}, 'args[1]'),
+    ({'command': 'npx', 'env': ['A']}, "'env'는 JSON 객체"),
+    ({'command': 'npx', 'env': {'A': 1}}, "env['A']"),
+])
+def test_validate_server_entry(server, problem):
+    errors = validate_server_entry('s', server)
+    if problem is None:
+        assert errors == []
+    else:
+        assert len(errors) == 1 and problem in errors[0]
+
+
+def test_index_skips_invalid_entries():
+    index = ServerIndex.build(CONFIG)
+
+    assert list(index.records) == ['posix', 'windows', 'node', 'remote', 'limited']
+    assert len(index.errors) == 1 and index.errors[0].startswith('broken:')
+    assert ServerIndex.build([]).errors and ServerIndex.build({'mcpServers': []}).errors
+
+
+def test_index_classifies_and_queries():
+    index = ServerIndex.build(CONFIG)
+
+    forms = {name: record.os_form for name, record in index.records.items()}
+    assert forms == {'posix': 'posix', 'windows': 'windows', 'node': 'node', 'remote': 'remote',
+                     'limited': 'posix'}
+    assert index.uses_package('@scope/server@2.0') == ['posix', 'node']
+    assert [r.name for r in index.query({'os': 'posix'})] == ['posix', 'limited']
+    assert [r.name for r in index.query({'package': 'other'})] == ['windows']
+    assert [r.name for r in index.query({'package': '@scope/server', 'os': 'node'})] == ['node']
+    assert [r.name for r in index.query({'name': 'w*'})] == ['windows']
+    assert [r.name for r in index.query({'command': 'npx'})] == ['posix']
+    assert index.query({'package': 'missing'}) == []
+
+
+@pytest.mark.parametrize('spec', ['name', 'color=red', 'os=', 'os=beos'])
+def test_parse_filter_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        ServerIndex.parse_filter(spec)
@@ -0,0 +1,34 @@
+"""list/export 시작 경로에서 무거운 모듈을 불러오지 않는지 확인 (python -X importtime)"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import mcp_setup
+from benchmarks.bench_mcp_setup import STARTUP_FORBIDDEN_MODULES
+
+REPO_DIR = Path(mcp_setup.__file__).resolve().parent
+
+
+def imported_modules(args, home, cwd):
+    env = dict(os.environ, HOME=str(home), USERPROFILE=str(home), PYTHONPATH=str(REPO_DIR))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'mcp_setup'] + args, cwd=cwd, env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    return {line.rsplit('|', 1)[-1].strip() for line in proc.stderr.splitlines() if '|' in line}
+
+
+@pytest.mark.parametrize('command', ['list', 'export'])
+def test_startup_skips_heavy_imports(command, isolated_home, tmp_path):
+    cursor_dir = mcp_setup.PlatformProfile.for_os(mcp_setup.OSInfo.detect_os_type(), isolated_home).cursor_dir
+    cursor_dir.mkdir(parents=True)
+    servers = {f'server-{i}': {'command': 'npx', 'args': ['-y', f'pkg-{i}']} for i in range(10)}
+    (cursor_dir / 'mcp.json').write_text(json.dumps({'mcpServers': servers}), encoding='utf-8')
+    args = ['export', '--output', str(tmp_path / 'export.json')] if command == 'export' else ['list']
+
+    imported = imported_modules(args, isolated_home, tmp_path)
+    assert 'json' in imported
+    assert sorted(m for m in STARTUP_FORBIDDEN_MODULES if m in imported) == []
@@ -0,0 +1,31 @@
+"""--target-os / --target-home 설정 생성 테스트"""
+import json
+
+import mcp_setup
+
+# 실행 환경과 다른 운영 체제 (Windows 외 형식으로 명령 변환을 피함)
+OTHER_OS = 'linux' if mcp_setup.OSInfo.detect_os_type() == 'macos' else 'macos'
+
+
+def test_simulated_write_requires_target_home(run_cli, isolated_home):
+    result = run_cli('--target-os', OTHER_OS, 'add', '--name', 'q', '--command', 'npx', '--args', 'a')
+
+    assert result.returncode == 1
+    assert '--target-home' in result.stdout
+    assert list(isolated_home.iterdir()) == []
+
+
+def test_simulated_write_goes_under_target_home(run_cli, isolated_home, tmp_path):
+    target_home = tmp_path / 'target'
+    result = run_cli('--target-os', OTHER_OS, '--target-home', str(target_home),
+                     'add', '--name', 'q', '--command', 'npx', '--args', 'a')
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    cursor_dir = mcp_setup.PlatformProfile.for_os(OTHER_OS, target_home).cursor_dir
+    config = json.loads((cursor_dir / 'mcp.json').read_text(encoding='utf-8'))
+    assert config['mcpServers']['q'] == {'command': 'npx', 'args': ['a']}
+    assert list(isolated_home.iterdir()) == []
+
+    listed = run_cli('--target-os', OTHER_OS, '--target-home', str(target_home), 'list')
+    assert listed.returncode == 0
+    assert 'q' in listed.stdout
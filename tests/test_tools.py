@@ -0,0 +1,76 @@
+"""tools 명령과 도구 목록 캐시(ToolManifestCache) 테스트"""
+import asyncio
+import json
+
+import mcp_setup
+from mcp_setup import ToolManifestCache
+
+TOOLS = [{'name': 'echo', 'description': 'echo text'}]
+
+
+def test_fetch_tool_manifest_from_stub():
+    result = asyncio.run(mcp_setup.fetch_tool_manifest('stub', mcp_setup.stub_server_entry('--extra-tools', '2'), 30))
+
+    assert result['status'] == 'ok', result['error']
+    assert [tool['name'] for tool in result['tools']] == ['echo', 'add', 'tool_0', 'tool_1']
+    assert result['server_info']['name'] == 'mcp-setup-stub'
+
+
+def test_manifest_cache_key_follows_server_entry(tmp_path):
+    cache = ToolManifestCache(tmp_path / 'tools.json')
+    server = {'command': 'npx', 'args': ['-y', 'pkg@1.0.0'], 'env': {'TOKEN': 'a'}}
+    assert cache.put(server, TOOLS, {'name': 'pkg'})
+
+    # 다른 프로세스의 새 인스턴스도 파일에서 읽음
+    reloaded = ToolManifestCache(tmp_path / 'tools.json')
+    assert reloaded.get(dict(server)) == TOOLS
+    assert reloaded.lookup(server)['server_info'] == {'name': 'pkg'}
+    assert reloaded.get(dict(server, args=['-y', 'pkg@1.0.1'])) is None
+    assert reloaded.get(dict(server, env={'TOKEN': 'b'})) is None
+    # 토큰이 들어 있을 수 있는 항목은 해시로만 저장
+    assert 'TOKEN' not in (tmp_path / 'tools.json').read_text(encoding='utf-8')
+
+
+def test_manifest_cache_key_follows_installed_package_version(tmp_path):
+    package_dir = tmp_path / 'node_modules' / '@scope' / 'pkg'
+    package_dir.mkdir(parents=True)
+    (package_dir / 'package.json').write_text(json.dumps({'version': '1.0.0'}), encoding='utf-8')
+    server = {'command': 'node', 'args': [str(package_dir / 'dist' / 'index.js')]}
+    assert ToolManifestCache.package_versions(server) == {'@scope/pkg': '1.0.0'}
+
+    cache = ToolManifestCache(tmp_path / 'tools.json')
+    cache.put(server, TOOLS)
+    assert cache.get(server) == TOOLS
+
+    # 같은 경로에 패키지가 다시 설치되면 키가 달라짐
+    (package_dir / 'package.json').write_text(json.dumps({'version': '1.1.0'}), encoding='utf-8')
+    assert cache.get(server) is None
+
+
+def test_search_tools_ranks_name_matches_first():
+    manifests = [
+        {'name': 'a', 'tools': [{'name': 'read_file', 'description': 'search inside a file'}]},
+        {'name': 'b', 'tools': [{'name': 'search', 'description': 'search the web'},
+                                {'name': 'fetch', 'description': 'fetch a page'}]},
+    ]
+
+    matches = mcp_setup.search_tools(manifests, 'search')
+    assert [(server, tool['name']) for server, tool in matches] == [('b', 'search'), ('a', 'read_file')]
+    assert mcp_setup.search_tools(manifests, 'search web')[0][1]['name'] == 'search'
+
+
+def test_tools_cli_uses_cache_on_second_run(run_cli, isolated_home):
+    cursor_dir = mcp_setup.PlatformProfile.for_os(mcp_setup.OSInfo.detect_os_type(), isolated_home).cursor_dir
+    cursor_dir.mkdir(parents=True)
+    (cursor_dir / 'mcp.json').write_text(json.dumps({'mcpServers': {'stub': mcp_setup.stub_server_entry()}}),
+                                         encoding='utf-8')
+
+    first = run_cli('tools', '--json')
+    assert first.returncode == 0, first.stderr
+    assert [m['cached'] for m in json.loads(first.stdout)] == [False]
+
+    second = run_cli('tools', '--cached', '--json')
+    assert second.returncode == 0, second.stderr
+    manifest, = json.loads(second.stdout)
+    assert manifest['cached'] is True
+    assert [tool['name'] for tool in manifest['tools']] == ['echo', 'add']
@@ -0,0 +1,19 @@
+"""--profile / --trace 추적 테스트"""
+import json
+
+
+def test_trace_writes_json_lines(run_cli, tmp_path):
+    trace = tmp_path / 'trace.jsonl'
+    result = run_cli('--trace', str(trace), 'list')
+
+    assert result.returncode == 0, result.stderr
+    events = [json.loads(line) for line in trace.read_text(encoding='utf-8').splitlines()]
+    assert any(event['name'] == 'list' for event in events)
+
+
+def test_trace_path_error_is_reported(run_cli, tmp_path):
+    result = run_cli('--trace', str(tmp_path / 'missing' / 't.jsonl'), 'list')
+
+    assert result.returncode == 1
+    assert '추적 파일을 열 수 없습니다' in result.stdout
+    assert 'Traceback' not in result.stderr